@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Reportes y exportaciones sin interfaz gráfica (para tareas programadas).
+
+Uso:
+    python batch.py todo
+    python batch.py inventario movimientos --desde 2026-01-01 --hasta 2026-01-31
+    python batch.py excel-movimientos --producto 12 --producto 15 --salida /srv/reportes
+    python batch.py datos-completo --formato parquet
+
+Trabajos:
+    inventario, movimientos, estadisticas          reportes PDF
+    excel-inventario, excel-movimientos,
+    excel-completo                                 libros Excel
+    datos-inventario, datos-movimientos,
+    datos-completo                                 datos crudos (--formato csv, csv.gz o parquet)
+    todo                                           todos los anteriores
+
+Filtros: --desde/--hasta (fecha de registro del producto o fecha del
+movimiento, ambos inclusive), --producto (ID, repetible), --proveedor,
+--stock-bajo y, solo para movimientos, --tipo. Las filas y los totales de los
+reportes PDF se resuelven en MySQL con esos filtros. El reporte de
+estadísticas es siempre del inventario completo.
+
+Con --procesos N (por defecto uno por trabajo, hasta BATCH_CONFIG['procesos_maximos'])
+los trabajos corren en paralelo en un pool de procesos, cada uno con su propia
+conexión; con --procesos 1 corren en este proceso compartiendo conexión y
+generadores. Cada archivo se escribe en un directorio temporal dentro de
+--salida y se mueve a su nombre final con os.replace al terminar, así nunca
+queda un reporte a medio escribir. Si los datos no cambiaron desde la última
+vez que se generó un trabajo con los mismos filtros se reutiliza ese archivo
+(ReportCache); --sin-cache fuerza la regeneración. No importa tkinter.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from database import DatabaseManager
+from report_cache import ReportCache
+from export_data import FORMATOS
+from config import REPORTS_PATH, BATCH_CONFIG, REPORT_CACHE_CONFIG, EXPORT_DATOS_CONFIG
+
+class BatchRunner:
+    """Ejecuta trabajos de reporte/exportación sobre una conexión compartida.
+    
+    ReportGenerator, ExcelExporter y DataExporter se crean (e importan) la
+    primera vez que un trabajo los necesita y se reutilizan en los siguientes.
+    """
+    
+    def __init__(self, db, directorio=None, id_producto=None, proveedor=None,
+                 fecha_desde=None, fecha_hasta=None, tipo_movimiento=None, solo_stock_bajo=False,
+                 formato_datos=None):
+        self.db = db
+        self.directorio = directorio or REPORTS_PATH
+        self.formato_datos = formato_datos
+        self.filtros = {
+            'id_producto': id_producto,
+            'proveedor': proveedor,
+            'fecha_desde': fecha_desde,
+            'fecha_hasta': fecha_hasta,
+            'solo_stock_bajo': solo_stock_bajo,
+        }
+        self.filtros_movimientos = dict(self.filtros, tipo_movimiento=tipo_movimiento)
+        self._reportes = None
+        self._exportador = None
+        self._exportador_datos = None
+        self.trabajos = {
+            'inventario': self.reporte_inventario,
+            'movimientos': self.reporte_movimientos,
+            'estadisticas': self.reporte_estadisticas,
+            'excel-inventario': self.excel_inventario,
+            'excel-movimientos': self.excel_movimientos,
+            'excel-completo': self.excel_completo,
+            'datos-inventario': self.datos_inventario,
+            'datos-movimientos': self.datos_movimientos,
+            'datos-completo': self.datos_completo,
+        }
+    
+    @property
+    def reportes(self):
+        if self._reportes is None:
+            from reports import ReportGenerator
+            self._reportes = ReportGenerator(self.directorio)
+        return self._reportes
+    
+    @property
+    def exportador(self):
+        if self._exportador is None:
+            from export_excel import ExcelExporter
+            self._exportador = ExcelExporter(self.directorio)
+        return self._exportador
+    
+    @property
+    def exportador_datos(self):
+        if self._exportador_datos is None:
+            from export_data import DataExporter
+            self._exportador_datos = DataExporter(self.directorio, self.formato_datos)
+        return self._exportador_datos
+    
+    def ejecutar(self, nombres, destino):
+        """Ejecutar los trabajos en orden; devuelve la lista de (nombre, exito, mensaje, segundos)"""
+        resultados = []
+        for nombre in nombres:
+            resultado = _ejecutar_atomico(self, nombre, destino)
+            _informar(resultado)
+            resultados.append(resultado)
+        return resultados
+    
+    def ejecutar_en(self, nombre, directorio):
+        """Ejecutar un trabajo escribiendo sus archivos en directorio"""
+        self.directorio = directorio
+        for generador in (self._reportes, self._exportador, self._exportador_datos):
+            if generador is not None:
+                generador.directorio = directorio
+        return self.trabajos[nombre]()
+    
+    # Trabajos
+    def _productos(self):
+        return self.db.iterar_productos(**self.filtros)
+    
+    def _movimientos(self):
+        return self.db.iterar_movimientos(**self.filtros_movimientos)
+    
+    def reporte_inventario(self):
+        return self.reportes.generar_reporte_inventario(
+            self._productos(), self.db.obtener_totales_productos(**self.filtros), self.filtros
+        )
+    
+    def reporte_movimientos(self):
+        return self.reportes.generar_reporte_movimientos(
+            self._movimientos(), self.db.obtener_totales_movimientos(**self.filtros_movimientos),
+            self.filtros_movimientos
+        )
+    
+    def reporte_estadisticas(self):
+        return self.reportes.generar_reporte_estadisticas(self.db.obtener_estadisticas())
+    
+    def excel_inventario(self):
+        return self.exportador.exportar_inventario(self._productos())
+    
+    def excel_movimientos(self):
+        return self.exportador.exportar_movimientos(self._movimientos())
+    
+    def excel_completo(self):
+        # Los productos se recorren completos antes de abrir el recorrido de movimientos
+        return self.exportador.exportar_completo(self._productos(), self._movimientos())
+    
+    def datos_inventario(self):
+        return self.exportador_datos.exportar_inventario(self._productos())
+    
+    def datos_movimientos(self):
+        return self.exportador_datos.exportar_movimientos(self._movimientos())
+    
+    def datos_completo(self):
+        return self.exportador_datos.exportar_completo(self._productos(), self._movimientos())
+
+TRABAJOS = ('inventario', 'movimientos', 'estadisticas',
+            'excel-inventario', 'excel-movimientos', 'excel-completo',
+            'datos-inventario', 'datos-movimientos', 'datos-completo')
+
+def _ejecutar_atomico(runner, nombre, destino):
+    """Ejecutar un trabajo en un directorio temporal de destino y publicar sus archivos con os.replace.
+    
+    El temporal está en el mismo sistema de archivos que destino, así que el
+    renombrado es atómico. Devuelve (nombre, exito, mensaje, segundos).
+    """
+    inicio = time.perf_counter()
+    temporal = tempfile.mkdtemp(prefix=f".{nombre}-", dir=destino)
+    try:
+        exito, mensaje = runner.ejecutar_en(nombre, temporal)
+        if exito:
+            finales = []
+            for archivo in sorted(os.listdir(temporal)):
+                final = os.path.join(destino, archivo)
+                os.replace(os.path.join(temporal, archivo), final)
+                finales.append(final)
+            mensaje = ", ".join(finales)
+    except Exception as err:
+        exito, mensaje = False, f"Error inesperado: {err}"
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+    return nombre, exito, mensaje, time.perf_counter() - inicio
+
+def _informar(resultado):
+    nombre, exito, mensaje, segundos = resultado
+    estado = "[OK]" if exito else "[ERROR]"
+    print(f"{estado} {nombre} ({segundos:.1f} s): {mensaje}")
+
+# Runner de cada proceso del pool (uno por proceso, con su propia conexión)
+_runner_proceso = None
+
+def _iniciar_proceso(directorio, filtros):
+    """Inicializador del pool: abrir la conexión del proceso (se cierra al terminar el proceso)"""
+    global _runner_proceso
+    db = DatabaseManager(usar_pool=False)
+    if db.connect():
+        _runner_proceso = BatchRunner(db, directorio, **filtros)
+
+def _trabajo_en_proceso(nombre, destino):
+    if _runner_proceso is None:
+        return nombre, False, "No se pudo conectar a la base de datos", 0.0
+    return _ejecutar_atomico(_runner_proceso, nombre, destino)
+
+def ejecutar_en_paralelo(nombres, destino, filtros, procesos):
+    """Repartir los trabajos en un pool de procesos; resultados en el orden de nombres"""
+    resultados = {}
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso,
+                             initargs=(destino, filtros)) as pool:
+        futuros = {pool.submit(_trabajo_en_proceso, nombre, destino): nombre for nombre in nombres}
+        for futuro in as_completed(futuros):
+            nombre = futuros[futuro]
+            try:
+                resultado = futuro.result()
+            except Exception as err:
+                resultado = (nombre, False, f"Error inesperado: {err}", 0.0)
+            _informar(resultado)
+            resultados[nombre] = resultado
+    return [resultados[nombre] for nombre in nombres]
+
+def _fecha(texto):
+    try:
+        return datetime.strptime(texto, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha inválida '{texto}' (formato AAAA-MM-DD)")
+
+def _argumentos(argv):
+    parser = argparse.ArgumentParser(
+        description="Genera reportes PDF y exportaciones Excel, CSV o Parquet sin abrir la interfaz gráfica."
+    )
+    parser.add_argument('trabajos', nargs='+', choices=TRABAJOS + ('todo',), metavar='TRABAJO',
+                        help=f"uno o más de: {', '.join(TRABAJOS)}, todo")
+    parser.add_argument('--desde', type=_fecha, help="fecha inicial AAAA-MM-DD (inclusive)")
+    parser.add_argument('--hasta', type=_fecha, help="fecha final AAAA-MM-DD (inclusive)")
+    parser.add_argument('--producto', type=int, action='append', metavar='ID',
+                        help="limitar a un producto (se puede repetir)")
+    parser.add_argument('--proveedor', help="limitar a un proveedor")
+    parser.add_argument('--tipo', choices=('entrada', 'salida'),
+                        help="limitar los movimientos a entradas o salidas")
+    parser.add_argument('--stock-bajo', action='store_true',
+                        help="solo productos con stock bajo (y sus movimientos)")
+    parser.add_argument('--formato', choices=FORMATOS, default=EXPORT_DATOS_CONFIG['formato'],
+                        help="formato de los trabajos datos-* (por defecto "
+                             f"{EXPORT_DATOS_CONFIG['formato']})")
+    parser.add_argument('--salida', default=REPORTS_PATH, metavar='DIRECTORIO',
+                        help=f"carpeta de salida (por defecto {REPORTS_PATH})")
+    parser.add_argument('--procesos', type=int, metavar='N',
+                        help="procesos en paralelo (por defecto uno por trabajo, "
+                             f"hasta {BATCH_CONFIG['procesos_maximos']}; 1 = secuencial)")
+    parser.add_argument('--sin-cache', action='store_true',
+                        help="regenerar aunque los datos no hayan cambiado")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = _argumentos(argv)
+    nombres = []
+    for nombre in args.trabajos:
+        for trabajo in (TRABAJOS if nombre == 'todo' else (nombre,)):
+            if trabajo not in nombres:
+                nombres.append(trabajo)
+    
+    filtros = {
+        'id_producto': args.producto,
+        'proveedor': args.proveedor,
+        'fecha_desde': args.desde,
+        'fecha_hasta': args.hasta,
+        'tipo_movimiento': args.tipo,
+        'solo_stock_bajo': args.stock_bajo,
+        'formato_datos': args.formato,
+    }
+    os.makedirs(args.salida, exist_ok=True)
+    
+    # Conexión de este proceso: migraciones, versión de datos y, en modo secuencial, los trabajos
+    db = DatabaseManager(usar_pool=False)
+    if not db.connect() or not db.create_tables():
+        return 1
+    inicio = time.perf_counter()
+    
+    # Trabajos con un archivo vigente en la caché: se reutiliza sin regenerar
+    cache = None
+    if REPORT_CACHE_CONFIG['habilitada'] and not args.sin_cache:
+        cache = ReportCache(args.salida)
+        version = db.obtener_version_datos()
+        if version is None:
+            cache = None
+    claves, pendientes, en_cache = {}, [], {}
+    for nombre in nombres:
+        if cache is not None:
+            # El formato solo distingue a los trabajos datos-* (no cambia la clave de los demás)
+            parametros = filtros if nombre.startswith('datos-') else dict(filtros, formato_datos=None)
+            claves[nombre] = cache.clave(nombre, parametros, version)
+            ruta = cache.obtener(claves[nombre])
+            if ruta is not None:
+                en_cache[nombre] = (nombre, True, f"sin cambios en los datos, se reutiliza {ruta}", 0.0)
+                _informar(en_cache[nombre])
+                continue
+        pendientes.append(nombre)
+    
+    procesos = args.procesos or min(len(pendientes), BATCH_CONFIG['procesos_maximos'], os.cpu_count() or 1)
+    try:
+        if not pendientes:
+            generados = []
+        elif procesos > 1:
+            db.disconnect()
+            generados = ejecutar_en_paralelo(pendientes, args.salida, filtros, procesos)
+        else:
+            generados = BatchRunner(db, args.salida, **filtros).ejecutar(pendientes, args.salida)
+    finally:
+        db.disconnect()
+    
+    # Registrar en la caché lo recién publicado (cada trabajo deja un único archivo)
+    for nombre, exito, mensaje, _ in generados:
+        if cache is not None and exito:
+            cache.guardar(claves[nombre], mensaje)
+    por_nombre = {**en_cache, **{resultado[0]: resultado for resultado in generados}}
+    resultados = [por_nombre[nombre] for nombre in nombres]
+    
+    total = time.perf_counter() - inicio
+    suma = sum(segundos for *_, segundos in resultados)
+    print(f"[INFO] {len(resultados)} trabajos en {total:.1f} s con {max(procesos, 1)} proceso(s) "
+          f"(suma de tiempos por trabajo: {suma:.1f} s)")
+    fallidos = [nombre for nombre, exito, _, _ in resultados if not exito]
+    if fallidos:
+        print(f"[ERROR] {len(fallidos)} de {len(resultados)} trabajos fallaron: {', '.join(fallidos)}")
+        return 1
+    print(f"[OK] {len(resultados)} trabajos completados")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,661 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks de reportes, exportaciones, analizador Excel y consultas de la base de datos.
+
+Uso:
+    python benchmark.py                                 # casos sin base de datos, 1k a 1M filas
+    python benchmark.py --tamanos 1000 10000 --casos reporte-inventario excel-movimientos
+    python benchmark.py --mysql                         # además los casos de DatabaseManager
+    python benchmark.py --tamanos 1000 --guardar-linea-base
+
+Los datos son sintéticos y reproducibles (DatosSinteticos): proveedores con
+distribución de Zipf, más altas de productos en los últimos meses y
+movimientos más densos en días hábiles y concentrados en pocos productos. Sin
+--mysql los reportes, exportaciones y el analizador se alimentan del generador
+igual que de un cursor en streaming, así el benchmark corre sin servidor. Con
+--mysql se usa la base BENCHMARK_CONFIG['base_datos'] (se crea si falta y se
+vacía en cada tamaño; nunca la de producción).
+
+Cada caso registra tiempo, memoria pico y filas por segundo en un JSON dentro
+de BENCHMARK_CONFIG['directorio']. El tiempo se mide en una pasada sin
+tracemalloc (lo hace varias veces más lento) y la memoria pico en una segunda
+pasada con tracemalloc; --sin-memoria omite la segunda. Si hay línea base
+(linea_base.json o --linea-base) se compara con ella y cualquier regresión por
+encima de la tolerancia devuelve código 1.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate, islice
+
+from config import BENCHMARK_CONFIG, BULK_CHUNK_SIZE, DB_CONFIG, TABLA_VIRTUAL
+
+# Vocabulario de los datos sintéticos
+PROVEEDORES = tuple(
+    f"{tipo} {zona}"
+    for tipo in ('Distribuidora', 'Comercial', 'Importadora', 'Suministros', 'Mayorista')
+    for zona in ('Norte', 'Sur', 'Central', 'Andina', 'del Pacífico', 'del Valle', 'Atlántica', 'Oriental')
+)
+CATEGORIAS = ('Tornillo', 'Cable', 'Cinta', 'Guante', 'Tubo', 'Pintura', 'Lámpara', 'Filtro',
+              'Válvula', 'Cuaderno')
+ATRIBUTOS = ('reforzado', 'estándar', 'premium', 'compacto', 'industrial')
+PALABRAS = ('caja', 'unidad', 'acero', 'plástico', 'uso', 'general', 'alta', 'resistencia', 'color',
+            'blanco', 'negro', 'metro', 'paquete', 'importado', 'nacional', 'oferta')
+MOTIVOS_ENTRADA = ('Compra a proveedor', 'Devolución de cliente', 'Ajuste de inventario', '')
+MOTIVOS_SALIDA = ('Venta', 'Consumo interno', 'Merma', 'Ajuste de inventario', '')
+
+def _nombre_producto(id_producto):
+    """Nombre determinado por el id, así los movimientos lo conocen sin generar los productos"""
+    return f"{CATEGORIAS[id_producto % len(CATEGORIAS)]} {ATRIBUTOS[(id_producto // 10) % len(ATRIBUTOS)]} {id_producto}"
+
+class DatosSinteticos:
+    """Productos y movimientos sintéticos con las mismas claves que iterar_productos/iterar_movimientos.
+    
+    Cada llamada reinicia el generador con la misma semilla y la misma fecha de
+    referencia, así dos corridas (y la línea base) miden exactamente los mismos
+    datos. Las filas se generan de a una: la memoria no depende de n.
+    """
+    
+    def __init__(self, semilla=None, ahora=None):
+        self.semilla = BENCHMARK_CONFIG['semilla'] if semilla is None else semilla
+        self.ahora = ahora or datetime(2026, 1, 1, 12, 0)
+        # Zipf: el proveedor k-ésimo recibe un peso 1/k
+        self._pesos_proveedores = list(accumulate(1 / k for k in range(1, len(PROVEEDORES) + 1)))
+    
+    def productos(self, n):
+        """n productos; la antigüedad sigue una exponencial de media 180 días (tope 2 años)"""
+        rng = random.Random(self.semilla)
+        for id_producto in range(1, n + 1):
+            registro = self.ahora - timedelta(days=min(rng.expovariate(1 / 180), 730),
+                                              seconds=rng.randrange(86400))
+            registro = registro.replace(microsecond=0)
+            yield {
+                'id': id_producto,
+                'nombre': _nombre_producto(id_producto),
+                'descripcion': " ".join(rng.choices(PALABRAS, k=rng.randint(0, 15))),
+                'cantidad': int(rng.lognormvariate(3.5, 1.2)),
+                'precio_unitario': Decimal(rng.lognormvariate(2.5, 1.0)).quantize(Decimal('0.01')),
+                'proveedor': rng.choices(PROVEEDORES, cum_weights=self._pesos_proveedores)[0],
+                'fecha_registro': registro,
+                'ultima_actualizacion': registro + (self.ahora - registro) * rng.random(),
+            }
+    
+    def movimientos(self, m, n_productos=None):
+        """m movimientos del más reciente al más antiguo (el orden de iterar_movimientos).
+        
+        Abarcan alrededor de un año; los fines de semana tienen un tercio de la
+        actividad y unos pocos productos concentran la mayoría de los movimientos.
+        """
+        n_productos = n_productos or max(1, m // 10)
+        rng = random.Random(self.semilla + 1)
+        hueco_medio = 365 * 86400 / max(m, 1)
+        fecha = self.ahora
+        for id_movimiento in range(m, 0, -1):
+            hueco = rng.expovariate(1 / hueco_medio)
+            fecha -= timedelta(seconds=hueco * (3 if fecha.weekday() >= 5 else 1))
+            id_producto = 1 + int(n_productos * rng.random() ** 3)
+            entrada = rng.random() < 0.45
+            yield {
+                'id': id_movimiento,
+                'id_producto': id_producto,
+                'nombre_producto': _nombre_producto(id_producto),
+                'tipo_movimiento': 'entrada' if entrada else 'salida',
+                'cantidad': rng.randint(5, 100) if entrada else rng.randint(1, 20),
+                'fecha': fecha.replace(microsecond=0),
+                'descripcion': rng.choice(MOTIVOS_ENTRADA if entrada else MOTIVOS_SALIDA),
+            }
+
+class CasoOmitido(Exception):
+    """El caso no se puede correr aquí (falta una dependencia o no hay pantalla para Tk)"""
+
+def _verificar(resultado, filas):
+    """Convertir el (exito, mensaje) de reportes y escrituras en filas procesadas o en error"""
+    exito, mensaje = resultado
+    if not exito:
+        raise RuntimeError(mensaje)
+    return filas
+
+class Contexto:
+    """Estado compartido por los casos: datos, carpeta temporal, generadores, base y Tk"""
+    
+    def __init__(self, datos, db=None):
+        self.datos = datos
+        self.db = db
+        self.directorio = tempfile.mkdtemp(prefix='benchmark-')
+        self._reportes = None
+        self._exportador = None
+        self._exportador_datos = None
+        self._raiz = None
+        self._analizador = None
+        self._cargado = None        # Tamaño cargado en la base de datos de prueba
+    
+    @property
+    def reportes(self):
+        if self._reportes is None:
+            try:
+                from reports import ReportGenerator
+            except ImportError as err:
+                raise CasoOmitido(f"reportes no disponibles: {err}")
+            self._reportes = ReportGenerator(self.directorio)
+        return self._reportes
+    
+    @property
+    def exportador(self):
+        if self._exportador is None:
+            try:
+                from export_excel import ExcelExporter
+            except ImportError as err:
+                raise CasoOmitido(f"exportación Excel no disponible: {err}")
+            self._exportador = ExcelExporter(self.directorio)
+        return self._exportador
+    
+    def exportador_datos(self, formato):
+        """DataExporter compartido; omite el caso si el formato no se puede escribir aquí"""
+        from export_data import DataExporter, motor_parquet
+        if formato == 'parquet' and motor_parquet() is None:
+            raise CasoOmitido("Parquet requiere pandas con pyarrow o fastparquet")
+        if self._exportador_datos is None:
+            self._exportador_datos = DataExporter(self.directorio)
+        return self._exportador_datos
+    
+    def analizador(self):
+        """ExcelAnalyzer sobre una raíz Tk oculta (se crea una sola vez)"""
+        if self._analizador is None:
+            try:
+                import tkinter as tk
+                from excel_analysis import ExcelAnalyzer
+            except ImportError as err:
+                raise CasoOmitido(f"analizador no disponible: {err}")
+            try:
+                self._raiz = tk.Tk()
+            except tk.TclError as err:
+                raise CasoOmitido(f"sin pantalla para Tk: {err}")
+            self._raiz.withdraw()
+            self._analizador = ExcelAnalyzer(self._raiz)
+        return self._analizador
+    
+    def limpiar_archivos(self):
+        """Borrar los archivos generados por un caso (un reporte de 1M filas ocupa cientos de MB)"""
+        for archivo in os.listdir(self.directorio):
+            os.remove(os.path.join(self.directorio, archivo))
+    
+    # Base de datos de prueba
+    def _conexion(self):
+        import mysql.connector
+        return mysql.connector.connect(**DB_CONFIG)
+    
+    def vaciar_base(self):
+        conexion = self._conexion()
+        try:
+            cursor = conexion.cursor()
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            for tabla in ('movimientos_diarios', 'movimientos', 'productos'):
+                cursor.execute(f"TRUNCATE TABLE {tabla}")
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        finally:
+            conexion.close()
+        self.db.recalcular_estadisticas()
+        self._cargado = None
+    
+    def asegurar_carga(self, n):
+        """Cargar n productos y n movimientos con sus fechas sintéticas (INSERT directo, no se mide)"""
+        if self._cargado == n:
+            return
+        self.vaciar_base()
+        inicio = time.perf_counter()
+        columnas_productos = ('id', 'nombre', 'descripcion', 'cantidad', 'precio_unitario',
+                              'proveedor', 'fecha_registro', 'ultima_actualizacion')
+        columnas_movimientos = ('id_producto', 'tipo_movimiento', 'cantidad', 'fecha', 'descripcion')
+        conexion = self._conexion()
+        try:
+            cursor = conexion.cursor()
+            for tabla, columnas, filas in (
+                ('productos', columnas_productos, self.datos.productos(n)),
+                ('movimientos', columnas_movimientos, self.datos.movimientos(n, n)),
+            ):
+                query = (f"INSERT INTO {tabla} ({', '.join(columnas)}) "
+                         f"VALUES ({', '.join(['%s'] * len(columnas))})")
+                filas = iter(filas)
+                while True:
+                    lote = [tuple(fila[c] for c in columnas) for fila in islice(filas, BULK_CHUNK_SIZE)]
+                    if not lote:
+                        break
+                    cursor.executemany(query, lote)
+                    conexion.commit()
+        finally:
+            conexion.close()
+        self.db.reconstruir_movimientos_diarios()
+        self.db.recalcular_estadisticas()
+        self._cargado = n
+        print(f"[INFO] Base de prueba cargada con {n} productos y {n} movimientos "
+              f"en {time.perf_counter() - inicio:.1f} s")
+    
+    def cerrar(self):
+        if self._raiz is not None:
+            self._raiz.destroy()
+        if self.db is not None:
+            self.db.disconnect()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+# Casos: cada uno prepara lo que no se mide y devuelve la función medida (-> filas procesadas)
+def _datos_productos(ctx, n):
+    return lambda: sum(1 for _ in ctx.datos.productos(n))
+
+def _datos_movimientos(ctx, n):
+    return lambda: sum(1 for _ in ctx.datos.movimientos(n))
+
+def _reporte_inventario(ctx, n):
+    reportes = ctx.reportes
+    return lambda: _verificar(reportes.generar_reporte_inventario(ctx.datos.productos(n)), n)
+
+def _reporte_movimientos(ctx, n):
+    reportes = ctx.reportes
+    return lambda: _verificar(reportes.generar_reporte_movimientos(ctx.datos.movimientos(n)), n)
+
+def _excel_inventario(ctx, n):
+    exportador = ctx.exportador
+    return lambda: _verificar(exportador.exportar_inventario(ctx.datos.productos(n)), n)
+
+def _excel_movimientos(ctx, n):
+    exportador = ctx.exportador
+    return lambda: _verificar(exportador.exportar_movimientos(ctx.datos.movimientos(n)), n)
+
+def _exportar_datos_inventario(formato):
+    def preparar(ctx, n):
+        exportador = ctx.exportador_datos(formato)
+        return lambda: _verificar(exportador.exportar_inventario(ctx.datos.productos(n), formato), n)
+    return preparar
+
+def _exportar_datos_movimientos(formato):
+    def preparar(ctx, n):
+        exportador = ctx.exportador_datos(formato)
+        return lambda: _verificar(exportador.exportar_movimientos(ctx.datos.movimientos(n), formato), n)
+    return preparar
+
+def _analizador_leer(formato):
+    """Carga de una exportación en el analizador (sin Tk: solo la lectura del archivo).
+    
+    El archivo se genera una vez por tamaño y se reutiliza en las pasadas.
+    """
+    archivos = {}
+    
+    def preparar(ctx, n):
+        try:
+            from excel_analysis import ExcelAnalyzer
+        except ImportError as err:
+            raise CasoOmitido(f"analizador no disponible: {err}")
+        if not os.path.exists(archivos.get(n, '')):
+            if formato == 'xlsx':
+                resultado = ctx.exportador.exportar_inventario(ctx.datos.productos(n))
+            else:
+                resultado = ctx.exportador_datos(formato).exportar_inventario(ctx.datos.productos(n), formato)
+            _verificar(resultado, n)
+            archivos[n] = resultado[1]
+        ruta = archivos[n]
+        return lambda: len(ExcelAnalyzer.read_file(ruta))
+    return preparar
+
+def _analizador_vista_previa(ctx, n):
+    analizador = ctx.analizador()
+    try:
+        import pandas as pd
+    except ImportError as err:
+        raise CasoOmitido(f"pandas no disponible: {err}")
+    analizador.df = pd.DataFrame.from_records(ctx.datos.productos(n))
+    
+    def ejecutar():
+        analizador.populate_preview()
+        return n
+    return ejecutar
+
+def _db_crear_productos_bulk(ctx, n):
+    ctx.vaciar_base()
+    return lambda: _verificar(ctx.db.crear_productos_bulk(ctx.datos.productos(n)), n)
+
+def _db_productos_bloques(ctx, n):
+    ctx.asegurar_carga(n)
+    bloque = TABLA_VIRTUAL['tamano_bloque']
+    
+    def ejecutar():
+        # Un salto a la mitad de la tabla y veinte bloques seguidos buscados desde la
+        # última fila leída, como al desplazarse después de arrastrar la barra
+        filas = ctx.db.obtener_productos_tras(None, bloque, n // 2)
+        leidas = len(filas)
+        for _ in range(20):
+            if not filas:
+                break
+            ultima = filas[-1]
+            filas = ctx.db.obtener_productos_tras((ultima['fecha_registro'], ultima['id']), bloque)
+            leidas += len(filas)
+        return leidas
+    return ejecutar
+
+def _db_buscar(ctx, n):
+    ctx.asegurar_carga(n)
+    bloque = TABLA_VIRTUAL['tamano_bloque']
+    
+    def ejecutar():
+        ctx.db.contar_productos(busqueda=CATEGORIAS[0])
+        return len(ctx.db.obtener_productos_tras(None, bloque, busqueda=CATEGORIAS[0], orden='nombre'))
+    return ejecutar
+
+def _db_totales_productos(ctx, n):
+    ctx.asegurar_carga(n)
+    
+    def ejecutar():
+        totales = ctx.db.obtener_totales_productos(proveedor=PROVEEDORES[0])
+        if totales is None:
+            raise RuntimeError("No se pudieron obtener los totales de productos")
+        return totales['productos']
+    return ejecutar
+
+def _filtros_semana(ctx):
+    """Última semana de los datos sintéticos del proveedor más frecuente"""
+    return {'fecha_desde': (ctx.datos.ahora - timedelta(days=7)).date(),
+            'fecha_hasta': ctx.datos.ahora.date(), 'proveedor': PROVEEDORES[0]}
+
+def _db_totales_movimientos(ctx, n):
+    ctx.asegurar_carga(n)
+    filtros = _filtros_semana(ctx)
+    
+    def ejecutar():
+        totales = ctx.db.obtener_totales_movimientos(**filtros)
+        if totales is None:
+            raise RuntimeError("No se pudieron obtener los totales de movimientos")
+        return totales['movimientos']
+    return ejecutar
+
+def _db_iterar_productos(ctx, n):
+    ctx.asegurar_carga(n)
+    return lambda: sum(len(lote) for lote in ctx.db.iterar_productos(por_lotes=True))
+
+def _db_iterar_movimientos(ctx, n):
+    ctx.asegurar_carga(n)
+    return lambda: sum(len(lote) for lote in ctx.db.iterar_movimientos(por_lotes=True))
+
+def _db_estadisticas(ctx, n):
+    ctx.asegurar_carga(n)
+    return lambda: ctx.db.obtener_estadisticas().get('total_productos', 0)
+
+def _db_movimientos_diarios(ctx, n):
+    ctx.asegurar_carga(n)
+    desde = (ctx.datos.ahora - timedelta(days=30)).date()
+    return lambda: len(ctx.db.obtener_movimientos_diarios(desde, ctx.datos.ahora.date()))
+
+def _db_reporte_filtrado(ctx, n):
+    ctx.asegurar_carga(n)
+    reportes = ctx.reportes
+    filtros = _filtros_semana(ctx)
+    
+    def ejecutar():
+        totales = ctx.db.obtener_totales_movimientos(**filtros)
+        _verificar(reportes.generar_reporte_movimientos(ctx.db.iterar_movimientos(**filtros), totales, filtros), 0)
+        return totales['movimientos'] if totales else 0
+    return ejecutar
+
+def _db_registrar_movimiento(ctx, n):
+    ctx.asegurar_carga(n)
+    movimientos = list(ctx.datos.movimientos(min(n, BENCHMARK_CONFIG['max_filas_unitarias']), n))
+    
+    def ejecutar():
+        for m in movimientos:
+            _verificar(ctx.db.registrar_movimiento(m['id_producto'], m['tipo_movimiento'],
+                                                   m['cantidad'], m['descripcion']), 1)
+        return len(movimientos)
+    return ejecutar
+
+def _db_registrar_movimientos_lote(ctx, n):
+    ctx.asegurar_carga(n)
+    
+    def ejecutar():
+        movimientos = ctx.datos.movimientos(n, n)
+        while True:
+            lote = list(islice(movimientos, BULK_CHUNK_SIZE))
+            if not lote:
+                return n
+            _verificar(ctx.db.registrar_movimientos_lote(lote), len(lote))
+    return ejecutar
+
+# (nombre, requiere MySQL, preparar). Las escrituras sobre la carga van al final
+CASOS = (
+    ('datos-productos', False, _datos_productos),
+    ('datos-movimientos', False, _datos_movimientos),
+    ('reporte-inventario', False, _reporte_inventario),
+    ('reporte-movimientos', False, _reporte_movimientos),
+    ('excel-inventario', False, _excel_inventario),
+    ('excel-movimientos', False, _excel_movimientos),
+    ('csv-inventario', False, _exportar_datos_inventario('csv')),
+    ('csv-movimientos', False, _exportar_datos_movimientos('csv')),
+    ('csv-gz-inventario', False, _exportar_datos_inventario('csv.gz')),
+    ('parquet-inventario', False, _exportar_datos_inventario('parquet')),
+    ('parquet-movimientos', False, _exportar_datos_movimientos('parquet')),
+    ('analizador-leer-xlsx', False, _analizador_leer('xlsx')),
+    ('analizador-leer-csv-gz', False, _analizador_leer('csv.gz')),
+    ('analizador-leer-parquet', False, _analizador_leer('parquet')),
+    ('analizador-vista-previa', False, _analizador_vista_previa),
+    ('db-crear-productos-bulk', True, _db_crear_productos_bulk),
+    ('db-productos-bloques', True, _db_productos_bloques),
+    ('db-buscar', True, _db_buscar),
+    ('db-totales-productos', True, _db_totales_productos),
+    ('db-totales-movimientos', True, _db_totales_movimientos),
+    ('db-iterar-productos', True, _db_iterar_productos),
+    ('db-iterar-movimientos', True, _db_iterar_movimientos),
+    ('db-estadisticas', True, _db_estadisticas),
+    ('db-movimientos-diarios', True, _db_movimientos_diarios),
+    ('db-reporte-movimientos-filtrado', True, _db_reporte_filtrado),
+    ('db-registrar-movimiento', True, _db_registrar_movimiento),
+    ('db-registrar-movimientos-lote', True, _db_registrar_movimientos_lote),
+)
+
+def _ejecutar(funcion):
+    """Correr una función de caso: (filas, error)"""
+    try:
+        return funcion(), None
+    except Exception as err:
+        return 0, str(err) or type(err).__name__
+
+def medir(caso, tamano, preparar, memoria=True):
+    """Medir un caso: tiempo y filas/s sin tracemalloc, luego memoria pico en otra pasada.
+    
+    preparar() deja listo lo que no se mide y devuelve la función medida; se
+    llama antes de cada pasada. Los casos cortos se repiten hasta sumar
+    tiempo_minimo_s (como mucho repeticiones_maximas) y se toma el mejor tiempo.
+    """
+    segundos, acumulado, corridas, error = None, 0.0, 0, None
+    while error is None and corridas < BENCHMARK_CONFIG['repeticiones_maximas'] and (
+            corridas == 0 or acumulado < BENCHMARK_CONFIG['tiempo_minimo_s']):
+        funcion = preparar()
+        gc.collect()
+        inicio = time.perf_counter()
+        filas, error = _ejecutar(funcion)
+        transcurrido = time.perf_counter() - inicio
+        acumulado += transcurrido
+        corridas += 1
+        segundos = transcurrido if segundos is None else min(segundos, transcurrido)
+    resultado = {
+        'caso': caso,
+        'tamano': tamano,
+        'filas': filas,
+        'segundos': round(segundos, 4),
+        'memoria_pico_mb': None,
+        'filas_por_segundo': round(filas / segundos, 1) if segundos > 0 else 0.0,
+        'repeticiones': corridas,
+    }
+    if memoria and error is None:
+        funcion = preparar()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            _, error = _ejecutar(funcion)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        resultado['memoria_pico_mb'] = round(pico / 2**20, 2)
+    if error:
+        resultado['error'] = error
+    return resultado
+
+def _informar(resultado):
+    if 'omitido' in resultado:
+        print(f"[WARN] {resultado['caso']} ({resultado['tamano']}): omitido, {resultado['omitido']}")
+    elif 'error' in resultado:
+        print(f"[ERROR] {resultado['caso']} ({resultado['tamano']}): {resultado['error']}")
+    else:
+        memoria = resultado['memoria_pico_mb']
+        memoria = f"{memoria:9.2f} MB" if memoria is not None else f"{'-':>9} MB"
+        print(f"[OK] {resultado['caso']:<32} {resultado['tamano']:>9} {resultado['segundos']:9.3f} s "
+              f"{memoria} {resultado['filas_por_segundo']:12.1f} filas/s")
+
+def comparar(resultados, linea_base, tolerancia=None, memoria_minima=None):
+    """Regresiones frente a la línea base (por caso y tamaño) como lista de textos"""
+    tolerancia = BENCHMARK_CONFIG['tolerancia'] if tolerancia is None else tolerancia
+    memoria_minima = BENCHMARK_CONFIG['memoria_minima_mb'] if memoria_minima is None else memoria_minima
+    base = {(r['caso'], r['tamano']): r for r in linea_base.get('resultados', [])}
+    regresiones = []
+    for actual in resultados:
+        anterior = base.get((actual['caso'], actual['tamano']))
+        if anterior is None or any(clave in r for r in (actual, anterior) for clave in ('error', 'omitido')):
+            continue
+        nombre = f"{actual['caso']} ({actual['tamano']})"
+        if actual['filas_por_segundo'] < anterior['filas_por_segundo'] * (1 - tolerancia):
+            regresiones.append(f"{nombre}: {actual['filas_por_segundo']} filas/s, "
+                               f"línea base {anterior['filas_por_segundo']}")
+        if actual['memoria_pico_mb'] is None or anterior['memoria_pico_mb'] is None:
+            continue
+        limite = max(anterior['memoria_pico_mb'] * (1 + tolerancia), anterior['memoria_pico_mb'] + memoria_minima)
+        if actual['memoria_pico_mb'] > limite:
+            regresiones.append(f"{nombre}: {actual['memoria_pico_mb']} MB de memoria pico, "
+                               f"línea base {anterior['memoria_pico_mb']} MB")
+    return regresiones
+
+def _conectar_base_prueba(base):
+    """Crear (si falta) y usar la base de prueba; nunca la de producción"""
+    import mysql.connector
+    from mysql.connector import Error
+    from database import DatabaseManager
+    
+    if base == DB_CONFIG['database']:
+        print(f"[ERROR] La base de prueba no puede ser la de la aplicación ({base}): se vacía en cada tamaño")
+        return None
+    try:
+        conexion = mysql.connector.connect(**{k: v for k, v in DB_CONFIG.items() if k != 'database'})
+        try:
+            cursor = conexion.cursor()
+            cursor.execute("SELECT COUNT(*) FROM information_schema.schemata WHERE schema_name = %s", (base,))
+            if not cursor.fetchone()[0]:
+                cursor.execute(f"CREATE DATABASE `{base}` CHARACTER SET utf8mb4")
+        finally:
+            conexion.close()
+    except Error as err:
+        print(f"[ERROR] No se pudo preparar la base de prueba {base}: {err}")
+        return None
+    
+    # database.py lee este mismo diccionario en cada conexión
+    DB_CONFIG['database'] = base
+    db = DatabaseManager(usar_pool=False)
+    if not db.connect() or not db.create_tables():
+        return None
+    return db
+
+def _argumentos(argv):
+    nombres = [nombre for nombre, _, _ in CASOS]
+    parser = argparse.ArgumentParser(
+        description="Mide reportes, exportaciones, el analizador Excel y las consultas con datos sintéticos."
+    )
+    parser.add_argument('--tamanos', type=int, nargs='+', metavar='N', default=BENCHMARK_CONFIG['tamanos'],
+                        help=f"filas por caso (por defecto {' '.join(map(str, BENCHMARK_CONFIG['tamanos']))})")
+    parser.add_argument('--casos', nargs='+', choices=nombres, metavar='CASO',
+                        help=f"solo estos casos: {', '.join(nombres)}")
+    parser.add_argument('--mysql', action='store_true',
+                        help="correr también los casos de base de datos contra MySQL local")
+    parser.add_argument('--base', default=BENCHMARK_CONFIG['base_datos'],
+                        help=f"base de prueba para --mysql (por defecto {BENCHMARK_CONFIG['base_datos']})")
+    parser.add_argument('--semilla', type=int, default=BENCHMARK_CONFIG['semilla'])
+    parser.add_argument('--sin-memoria', action='store_true',
+                        help="no medir la memoria pico (una sola pasada por caso)")
+    parser.add_argument('--salida', default=BENCHMARK_CONFIG['directorio'], metavar='DIRECTORIO',
+                        help=f"carpeta de resultados (por defecto {BENCHMARK_CONFIG['directorio']})")
+    parser.add_argument('--linea-base', metavar='ARCHIVO',
+                        help="JSON de referencia (por defecto linea_base.json en la carpeta de resultados)")
+    parser.add_argument('--guardar-linea-base', action='store_true',
+                        help="guardar este resultado como línea base en lugar de comparar")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = _argumentos(argv)
+    casos = [(nombre, preparar) for nombre, requiere_mysql, preparar in CASOS
+             if (not args.casos or nombre in args.casos) and (args.mysql or not requiere_mysql)]
+    if not casos:
+        print("[ERROR] Ningún caso para correr (los casos db-* necesitan --mysql)")
+        return 1
+    
+    db = None
+    if args.mysql:
+        db = _conectar_base_prueba(args.base)
+        if db is None:
+            return 1
+    
+    ctx = Contexto(DatosSinteticos(args.semilla), db)
+    resultados = []
+    try:
+        for tamano in args.tamanos:
+            for nombre, preparar in casos:
+                try:
+                    resultado = medir(nombre, tamano, lambda: preparar(ctx, tamano), not args.sin_memoria)
+                except CasoOmitido as motivo:
+                    resultado = {'caso': nombre, 'tamano': tamano, 'omitido': str(motivo)}
+                ctx.limpiar_archivos()
+                _informar(resultado)
+                resultados.append(resultado)
+    finally:
+        ctx.cerrar()
+    
+    os.makedirs(args.salida, exist_ok=True)
+    salida = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'mysql': args.mysql,
+        'semilla': args.semilla,
+        'resultados': resultados,
+    }
+    ruta = os.path.join(args.salida, f"resultado_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(salida, archivo, indent=2, ensure_ascii=False)
+    print(f"[OK] Resultados guardados en {ruta}")
+    
+    ruta_base = args.linea_base or os.path.join(args.salida, 'linea_base.json')
+    regresiones = []
+    if args.guardar_linea_base:
+        shutil.copyfile(ruta, ruta_base)
+        print(f"[OK] Línea base actualizada: {ruta_base}")
+    elif os.path.exists(ruta_base):
+        with open(ruta_base, encoding='utf-8') as archivo:
+            regresiones = comparar(resultados, json.load(archivo))
+        for regresion in regresiones:
+            print(f"[ERROR] Regresión en {regresion}")
+        if not regresiones:
+            print(f"[OK] Sin regresiones frente a {ruta_base}")
+    else:
+        print(f"[INFO] No hay línea base en {ruta_base}; usar --guardar-linea-base para crearla")
+    
+    errores = [r['caso'] for r in resultados if 'error' in r]
+    if errores:
+        print(f"[ERROR] {len(errores)} casos fallaron: {', '.join(errores)}")
+    return 1 if regresiones or errores else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
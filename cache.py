@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import OrderedDict
+
+from config import CACHE_CONFIG
+
+class ProductCache:
+    """Caché en memoria de productos delante de DatabaseManager.
+    
+    Sirve productos por id (LRU acotado) y una instantánea de la lista completa.
+    Las escrituras hechas con el mismo DatabaseManager llegan como eventos y se
+    aplican al momento (write-through); los cambios de otros clientes se detectan
+    comparando obtener_version_productos() como mucho cada intervalo_verificacion
+    segundos.
+    """
+    
+    def __init__(self, db, tamano_maximo=None, intervalo_verificacion=None):
+        self.db = db
+        self.tamano_maximo = tamano_maximo or CACHE_CONFIG['tamano_maximo']
+        self.intervalo_verificacion = (CACHE_CONFIG['intervalo_verificacion']
+                                       if intervalo_verificacion is None else intervalo_verificacion)
+        
+        self._por_id = OrderedDict()
+        self._lista = None          # Instantánea completa, en el orden de obtener_productos()
+        self._version = None
+        self._ultima_verificacion = 0.0
+        self._lock = threading.RLock()
+        
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        
+        db.agregar_observador(self._al_cambiar)
+    
+    def obtener(self, id_producto):
+        """Producto por id (dict) o None si no existe"""
+        self._verificar_version()
+        with self._lock:
+            producto = self._por_id.get(id_producto)
+            if producto is not None:
+                self._por_id.move_to_end(id_producto)
+                self.aciertos += 1
+                return producto
+            self.fallos += 1
+        
+        producto = self.db.obtener_producto(id_producto)
+        if producto is not None:
+            with self._lock:
+                self._guardar(producto)
+        return producto
+    
+    def en_memoria(self, id_producto):
+        """Producto por id solo si ya está en el LRU, o None.
+        
+        No verifica la versión ni consulta MySQL: es la única lectura que puede
+        hacerse desde el hilo de Tk.
+        """
+        with self._lock:
+            producto = self._por_id.get(id_producto)
+            if producto is not None:
+                self._por_id.move_to_end(id_producto)
+                self.aciertos += 1
+            return producto
+    
+    def todos(self):
+        """Lista completa de productos (la misma lista mientras no cambien los datos)"""
+        self._verificar_version()
+        with self._lock:
+            if self._lista is not None:
+                self.aciertos += 1
+                return self._lista
+            self.fallos += 1
+        
+        version = self.db.obtener_version_productos()
+        productos = self.db.obtener_productos()
+        with self._lock:
+            self._lista = productos
+            self._version = version
+            self._ultima_verificacion = time.monotonic()
+            for producto in productos[:self.tamano_maximo]:
+                self._guardar(producto)
+        return productos
+    
+    def como_diccionario(self):
+        """Productos indexados por id, a partir de la instantánea completa"""
+        return {p['id']: p for p in self.todos()}
+    
+    def invalidar(self, ids=None):
+        """Descartar los productos indicados, o toda la caché si ids es None"""
+        with self._lock:
+            self.invalidaciones += 1
+            if ids is None:
+                self._por_id.clear()
+                self._lista = None
+                self._version = None
+                return
+            for id_producto in ids:
+                self._por_id.pop(id_producto, None)
+            self._lista = None
+    
+    def estadisticas(self):
+        """Contadores para dimensionar la caché"""
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': round(self.aciertos / consultas, 3) if consultas else 0.0,
+                'invalidaciones': self.invalidaciones,
+                'productos_en_cache': len(self._por_id),
+                'tamano_maximo': self.tamano_maximo,
+                'lista_completa': self._lista is not None,
+            }
+    
+    def _guardar(self, producto):
+        self._por_id[producto['id']] = producto
+        self._por_id.move_to_end(producto['id'])
+        while len(self._por_id) > self.tamano_maximo:
+            self._por_id.popitem(last=False)
+    
+    def aplicar_version(self, version):
+        """Invalidar todo si version (de obtener_version_productos) no es la conocida"""
+        with self._lock:
+            if self._version is not None and version != self._version:
+                self.invalidar()
+            self._version = version
+    
+    def _verificar_version(self):
+        """Invalidar todo si otro cliente cambió productos desde la última verificación.
+        
+        La consulta a MySQL va fuera del candado: en_memoria lo toma desde el hilo de Tk.
+        """
+        with self._lock:
+            ahora = time.monotonic()
+            if ahora - self._ultima_verificacion < self.intervalo_verificacion:
+                return
+            self._ultima_verificacion = ahora
+        self.aplicar_version(self.db.obtener_version_productos())
+    
+    def _al_cambiar(self, evento, ids):
+        """Aplicar una escritura propia: releer solo los productos afectados"""
+        if ids is None:
+            self.invalidar()
+            return
+        
+        productos = {p['id']: p for p in self.db.obtener_productos_por_ids(ids)}
+        version = self.db.obtener_version_productos()
+        with self._lock:
+            for id_producto in ids:
+                producto = productos.get(id_producto)
+                if producto is None:
+                    self._por_id.pop(id_producto, None)
+                elif id_producto in self._por_id or evento == 'producto_creado':
+                    self._guardar(producto)
+            
+            if self._lista is not None:
+                restantes = [p for p in self._lista if p['id'] not in ids or p['id'] in productos]
+                self._lista = [productos.get(p['id'], p) for p in restantes]
+                if evento == 'producto_creado':
+                    # Los productos nuevos van primero (orden por fecha_registro descendente)
+                    nuevos = [productos[i] for i in ids if i in productos]
+                    self._lista = nuevos + self._lista
+            
+            # La versión propia pasa a ser la de referencia para detectar cambios ajenos
+            self._version = version
@@ -0,0 +1,263 @@
+import math
+import tkinter as tk
+from tkinter import ttk
+from datetime import date, timedelta
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from config import GRAFICOS_CONFIG
+
+# Datos agregados ya consultados, compartidos entre ventanas: pestaña -> (versión, datos)
+_datos = {}
+
+# Geometría del gráfico de torta (la misma que se pasa a ax.pie)
+INICIO_TORTA = 140
+DISTANCIA_ETIQUETA = 1.1
+DISTANCIA_PORCENTAJE = 0.6
+
+class LiveChart:
+    """Una figura y un lienzo fijos para una vista; los datos nuevos se aplican en sitio.
+    
+    actualizar() modifica los artistas existentes (alto/ancho de barras, ángulos
+    de la torta, datos de líneas) cuando la forma de los datos no cambió y solo
+    rehace los ejes cuando sí cambió; en ambos casos se redibuja con draw_idle,
+    así que la memoria y el costo por redibujo no crecen con el tiempo.
+    """
+    
+    def __init__(self, master, tamano, colores, dibujar, actualizar_en_sitio):
+        self.colores = colores
+        self._dibujar = dibujar                             # (ax, datos) -> estado de artistas
+        self._actualizar_en_sitio = actualizar_en_sitio     # (ax, estado, datos) -> bool
+        self.figura = Figure(figsize=tamano, facecolor=colores['bg'])
+        self.ax = self.figura.add_subplot()
+        self.lienzo = FigureCanvasTkAgg(self.figura, master=master)
+        self.lienzo.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
+        self._estado = None
+    
+    def actualizar(self, datos):
+        if self._estado is not None and self._actualizar_en_sitio(self.ax, self._estado, datos):
+            self.ax.relim()
+            self.ax.autoscale_view()
+        else:
+            self.ax.clear()
+            self.ax.set_facecolor(self.colores['surface'])
+            self._estado = self._dibujar(self.ax, datos)
+            self.ax.tick_params(colors=self.colores['texto'])
+            for spine in self.ax.spines.values():
+                spine.set_edgecolor(self.colores['borde'])
+            self.figura.tight_layout()
+        self.lienzo.draw_idle()
+
+class ChartWindow:
+    """Ventana de gráficos con pestañas que se dibujan al seleccionarlas.
+    
+    Cada pestaña obtiene sus datos con una consulta agregada propia (en el
+    worker) y mantiene un LiveChart. Al volver a una pestaña y cada refresco_ms
+    la pestaña visible compara obtener_version_datos() con la versión dibujada
+    y, si cambió, actualiza sus artistas sin crear otra figura.
+    """
+    
+    PESTANAS = (
+        ('stock', "📦 Stock por Producto", (8, 4)),
+        ('proveedores', "🏭 Distribución por Proveedor", (6, 6)),
+        ('movimientos', "📈 Movimientos ({dias} días)", (9, 3.5)),
+    )
+    
+    def __init__(self, parent, db, worker, colores):
+        self.db = db
+        self.worker = worker
+        self.colores = colores
+        self.dias = GRAFICOS_CONFIG['dias_movimientos']
+        
+        self.ventana = tk.Toplevel(parent)
+        self.ventana.title("📈 Visualización de Estadísticas")
+        self.ventana.geometry("1000x700")
+        self.ventana.configure(bg=colores['bg'])
+        
+        encabezado = ttk.Label(self.ventana, text="📈 Análisis y Visualización de Datos",
+                               style='Header.TLabel')
+        encabezado.pack(pady=12, padx=12, fill=tk.X)
+        
+        self.cuaderno = ttk.Notebook(self.ventana)
+        self.cuaderno.pack(fill=tk.BOTH, expand=True, padx=12, pady=(0, 12))
+        
+        self.pestanas = {}      # clave -> (Frame, tamaño de figura)
+        self.graficos = {}      # clave -> LiveChart (pestañas ya dibujadas)
+        self._versiones = {}    # clave -> versión de datos dibujada
+        self._cargando = set()
+        self._refresco = None
+        for clave, titulo, tamano in self.PESTANAS:
+            marco = ttk.Frame(self.cuaderno)
+            self.cuaderno.add(marco, text=titulo.format(dias=self.dias))
+            ttk.Label(marco, text="Cargando...", style='TLabel').pack(pady=40)
+            self.pestanas[clave] = (marco, tamano)
+        
+        self.cuaderno.bind('<<NotebookTabChanged>>', self._al_cambiar_pestana)
+        self.ventana.bind('<Destroy>', self._al_cerrar)
+        self._al_cambiar_pestana(None)  # La primera pestaña ya está seleccionada
+        self._programar_refresco()
+    
+    def _pestana_actual(self):
+        return self.PESTANAS[self.cuaderno.index('current')][0]
+    
+    def _al_cambiar_pestana(self, evento):
+        self._cargar(self._pestana_actual())
+    
+    def _programar_refresco(self):
+        if GRAFICOS_CONFIG['refresco_ms']:
+            self._refresco = self.ventana.after(GRAFICOS_CONFIG['refresco_ms'], self._refrescar)
+    
+    def _refrescar(self):
+        self._cargar(self._pestana_actual())
+        self._programar_refresco()
+    
+    def _al_cerrar(self, evento):
+        if evento.widget is self.ventana and self._refresco is not None:
+            self.ventana.after_cancel(self._refresco)
+            self._refresco = None
+    
+    def _cargar(self, clave):
+        """Consultar la versión en el worker y los datos solo si no coinciden con lo dibujado"""
+        if clave in self._cargando:
+            return
+        self._cargando.add(clave)
+        dibujada = self._versiones.get(clave)
+        guardados = _datos.get(clave)
+        consulta = getattr(self, f"_datos_{clave}")
+        
+        def leer():
+            version = (self.db.obtener_version_datos(), date.today())
+            if version == dibujada:
+                return version, None
+            if guardados is not None and guardados[0] == version:
+                return version, guardados[1]
+            return version, consulta()
+        
+        def al_terminar(resultado):
+            self._cargando.discard(clave)
+            version, datos = resultado
+            if datos is None or not self.ventana.winfo_exists():
+                return
+            _datos[clave] = (version, datos)
+            self._mostrar(clave, datos)
+            self._versiones[clave] = version
+        
+        def al_error(err):
+            self._cargando.discard(clave)
+            print(f"[ERROR] No se pudo cargar el gráfico '{clave}': {err}")
+        
+        self.worker.ejecutar(leer, al_terminar=al_terminar, al_error=al_error, ocupar=False)
+    
+    def _mostrar(self, clave, datos):
+        grafico = self.graficos.get(clave)
+        if grafico is None:
+            marco, tamano = self.pestanas[clave]
+            for hijo in marco.winfo_children():
+                hijo.destroy()
+            grafico = LiveChart(marco, tamano, self.colores,
+                                getattr(self, f"_dibujar_{clave}"),
+                                getattr(self, f"_actualizar_{clave}"))
+            self.graficos[clave] = grafico
+        grafico.actualizar(datos)
+    
+    # Datos (se ejecutan en el worker)
+    def _datos_stock(self):
+        productos = self.db.obtener_top_productos(GRAFICOS_CONFIG['top_productos'])
+        return [p['nombre'] for p in productos], [p['cantidad'] for p in productos]
+    
+    def _datos_proveedores(self):
+        stock_proveedor = self.db.obtener_stock_por_proveedor()
+        return [p for p, _ in stock_proveedor], [s for _, s in stock_proveedor]
+    
+    def _datos_movimientos(self):
+        hoy = date.today()
+        fecha_inicio = hoy - timedelta(days=self.dias - 1)
+        # Neto por día desde el acumulado diario (a lo sumo una fila por día)
+        neto_por_fecha = {
+            fila['dia']: fila['neto']
+            for fila in self.db.obtener_movimientos_diarios(fecha_inicio, hoy)
+        }
+        fechas = [fecha_inicio + timedelta(days=i) for i in range(self.dias)]
+        return fechas, [neto_por_fecha.get(d, 0) for d in fechas]
+    
+    # Dibujo completo (primera vez o cambio de forma) y actualización en sitio
+    def _titulo(self, ax, texto):
+        ax.set_title(texto, fontsize=12, fontweight='bold', color=self.colores['texto'], pad=15)
+    
+    def _dibujar_stock(self, ax, datos):
+        etiquetas, valores = datos
+        posiciones = list(range(len(valores)))
+        barras = ax.barh(posiciones, valores[::-1], color=self.colores['secundario'],
+                         edgecolor=self.colores['borde'])
+        ax.set_yticks(posiciones)
+        ax.set_yticklabels(etiquetas[::-1])
+        self._titulo(ax, f"Top {GRAFICOS_CONFIG['top_productos']} productos por cantidad")
+        ax.set_xlabel('Cantidad', fontsize=10, color=self.colores['texto'])
+        return {'barras': barras}
+    
+    def _actualizar_stock(self, ax, estado, datos):
+        etiquetas, valores = datos
+        if len(estado['barras']) != len(valores):
+            return False
+        for barra, valor in zip(estado['barras'], valores[::-1]):
+            barra.set_width(valor)
+        ax.set_yticklabels(etiquetas[::-1])
+        return True
+    
+    def _dibujar_proveedores(self, ax, datos):
+        proveedores, stocks = datos
+        if not any(stocks):
+            ax.text(0.5, 0.5, 'No hay datos', ha='center', va='center', color=self.colores['texto_suave'])
+            return {'proveedores': None}
+        colores = [self.colores['primario'], self.colores['secundario'], self.colores['advertencia'],
+                   '#8B5CF6', '#EC4899']
+        colores = (colores * ((len(proveedores) // len(colores)) + 1))[:len(proveedores)]
+        porciones, etiquetas, porcentajes = ax.pie(
+            stocks, labels=proveedores, autopct='%1.1f%%', startangle=INICIO_TORTA,
+            labeldistance=DISTANCIA_ETIQUETA, pctdistance=DISTANCIA_PORCENTAJE,
+            colors=colores, textprops={'color': self.colores['texto']}
+        )
+        self._titulo(ax, 'Distribución del stock por proveedor')
+        return {'proveedores': list(proveedores), 'porciones': porciones,
+                'etiquetas': etiquetas, 'porcentajes': porcentajes}
+    
+    def _actualizar_proveedores(self, ax, estado, datos):
+        proveedores, stocks = datos
+        total = sum(stocks)
+        if estado['proveedores'] != list(proveedores) or not total:
+            return False
+        angulo = INICIO_TORTA
+        for porcion, etiqueta, porcentaje, stock in zip(estado['porciones'], estado['etiquetas'],
+                                                         estado['porcentajes'], stocks):
+            fraccion = stock / total
+            porcion.set_theta1(angulo)
+            porcion.set_theta2(angulo + 360 * fraccion)
+            medio = math.radians(angulo + 180 * fraccion)
+            x, y = math.cos(medio), math.sin(medio)
+            etiqueta.set_position((DISTANCIA_ETIQUETA * x, DISTANCIA_ETIQUETA * y))
+            etiqueta.set_horizontalalignment('left' if x > 0 else 'right')
+            porcentaje.set_position((DISTANCIA_PORCENTAJE * x, DISTANCIA_PORCENTAJE * y))
+            porcentaje.set_text(f"{100 * fraccion:.1f}%")
+            angulo += 360 * fraccion
+        return True
+    
+    def _dibujar_movimientos(self, ax, datos):
+        fechas, netos = datos
+        barras = ax.bar(fechas, netos, color=self.colores['primario'], edgecolor=self.colores['borde'])
+        self._titulo(ax, f'Movimiento neto por día (últimos {self.dias} días)')
+        ax.set_xlabel('Fecha', fontsize=10, color=self.colores['texto'])
+        ax.set_ylabel('Cantidad neta', fontsize=10, color=self.colores['texto'])
+        ax.grid(axis='y', alpha=0.2, color=self.colores['borde'])
+        for etiqueta in ax.get_xticklabels():
+            etiqueta.set_rotation(45)
+            etiqueta.set_horizontalalignment('right')
+        return {'fechas': list(fechas), 'barras': barras}
+    
+    def _actualizar_movimientos(self, ax, estado, datos):
+        fechas, netos = datos
+        if estado['fechas'] != list(fechas):
+            return False  # Cambió el día: el eje X se rehace
+        for barra, neto in zip(estado['barras'], netos):
+            barra.set_height(neto)
+        return True
@@ -10,3 +10,113 @@ DB_CONFIG = {
 
 # Ruta para guardar reportes
 REPORTS_PATH = './reportes/'
+
+# Pool de conexiones (varias ventanas/hilos consultando la base de datos a la vez)
+DB_POOL_CONFIG = {
+    'habilitado': False,        # True: una conexión del pool por llamada y por hilo
+    'pool_name': 'inventario_pool',
+    'pool_size': 5,
+    'ping_intentos': 3,         # Reintentos al revalidar una conexión tomada del pool
+    'ping_espera': 1,           # Segundos entre reintentos de ping
+    'espera_maxima': 10         # Segundos máximos esperando una conexión libre
+}
+
+# Carga masiva de productos: filas por lote (un commit por lote)
+BULK_CHUNK_SIZE = 1000
+
+# Group commit de movimientos: se confirma al juntar N movimientos o tras T ms
+GROUP_COMMIT_CONFIG = {
+    'max_movimientos': 100,
+    'max_espera_ms': 200
+}
+
+# Filas por página en las consultas paginadas
+PAGE_SIZE = 200
+
+# Filas por fetchmany al recorrer tablas grandes en streaming
+STREAM_BATCH_SIZE = 1000
+
+# Mantener las estadísticas del inventario en una fila resumen (lectura O(1)).
+# Requiere que todos los clientes escriban a través de DatabaseManager.
+ESTADISTICAS_MATERIALIZADAS = False
+
+# Caché de productos en memoria
+CACHE_CONFIG = {
+    'tamano_maximo': 5000,          # Productos guardados por id (LRU)
+    'intervalo_verificacion': 2.0   # Segundos entre comprobaciones de cambios de otros clientes
+}
+
+# Trabajos en segundo plano del GUI (base de datos, reportes y exportaciones)
+WORKER_CONFIG = {
+    'max_hilos': 3,             # Trabajos ejecutándose a la vez
+    'intervalo_ms': 50,         # Cada cuánto el hilo de Tk recoge resultados pendientes
+    'progreso_cada': 500,       # Filas entre avisos de progreso en reportes y exportaciones
+    'espera_cierre': 5.0        # Segundos que se esperan los trabajos en curso al cerrar la aplicación
+}
+
+# Tabla virtual de productos: solo se dibujan las filas visibles
+TABLA_VIRTUAL = {
+    'tamano_bloque': 200,       # Productos por consulta al desplazarse
+    'overscan': 50,             # Filas que se piden por adelantado arriba y abajo de la vista
+    'bloques_en_memoria': 20,   # Bloques guardados (LRU); el resto se vuelve a pedir
+    'filas_rueda': 3            # Filas por paso de la rueda del mouse
+}
+
+# Refresco de la interfaz: las invalidaciones se agrupan en un solo refresco
+REFRESCO_CONFIG = {
+    'intervalo_ms': 100,        # Espera para juntar varias invalidaciones seguidas
+    'sondeo_ms': 5000           # Cada cuánto se buscan cambios de otros clientes (0 = nunca)
+}
+
+# Barra de búsqueda y orden de la tabla de productos
+BUSQUEDA_CONFIG = {
+    'espera_ms': 300,           # Pausa al escribir antes de consultar (debounce)
+    'consultas_en_cache': 16    # Búsquedas/órdenes recientes guardadas (LRU) para volver al instante
+}
+
+# Arranque del GUI: presupuesto en terminales livianas y desglose de tiempos
+ARRANQUE_CONFIG = {
+    'presupuesto_ms': 1500,                         # Desde que arranca main.py hasta conectar
+    'mostrar_tiempos': False,                       # Imprimir el desglose por fases e imports
+    'variable_entorno': 'INVENTARIO_TIEMPOS_ARRANQUE'   # Si está definida también se imprime
+}
+
+# Caché de reportes: se reutiliza el archivo si los datos no cambiaron (retención LRU)
+REPORT_CACHE_CONFIG = {
+    'habilitada': True,
+    'max_archivos': 50,         # Archivos en caché como máximo dentro de REPORTS_PATH
+    'max_dias': 30              # Se borran los que llevan más días sin usarse (0 = sin límite)
+}
+
+# Exportaciones de datos crudos para BI (CSV, CSV con gzip y Parquet)
+EXPORT_DATOS_CONFIG = {
+    'formato': 'csv.gz',            # Formato por defecto: 'csv', 'csv.gz' o 'parquet'
+    'nivel_gzip': 6,                # 1 (más rápido) a 9 (más chico); 6 comprime casi igual que 9 en menos tiempo
+    'filas_por_grupo': 50000,       # Filas por row group de Parquet (las que se tienen en memoria a la vez)
+    'compresion_parquet': 'snappy'
+}
+
+# batch.py: procesos en paralelo como máximo (cada uno abre su conexión a MySQL)
+BATCH_CONFIG = {
+    'procesos_maximos': 4
+}
+
+# Ventana de gráficos
+GRAFICOS_CONFIG = {
+    'top_productos': 10,        # Barras en "Stock por Producto"
+    'dias_movimientos': 30,     # Días en "Movimientos"
+    'refresco_ms': 10000        # Cada cuánto la pestaña visible busca datos nuevos (0 = nunca)
+}
+
+# benchmark.py: tamaños, base de datos de prueba y tolerancia frente a la línea base
+BENCHMARK_CONFIG = {
+    'tamanos': (1000, 10000, 100000, 1000000),  # Filas por caso
+    'semilla': 2026,                # Datos sintéticos reproducibles
+    'max_filas_unitarias': 10000,   # Tope para los casos de a una fila (registrar_movimiento)
+    'tiempo_minimo_s': 1.0,         # Los casos más cortos se repiten (mejor tiempo) hasta sumar esto
+    'repeticiones_maximas': 5,
+    'base_datos': 'inventory_benchmark',    # Nunca la base de producción: se vacía en cada tamaño
+    'directorio': './benchmarks/',  # Resultados JSON y linea_base.json
+    'tolerancia': 0.25,             # Regresión: 25% menos filas/s o 25% más memoria pico
+    'memoria_minima_mb': 1.0        # Diferencias de memoria menores no cuentan como regresión
+}
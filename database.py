@@ -1,21 +1,309 @@
+import re
+import threading
+import time
+from contextlib import contextmanager
+
 import mysql.connector
-from mysql.connector import Error
-from config import DB_CONFIG
-from datetime import datetime
+from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
+import migrations
+from config import (DB_CONFIG, DB_POOL_CONFIG, BULK_CHUNK_SIZE, GROUP_COMMIT_CONFIG, PAGE_SIZE,
+                    STREAM_BATCH_SIZE, ESTADISTICAS_MATERIALIZADAS)
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from itertools import islice
+
+COLUMNAS_PRODUCTO = ('nombre', 'descripcion', 'cantidad', 'precio_unitario', 'proveedor')
+
+QUERY_INSERTAR_PRODUCTO = """
+    INSERT INTO productos 
+    (nombre, descripcion, cantidad, precio_unitario, proveedor) 
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+QUERY_INSERTAR_MOVIMIENTO = """
+    INSERT INTO movimientos 
+    (id_producto, tipo_movimiento, cantidad, descripcion) 
+    VALUES (%s, %s, %s, %s)
+"""
+QUERY_INSERTAR_MOVIMIENTO_CON_FECHA = """
+    INSERT INTO movimientos 
+    (id_producto, tipo_movimiento, cantidad, descripcion, fecha) 
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+TIPOS_MOVIMIENTO = ('entrada', 'salida')
+
+# Productos con menos unidades que este umbral cuentan como stock bajo
+UMBRAL_STOCK_BAJO = 10
+
+# Estadísticas en una sola pasada sobre productos
+QUERY_ESTADISTICAS = f"""
+    SELECT COUNT(*) AS total_productos,
+           COALESCE(SUM(cantidad), 0) AS stock_total,
+           COALESCE(SUM(cantidad * precio_unitario), 0) AS valor_total,
+           COALESCE(SUM(cantidad < {UMBRAL_STOCK_BAJO}), 0) AS bajo_stock
+    FROM productos
+"""
+
+# Columnas consultables (nombre lógico -> expresión SQL) para las proyecciones
+COLUMNAS_SQL_PRODUCTOS = {
+    c: c for c in ('id', 'nombre', 'descripcion', 'cantidad', 'precio_unitario',
+                   'proveedor', 'fecha_registro', 'ultima_actualizacion')
+}
+COLUMNAS_SQL_MOVIMIENTOS = {
+    'id': 'm.id',
+    'id_producto': 'm.id_producto',
+    'tipo_movimiento': 'm.tipo_movimiento',
+    'cantidad': 'm.cantidad',
+    'fecha': 'm.fecha',
+    'descripcion': 'm.descripcion',
+    'nombre_producto': 'p.nombre AS nombre_producto',
+    'proveedor': 'p.proveedor',
+}
+COLUMNAS_JOIN_MOVIMIENTOS = {'nombre_producto', 'proveedor'}
+
+# Proyecciones por defecto de los listados (sin los TEXT de descripción)
+COLUMNAS_LISTADO_PRODUCTOS = ('id', 'nombre', 'cantidad', 'precio_unitario', 'proveedor',
+                              'fecha_registro', 'ultima_actualizacion')
+COLUMNAS_LISTADO_MOVIMIENTOS = ('id', 'id_producto', 'tipo_movimiento', 'cantidad', 'fecha')
+
+# Columnas por las que se puede ordenar el listado de productos (todas indexadas)
+ORDEN_PRODUCTOS = ('fecha_registro', 'id', 'nombre', 'cantidad', 'precio_unitario', 'proveedor')
+
+# Proyección por defecto del streaming de movimientos (exportaciones y reportes)
+COLUMNAS_STREAM_MOVIMIENTOS = ('id', 'id_producto', 'nombre_producto', 'tipo_movimiento',
+                               'cantidad', 'fecha', 'descripcion')
+
+def _lotes(filas, tamano):
+    """Recorrer un iterable en listas de (indice, fila) de tamaño acotado"""
+    iterador = enumerate(filas)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+def _clave_natural(nombre, proveedor):
+    """Clave natural de un producto: nombre + proveedor (sin distinguir mayúsculas)"""
+    return (str(nombre or '').strip().casefold(), str(proveedor or '').strip().casefold())
+
+def _normalizar_movimiento(movimiento):
+    """Validar un movimiento (dict o tupla) y devolverlo como tupla de columnas"""
+    if isinstance(movimiento, dict):
+        movimiento = (movimiento['id_producto'], movimiento['tipo_movimiento'],
+                      movimiento['cantidad'], movimiento.get('descripcion'))
+    id_producto, tipo_movimiento, cantidad, *resto = movimiento
+    if str(tipo_movimiento).lower() not in TIPOS_MOVIMIENTO:
+        raise ValueError(f"Tipo de movimiento desconocido: {tipo_movimiento}")
+    cantidad = int(cantidad)
+    if cantidad <= 0:
+        raise ValueError("La cantidad debe ser mayor que cero")
+    descripcion = resto[0] if resto and resto[0] is not None else ""
+    return (int(id_producto), str(tipo_movimiento), cantidad, descripcion)
+
+def _proyeccion(columnas, disponibles, obligatorias=()):
+    """Armar la lista SELECT a partir de nombres de columna permitidos"""
+    columnas = list(columnas)
+    for columna in obligatorias:
+        if columna not in columnas:
+            columnas.append(columna)
+    desconocidas = [c for c in columnas if c not in disponibles]
+    if desconocidas:
+        raise ValueError(f"Columnas no permitidas: {', '.join(desconocidas)}")
+    return ", ".join(disponibles[c] for c in columnas)
+
+def _lista(valor):
+    """Aceptar un valor suelto o un iterable de valores para filtros IN"""
+    if valor is None:
+        return []
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return list(valor)
+    return [valor]
+
+def _fin_de_rango(fecha_hasta):
+    """Límite superior exclusivo: una fecha sin hora incluye el día completo"""
+    if isinstance(fecha_hasta, date) and not isinstance(fecha_hasta, datetime):
+        return fecha_hasta + timedelta(days=1)
+    return fecha_hasta
+
+def _filtros_productos(id_producto=None, proveedor=None, fecha_desde=None, fecha_hasta=None,
+                       solo_stock_bajo=False):
+    """Condiciones WHERE y parámetros comunes a las consultas de productos"""
+    condiciones, params = [], []
+    ids = _lista(id_producto)
+    if ids:
+        condiciones.append(f"id IN ({', '.join(['%s'] * len(ids))})")
+        params += ids
+    if proveedor:
+        condiciones.append("proveedor = %s")
+        params.append(proveedor)
+    if fecha_desde:
+        condiciones.append("fecha_registro >= %s")
+        params.append(fecha_desde)
+    if fecha_hasta:
+        condiciones.append("fecha_registro < %s")
+        params.append(_fin_de_rango(fecha_hasta))
+    if solo_stock_bajo:
+        condiciones.append(f"cantidad < {UMBRAL_STOCK_BAJO}")
+    return condiciones, params
+
+def _filtro_busqueda(texto):
+    """Condición para buscar texto en nombre/descripción (FULLTEXT), proveedor o id.
+    
+    Cada rama usa su propio índice y los ids se juntan en una tabla derivada,
+    así MySQL no tiene que recorrer productos evaluando un OR fila por fila.
+    """
+    texto = (texto or '').strip()
+    palabras = re.findall(r'\w+', texto)
+    if not palabras:
+        return [], []
+    prefijo = texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    ramas = [
+        "SELECT id FROM productos WHERE MATCH(nombre, descripcion) AGAINST (%s IN BOOLEAN MODE)",
+        "SELECT id FROM productos WHERE proveedor LIKE %s",
+    ]
+    params = [" ".join(f"+{p}*" for p in palabras), prefijo]
+    if texto.isdigit():
+        ramas.append("SELECT id FROM productos WHERE id = %s")
+        params.append(int(texto))
+    return [f"id IN (SELECT id FROM ({' UNION '.join(ramas)}) AS coincidencias)"], params
+
+def _orden_productos(orden=None, descendente=True):
+    """Cláusula ORDER BY del listado de productos (id desempata para un orden estable)"""
+    orden = orden or 'fecha_registro'
+    if orden not in ORDEN_PRODUCTOS:
+        raise ValueError(f"Orden no permitido: {orden}")
+    sentido = 'DESC' if descendente else 'ASC'
+    if orden == 'id':
+        return f"id {sentido}"
+    return f"{orden} {sentido}, id {sentido}"
+
+def _condicion_tras_ancla(orden, ancla, descendente):
+    """Condición keyset: filas posteriores a ancla=(valor, id) en el orden de _orden_productos.
+    
+    MySQL ubica los NULL primero en orden ascendente y al final en descendente;
+    la condición los trata igual para no saltear ni repetir filas.
+    """
+    valor, id_ancla = ancla
+    comparacion = '<' if descendente else '>'
+    if orden == 'id':
+        return f"id {comparacion} %s", [id_ancla]
+    if valor is None:
+        if descendente:
+            return f"({orden} IS NULL AND id < %s)", [id_ancla]
+        return f"({orden} IS NOT NULL OR id > %s)", [id_ancla]
+    condicion = f"({orden} {comparacion} %s OR ({orden} = %s AND id {comparacion} %s)"
+    if descendente:
+        condicion += f" OR {orden} IS NULL"
+    return condicion + ")", [valor, valor, id_ancla]
+
+def _filtros_movimientos(id_producto=None, tipo_movimiento=None, fecha_desde=None,
+                         fecha_hasta=None, proveedor=None, solo_stock_bajo=False, con_producto=False):
+    """Tabla origen (con JOIN a productos si hace falta), condiciones y parámetros"""
+    condiciones, params = [], []
+    ids = _lista(id_producto)
+    if ids:
+        condiciones.append(f"m.id_producto IN ({', '.join(['%s'] * len(ids))})")
+        params += ids
+    if tipo_movimiento:
+        condiciones.append("m.tipo_movimiento = %s")
+        params.append(tipo_movimiento)
+    if fecha_desde:
+        condiciones.append("m.fecha >= %s")
+        params.append(fecha_desde)
+    if fecha_hasta:
+        condiciones.append("m.fecha < %s")
+        params.append(_fin_de_rango(fecha_hasta))
+    if proveedor:
+        condiciones.append("p.proveedor = %s")
+        params.append(proveedor)
+    if solo_stock_bajo:
+        condiciones.append(f"p.cantidad < {UMBRAL_STOCK_BAJO}")
+    
+    desde = "movimientos m"
+    if con_producto or proveedor or solo_stock_bajo:
+        desde += " JOIN productos p ON p.id = m.id_producto"
+    return desde, condiciones, params
+
+def _cortar_pagina(filas, tamano_pagina, columna_fecha):
+    """Separar la fila extra de control y calcular el cursor de la página siguiente"""
+    if len(filas) <= tamano_pagina:
+        return filas, None
+    filas = filas[:tamano_pagina]
+    ultima = filas[-1]
+    return filas, (ultima[columna_fecha], ultima['id'])
+
+def _delta_estadisticas(cambios):
+    """Sumar el efecto en las estadísticas de cambios (antes, despues) de productos.
+    
+    Cada estado es (cantidad, precio_unitario) o None si el producto no existe
+    en ese momento. Devuelve (productos, stock, valor, bajo_stock).
+    """
+    productos = stock = bajo_stock = 0
+    valor = Decimal(0)
+    for antes, despues in cambios:
+        for estado, signo in ((antes, -1), (despues, 1)):
+            if estado is None:
+                continue
+            cantidad, precio = estado
+            productos += signo
+            stock += signo * cantidad
+            valor += signo * cantidad * Decimal(str(precio))
+            bajo_stock += signo * (1 if cantidad < UMBRAL_STOCK_BAJO else 0)
+    return productos, stock, valor, bajo_stock
+
+def _resultado_bulk():
+    """Resumen inicial de una operación masiva (duplicados: filas repetidas en un lote)"""
+    return {'procesadas': 0, 'insertados': 0, 'actualizados': 0, 'duplicados': 0,
+            'lotes': 0, 'errores': [], 'segundos': 0.0, 'filas_por_segundo': 0.0}
+
+def _cerrar_resultado_bulk(resultado, inicio):
+    """Completar tiempos y throughput de una operación masiva"""
+    segundos = time.perf_counter() - inicio
+    escritas = resultado['insertados'] + resultado['actualizados']
+    resultado['segundos'] = round(segundos, 3)
+    resultado['filas_por_segundo'] = round(escritas / segundos, 1) if segundos > 0 else 0.0
+    resultado.setdefault('mensaje', (
+        f"{resultado['insertados']} creados, {resultado['actualizados']} actualizados, "
+        f"{len(resultado['errores'])} con error en {resultado['segundos']}s"
+    ))
+    return resultado
 
 class DatabaseManager:
     """Gestor de conexión y operaciones con la base de datos MySQL"""
     
-    def __init__(self):
+    def __init__(self, usar_pool=None, pool_size=None):
         self.connection = None
         self.cursor = None
+        
+        # Modo pool: cada llamada toma una conexión del pool y la devuelve al terminar
+        self.usar_pool = DB_POOL_CONFIG['habilitado'] if usar_pool is None else usar_pool
+        self.pool_size = pool_size or DB_POOL_CONFIG['pool_size']
+        self.pool = None
+        
+        # Conexión/cursor tomados por cada hilo (modo pool) y candado del modo simple
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        
+        # Callbacks (evento, ids) avisados tras cada escritura confirmada
+        self._observadores = []
     
     def connect(self):
         """Establecer conexión con la base de datos"""
         try:
-            self.connection = mysql.connector.connect(**DB_CONFIG)
-            self.cursor = self.connection.cursor(dictionary=True)
-            print("[OK] Conexion exitosa a la base de datos")
+            if self.usar_pool:
+                self.pool = pooling.MySQLConnectionPool(
+                    pool_name=DB_POOL_CONFIG['pool_name'],
+                    pool_size=self.pool_size,
+                    pool_reset_session=True,
+                    **DB_CONFIG
+                )
+                print(f"[OK] Pool de conexiones creado ({self.pool_size} conexiones)")
+            else:
+                self.connection = mysql.connector.connect(**DB_CONFIG)
+                self.cursor = self.connection.cursor(dictionary=True)
+                print("[OK] Conexion exitosa a la base de datos")
             return True
         except Error as err:
             print(f"[ERROR] Error de conexion: {err}")
@@ -23,64 +311,175 @@ class DatabaseManager:
     
     def disconnect(self):
         """Cerrar la conexión con la base de datos"""
-        if self.connection and self.connection.is_connected():
-            self.cursor.close()
-            self.connection.close()
-            print("[OK] Conexion cerrada")
+        if self.pool is not None:
+            # Vaciar el pool con la API pública: tomar cada conexión libre y desconectarla
+            # (get_connection falla con PoolError cuando no quedan). Si una conexión caída
+            # no logra reconectarse se salta y se sigue con las demás; nunca hay más de
+            # pool_size. Las que están en uso en otro hilo se cierran al devolverse y
+            # liberarse el pool.
+            for _ in range(self.pool_size):
+                try:
+                    conexion = self.pool.get_connection()
+                except PoolError:
+                    break
+                except Error:
+                    continue
+                try:
+                    conexion.disconnect()
+                except Error:
+                    pass
+            self.pool = None
+            print("[OK] Pool de conexiones cerrado")
+        # En modo simple se espera a que termine la operación que tenga la conexión compartida
+        with self._lock:
+            if self.connection and self.connection.is_connected():
+                self.cursor.close()
+                self.connection.close()
+                print("[OK] Conexion cerrada")
+    
+    def _tomar_conexion(self):
+        """Tomar una conexión del pool y revalidarla con ping antes de usarla"""
+        limite = time.monotonic() + DB_POOL_CONFIG['espera_maxima']
+        while True:
+            try:
+                conexion = self.pool.get_connection()
+                break
+            except PoolError:
+                # Pool agotado: esperar a que otro hilo devuelva su conexión
+                if time.monotonic() >= limite:
+                    raise
+                time.sleep(0.05)
+        
+        try:
+            conexion.ping(reconnect=True,
+                          attempts=DB_POOL_CONFIG['ping_intentos'],
+                          delay=DB_POOL_CONFIG['ping_espera'])
+        except Error:
+            try:
+                conexion.close()
+            except Error:
+                pass
+            raise
+        return conexion
+    
+    @contextmanager
+    def _sesion(self):
+        """Entregar (conexion, cursor) para una operación.
+        
+        En modo pool cada hilo toma su propia conexión del pool y la devuelve al
+        salir; las llamadas anidadas del mismo hilo reutilizan la ya tomada.
+        En modo simple se usa la conexión compartida, serializada con un candado.
+        """
+        if not self.usar_pool:
+            with self._lock:
+                yield self.connection, self.cursor
+            return
+        
+        sesion = getattr(self._local, 'sesion', None)
+        if sesion is not None:
+            yield sesion
+            return
+        
+        conexion = self._tomar_conexion()
+        cursor = conexion.cursor(dictionary=True)
+        self._local.sesion = (conexion, cursor)
+        try:
+            yield conexion, cursor
+        finally:
+            self._local.sesion = None
+            try:
+                cursor.close()
+            except Error:
+                pass
+            conexion.close()  # Devuelve la conexión al pool
+    
+    def agregar_observador(self, callback):
+        """Registrar callback(evento, ids) que se llama tras cada escritura confirmada.
+        
+        ids es la lista de productos afectados, o None si la operación puede haber
+        cambiado cualquier producto (cargas masivas).
+        """
+        self._observadores.append(callback)
+    
+    def quitar_observador(self, callback):
+        """Dejar de avisar a un callback registrado con agregar_observador"""
+        if callback in self._observadores:
+            self._observadores.remove(callback)
+    
+    def _notificar(self, evento, ids=None):
+        for callback in list(self._observadores):
+            try:
+                callback(evento, ids)
+            except Exception as err:
+                print(f"[ERROR] Observador de '{evento}' falló: {err}")
+    
+    @contextmanager
+    def _transaccion(self):
+        """Sesión que confirma al terminar y revierte si la operación falla"""
+        with self._sesion() as (conexion, cursor):
+            try:
+                yield conexion, cursor
+                conexion.commit()
+            except BaseException:
+                # Cualquier excepción (no solo de MySQL) deja la transacción revertida antes
+                # de que la conexión vuelva al pool o a la sesión del hilo
+                try:
+                    conexion.rollback()
+                except Error:
+                    pass
+                raise
+    
+    def _estado_productos(self, cursor, ids):
+        """Leer y bloquear (cantidad, precio_unitario) de los productos dados"""
+        ids = sorted(set(ids))
+        if not ids:
+            return {}
+        marcadores = ", ".join(["%s"] * len(ids))
+        cursor.execute(
+            f"SELECT id, cantidad, precio_unitario FROM productos WHERE id IN ({marcadores}) FOR UPDATE",
+            ids
+        )
+        return {row['id']: (row['cantidad'], row['precio_unitario']) for row in cursor.fetchall()}
+    
+    def _ajustar_estadisticas(self, cursor, cambios):
+        """Aplicar a la fila de estadisticas el efecto de cambios (antes, despues)"""
+        delta = _delta_estadisticas(cambios)
+        if not any(delta):
+            return
+        cursor.execute("""
+            UPDATE estadisticas
+            SET total_productos = total_productos + %s, stock_total = stock_total + %s,
+                valor_total = valor_total + %s, bajo_stock = bajo_stock + %s
+            WHERE id = 1
+        """, delta)
     
     def create_tables(self):
-        """Crear las tablas necesarias (o resetearlas si ya existen)"""
-        try:
-            # Crear tabla de productos
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS productos (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    nombre VARCHAR(255) NOT NULL,
-                    descripcion TEXT,
-                    cantidad INT NOT NULL DEFAULT 0,
-                    precio_unitario DECIMAL(10, 2) NOT NULL,
-                    proveedor VARCHAR(255),
-                    fecha_registro DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    ultima_actualizacion DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Crear tabla de movimientos
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS movimientos (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    id_producto INT NOT NULL,
-                    tipo_movimiento VARCHAR(50),
-                    cantidad INT NOT NULL,
-                    fecha DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    descripcion TEXT,
-                    FOREIGN KEY (id_producto) REFERENCES productos(id) ON DELETE CASCADE
-                )
-            """)
-            
-            self.connection.commit()
-            print("[OK] Tablas creadas/verificadas exitosamente")
-            return True
-        except Error as err:
-            # Si el error es que las tablas ya existen, no es un problema
-            if "already exists" in str(err):
-                print("[OK] Las tablas ya existen, usando las existentes")
-                return True
+        """Crear o actualizar el esquema aplicando las migraciones pendientes"""
+        try:
+            with self._sesion() as (conexion, cursor):
+                aplicadas = migrations.aplicar_migraciones(conexion, cursor)
+            if aplicadas:
+                print(f"[OK] Esquema actualizado a la versión {aplicadas[-1]}")
             else:
-                print(f"[ERROR] Error al crear tablas: {err}")
-                return False
+                print(f"[OK] Esquema al día (versión {migrations.VERSION_ESQUEMA})")
+        except (Error, RuntimeError) as err:
+            print(f"[ERROR] Error al crear tablas: {err}")
+            return False
+        
+        if ESTADISTICAS_MATERIALIZADAS and not self.recalcular_estadisticas():
+            return False
+        return True
     
     # CRUD de Productos
     def crear_producto(self, nombre, descripcion, cantidad, precio_unitario, proveedor):
         """Crear un nuevo producto"""
         try:
-            query = """
-                INSERT INTO productos 
-                (nombre, descripcion, cantidad, precio_unitario, proveedor) 
-                VALUES (%s, %s, %s, %s, %s)
-            """
-            self.cursor.execute(query, (nombre, descripcion, cantidad, precio_unitario, proveedor))
-            self.connection.commit()
+            with self._transaccion() as (conexion, cursor):
+                cursor.execute(QUERY_INSERTAR_PRODUCTO, (nombre, descripcion, cantidad, precio_unitario, proveedor))
+                id_producto = cursor.lastrowid
+                if ESTADISTICAS_MATERIALIZADAS:
+                    self._ajustar_estadisticas(cursor, [(None, (cantidad, precio_unitario))])
+            self._notificar('producto_creado', [id_producto])
             return True, "Producto creado exitosamente"
         except Error as err:
             return False, f"Error al crear producto: {err}"
@@ -89,8 +488,9 @@ class DatabaseManager:
         """Obtener todos los productos"""
         try:
             query = "SELECT * FROM productos ORDER BY fecha_registro DESC"
-            self.cursor.execute(query)
-            return self.cursor.fetchall()
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(query)
+                return cursor.fetchall()
         except Error as err:
             print(f"Error al obtener productos: {err}")
             return []
@@ -99,24 +499,85 @@ class DatabaseManager:
         """Obtener un producto por ID"""
         try:
             query = "SELECT * FROM productos WHERE id = %s"
-            self.cursor.execute(query, (id_producto,))
-            return self.cursor.fetchone()
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(query, (id_producto,))
+                return cursor.fetchone()
         except Error as err:
             print(f"Error al obtener producto: {err}")
             return None
     
+    def obtener_productos_por_ids(self, ids):
+        """Obtener varios productos por ID en una sola consulta"""
+        ids = sorted(set(ids))
+        if not ids:
+            return []
+        try:
+            marcadores = ", ".join(["%s"] * len(ids))
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(f"SELECT * FROM productos WHERE id IN ({marcadores})", ids)
+                return cursor.fetchall()
+        except Error as err:
+            print(f"Error al obtener productos: {err}")
+            return []
+    
+    def obtener_version_productos(self):
+        """Versión barata de la tabla productos: (total de filas, id máximo, última actualización).
+        
+        Cambia con cualquier alta, baja o modificación, también de otros clientes.
+        Los dos primeros valores solo cambian con altas y bajas. Devuelve None si
+        no se pudo consultar.
+        """
+        try:
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(
+                    "SELECT COUNT(*) AS total, MAX(id) AS ultimo_id, "
+                    "MAX(ultima_actualizacion) AS ultima FROM productos"
+                )
+                fila = cursor.fetchone()
+            return (fila['total'], fila['ultimo_id'], fila['ultima'])
+        except Error as err:
+            print(f"Error al obtener versión de productos: {err}")
+            return None
+    
+    def obtener_productos_modificados(self, desde, limite=None, columnas=None):
+        """Productos con ultima_actualizacion >= desde, del más antiguo al más reciente.
+        
+        Se incluye el límite (>=) para no perder cambios confirmados en el mismo
+        microsegundo que la marca anterior; releerlos no hace daño.
+        """
+        try:
+            proyeccion = _proyeccion(columnas or COLUMNAS_LISTADO_PRODUCTOS, COLUMNAS_SQL_PRODUCTOS,
+                                     ('id', 'ultima_actualizacion'))
+            query = (f"SELECT {proyeccion} FROM productos WHERE ultima_actualizacion >= %s "
+                     "ORDER BY ultima_actualizacion, id")
+            params = [desde]
+            if limite:
+                query += " LIMIT %s"
+                params.append(limite)
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        except Error as err:
+            print(f"Error al obtener productos modificados: {err}")
+            return []
+    
     def actualizar_producto(self, id_producto, nombre, descripcion, cantidad, precio_unitario, proveedor):
         """Actualizar un producto existente"""
         try:
             query = """
-                UPDATE productos 
-                SET nombre = %s, descripcion = %s, cantidad = %s, 
+                UPDATE productos
+                SET nombre = %s, descripcion = %s, cantidad = %s,
                     precio_unitario = %s, proveedor = %s,
-                    ultima_actualizacion = CURRENT_TIMESTAMP
+                    ultima_actualizacion = CURRENT_TIMESTAMP(6)
                 WHERE id = %s
             """
-            self.cursor.execute(query, (nombre, descripcion, cantidad, precio_unitario, proveedor, id_producto))
-            self.connection.commit()
+            with self._transaccion() as (conexion, cursor):
+                if ESTADISTICAS_MATERIALIZADAS:
+                    antes = self._estado_productos(cursor, [id_producto]).get(id_producto)
+                cursor.execute(query, (nombre, descripcion, cantidad, precio_unitario, proveedor, id_producto))
+                if ESTADISTICAS_MATERIALIZADAS and antes is not None:
+                    self._ajustar_estadisticas(cursor, [(antes, (cantidad, precio_unitario))])
+            self._notificar('producto_actualizado', [id_producto])
             return True, "Producto actualizado exitosamente"
         except Error as err:
             return False, f"Error al actualizar producto: {err}"
@@ -125,74 +586,804 @@ class DatabaseManager:
         """Eliminar un producto"""
         try:
             query = "DELETE FROM productos WHERE id = %s"
-            self.cursor.execute(query, (id_producto,))
-            self.connection.commit()
+            with self._transaccion() as (conexion, cursor):
+                if ESTADISTICAS_MATERIALIZADAS:
+                    antes = self._estado_productos(cursor, [id_producto]).get(id_producto)
+                cursor.execute(query, (id_producto,))
+                if ESTADISTICAS_MATERIALIZADAS and antes is not None:
+                    self._ajustar_estadisticas(cursor, [(antes, None)])
+            self._notificar('producto_eliminado', [id_producto])
             return True, "Producto eliminado exitosamente"
         except Error as err:
             return False, f"Error al eliminar producto: {err}"
     
+    # Carga masiva de productos
+    def _normalizar_producto(self, fila, con_id=False):
+        """Validar una fila (dict o secuencia) y devolverla como tupla de columnas"""
+        columnas = (('id',) if con_id else ()) + COLUMNAS_PRODUCTO
+        if isinstance(fila, dict):
+            datos = {c: fila.get(c) for c in columnas}
+        else:
+            valores = list(fila)
+            if len(valores) != len(columnas):
+                raise ValueError(f"Se esperaban {len(columnas)} columnas y llegaron {len(valores)}")
+            datos = dict(zip(columnas, valores))
+        
+        nombre = str(datos['nombre'] or '').strip()
+        if not nombre:
+            raise ValueError("El nombre del producto es requerido")
+        cantidad = int(datos['cantidad'] or 0)
+        precio = Decimal(str(datos['precio_unitario'] if datos['precio_unitario'] is not None else 0))
+        if cantidad < 0 or precio < 0:
+            raise ValueError("Cantidad y Precio no pueden ser negativos")
+        
+        normalizada = (nombre, datos['descripcion'] or '', cantidad, precio,
+                       str(datos['proveedor'] or '').strip())
+        return ((int(datos['id']),) + normalizada) if con_id else normalizada
+    
+    def _validar_lote(self, lote, errores, con_id=False):
+        """Normalizar un lote de (indice, fila) registrando en errores las filas inválidas"""
+        validas = []
+        for indice, fila in lote:
+            try:
+                validas.append((indice, self._normalizar_producto(fila, con_id)))
+            except (ValueError, TypeError, ArithmeticError) as err:
+                errores.append({'fila': indice, 'error': str(err)})
+        return validas
+    
+    def _ids_por_clave_natural(self, cursor, filas):
+        """Mapear (nombre, proveedor) -> id de los productos ya existentes"""
+        nombres = list({fila[0] for fila in filas})
+        marcadores = ", ".join(["%s"] * len(nombres))
+        cursor.execute(
+            f"SELECT id, nombre, COALESCE(proveedor, '') AS proveedor FROM productos "
+            f"WHERE nombre IN ({marcadores}) ORDER BY id",
+            nombres
+        )
+        existentes = {}
+        for row in cursor.fetchall():
+            existentes.setdefault(_clave_natural(row['nombre'], row['proveedor']), row['id'])
+        return existentes
+    
+    def _ids_existentes(self, cursor, ids):
+        """Devolver el subconjunto de ids que existen en productos"""
+        marcadores = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"SELECT id FROM productos WHERE id IN ({marcadores})", list(ids))
+        return {row['id'] for row in cursor.fetchall()}
+    
+    def _actualizar_filas(self, cursor, filas):
+        """Actualizar varias filas (id, columnas...) con un único UPDATE ... JOIN"""
+        seleccion = " UNION ALL ".join(
+            ["SELECT %s AS id, %s AS nombre, %s AS descripcion, %s AS cantidad, "
+             "%s AS precio_unitario, %s AS proveedor"] * len(filas)
+        )
+        query = f"""
+            UPDATE productos p
+            JOIN ({seleccion}) n ON p.id = n.id
+            SET p.nombre = n.nombre, p.descripcion = n.descripcion, p.cantidad = n.cantidad,
+                p.precio_unitario = n.precio_unitario, p.proveedor = n.proveedor,
+                p.ultima_actualizacion = CURRENT_TIMESTAMP(6)
+        """
+        cursor.execute(query, [valor for fila in filas for valor in fila])
+    
+    def _cambios_lote(self, cursor, inserciones, actualizaciones):
+        """Cambios (antes, despues) de un lote de productos para las estadísticas"""
+        cambios = [(None, (fila[2], fila[3])) for _, fila in inserciones]
+        if actualizaciones:
+            antes = self._estado_productos(cursor, [fila[0] for _, fila in actualizaciones])
+            cambios += [(antes.get(fila[0]), (fila[3], fila[4])) for _, fila in actualizaciones]
+        return cambios
+    
+    def _escribir_lote_productos(self, conexion, cursor, inserciones, actualizaciones, resultado):
+        """Escribir un lote en una transacción; si falla, reintentar fila a fila"""
+        try:
+            if ESTADISTICAS_MATERIALIZADAS:
+                cambios = self._cambios_lote(cursor, inserciones, actualizaciones)
+            if inserciones:
+                cursor.executemany(QUERY_INSERTAR_PRODUCTO, [fila for _, fila in inserciones])
+            if actualizaciones:
+                self._actualizar_filas(cursor, [fila for _, fila in actualizaciones])
+            if ESTADISTICAS_MATERIALIZADAS:
+                self._ajustar_estadisticas(cursor, cambios)
+            conexion.commit()
+            resultado['insertados'] += len(inserciones)
+            resultado['actualizados'] += len(actualizaciones)
+            return
+        except Error:
+            conexion.rollback()
+        
+        # Aislar las filas que fallan sin perder el resto del lote
+        for clave, filas in (('insertados', inserciones), ('actualizados', actualizaciones)):
+            for indice, fila in filas:
+                try:
+                    if clave == 'insertados':
+                        if ESTADISTICAS_MATERIALIZADAS:
+                            cambios = self._cambios_lote(cursor, [(indice, fila)], [])
+                        cursor.execute(QUERY_INSERTAR_PRODUCTO, fila)
+                    else:
+                        if ESTADISTICAS_MATERIALIZADAS:
+                            cambios = self._cambios_lote(cursor, [], [(indice, fila)])
+                        self._actualizar_filas(cursor, [fila])
+                    if ESTADISTICAS_MATERIALIZADAS:
+                        self._ajustar_estadisticas(cursor, cambios)
+                    conexion.commit()
+                    resultado[clave] += 1
+                except Error as err:
+                    conexion.rollback()
+                    resultado['errores'].append({'fila': indice, 'error': str(err)})
+    
+    def crear_productos_bulk(self, filas, tamano_lote=None, upsert=False):
+        """Crear productos en lotes (INSERT multi-fila y un commit por lote).
+        
+        Cada fila es un dict con las columnas de productos o una secuencia
+        (nombre, descripcion, cantidad, precio_unitario, proveedor). Con upsert=True
+        los productos que ya existen con el mismo nombre y proveedor se actualizan
+        en lugar de duplicarse. Las filas con error se informan en
+        resultado['errores'] sin abortar el resto de la carga.
+        """
+        tamano_lote = tamano_lote or BULK_CHUNK_SIZE
+        resultado = _resultado_bulk()
+        inicio = time.perf_counter()
+        try:
+            with self._sesion() as (conexion, cursor):
+                for lote in _lotes(filas, tamano_lote):
+                    resultado['lotes'] += 1
+                    resultado['procesadas'] += len(lote)
+                    validas = self._validar_lote(lote, resultado['errores'])
+                    if not validas:
+                        continue
+                    
+                    inserciones, actualizaciones = validas, []
+                    if upsert:
+                        existentes = self._ids_por_clave_natural(cursor, [fila for _, fila in validas])
+                        # Dentro del lote, la última fila de cada clave es la que vale
+                        por_clave = {}
+                        for indice, fila in validas:
+                            por_clave[_clave_natural(fila[0], fila[4])] = (indice, fila)
+                        resultado['duplicados'] += len(validas) - len(por_clave)
+                        inserciones = []
+                        for clave, (indice, fila) in por_clave.items():
+                            if clave in existentes:
+                                actualizaciones.append((indice, (existentes[clave],) + fila))
+                            else:
+                                inserciones.append((indice, fila))
+                    
+                    self._escribir_lote_productos(conexion, cursor, inserciones, actualizaciones, resultado)
+        except Error as err:
+            resultado['mensaje'] = f"Error en la carga masiva de productos: {err}"
+            return False, _cerrar_resultado_bulk(resultado, inicio)
+        finally:
+            if resultado['insertados'] or resultado['actualizados']:
+                self._notificar('productos_bulk')
+        
+        _cerrar_resultado_bulk(resultado, inicio)
+        exito = resultado['insertados'] + resultado['actualizados'] > 0 or not resultado['errores']
+        return exito, resultado
+    
+    def actualizar_productos_bulk(self, filas, tamano_lote=None):
+        """Actualizar productos en lotes (un UPDATE ... JOIN y un commit por lote).
+        
+        Cada fila es un dict con 'id' y las columnas de productos o una secuencia
+        (id, nombre, descripcion, cantidad, precio_unitario, proveedor). Los ids
+        inexistentes y las filas inválidas se informan en resultado['errores'].
+        """
+        tamano_lote = tamano_lote or BULK_CHUNK_SIZE
+        resultado = _resultado_bulk()
+        inicio = time.perf_counter()
+        try:
+            with self._sesion() as (conexion, cursor):
+                for lote in _lotes(filas, tamano_lote):
+                    resultado['lotes'] += 1
+                    resultado['procesadas'] += len(lote)
+                    validas = self._validar_lote(lote, resultado['errores'], con_id=True)
+                    if not validas:
+                        continue
+                    
+                    existentes = self._ids_existentes(cursor, {fila[0] for _, fila in validas})
+                    actualizaciones = []
+                    for indice, fila in validas:
+                        if fila[0] in existentes:
+                            actualizaciones.append((indice, fila))
+                        else:
+                            resultado['errores'].append({'fila': indice, 'error': f"Producto {fila[0]} no existe"})
+                    
+                    self._escribir_lote_productos(conexion, cursor, [], actualizaciones, resultado)
+        except Error as err:
+            resultado['mensaje'] = f"Error en la actualización masiva de productos: {err}"
+            return False, _cerrar_resultado_bulk(resultado, inicio)
+        finally:
+            if resultado['actualizados']:
+                self._notificar('productos_bulk')
+        
+        _cerrar_resultado_bulk(resultado, inicio)
+        return resultado['actualizados'] > 0 or not resultado['errores'], resultado
+    
     # Operaciones de Movimientos de Inventario
     def registrar_movimiento(self, id_producto, tipo_movimiento, cantidad, descripcion=""):
         """Registrar movimiento de inventario"""
         try:
-            # Registrar movimiento
-            query_mov = """
-                INSERT INTO movimientos 
-                (id_producto, tipo_movimiento, cantidad, descripcion) 
-                VALUES (%s, %s, %s, %s)
-            """
-            self.cursor.execute(query_mov, (id_producto, tipo_movimiento, cantidad, descripcion))
-            
             # Actualizar cantidad en productos
             if tipo_movimiento.lower() == "entrada":
                 query_prod = "UPDATE productos SET cantidad = cantidad + %s WHERE id = %s"
+                delta = cantidad
             else:  # salida
                 query_prod = "UPDATE productos SET cantidad = cantidad - %s WHERE id = %s"
+                delta = -cantidad
             
-            self.cursor.execute(query_prod, (cantidad, id_producto))
-            self.connection.commit()
+            with self._transaccion() as (conexion, cursor):
+                if ESTADISTICAS_MATERIALIZADAS:
+                    antes = self._estado_productos(cursor, [id_producto]).get(id_producto)
+                cursor.execute(QUERY_INSERTAR_MOVIMIENTO, (id_producto, tipo_movimiento, cantidad, descripcion))
+                self._acumular_movimiento_diario(cursor, cursor.lastrowid)
+                cursor.execute(query_prod, (cantidad, id_producto))
+                if ESTADISTICAS_MATERIALIZADAS and antes is not None:
+                    self._ajustar_estadisticas(cursor, [(antes, (antes[0] + delta, antes[1]))])
+            self._notificar('movimiento', [id_producto])
             return True, "Movimiento registrado exitosamente"
         except Error as err:
             return False, f"Error al registrar movimiento: {err}"
     
+    def registrar_movimientos_lote(self, movimientos):
+        """Registrar varios movimientos en una sola transacción.
+        
+        Cada movimiento es un dict (id_producto, tipo_movimiento, cantidad,
+        descripcion) o una tupla en ese orden. Los movimientos se insertan con un
+        INSERT multi-fila y el stock se ajusta con un solo UPDATE por producto
+        usando el neto del lote. Si algo falla se revierte el lote completo.
+        """
+        try:
+            filas = [_normalizar_movimiento(m) for m in movimientos]
+        except (ValueError, TypeError, KeyError) as err:
+            return False, f"Movimiento inválido: {err}"
+        if not filas:
+            return True, "No hay movimientos que registrar"
+        
+        # Neto por producto: una sola actualización de stock por producto
+        deltas = {}
+        for id_producto, tipo_movimiento, cantidad, _ in filas:
+            signo = 1 if tipo_movimiento.lower() == "entrada" else -1
+            deltas[id_producto] = deltas.get(id_producto, 0) + signo * cantidad
+        
+        try:
+            with self._transaccion() as (conexion, cursor):
+                if ESTADISTICAS_MATERIALIZADAS:
+                    antes = self._estado_productos(cursor, deltas)
+                # Una fecha de MySQL para todo el lote: el acumulado diario se suma desde
+                # filas y cae en el mismo día que los movimientos insertados
+                cursor.execute("SELECT NOW() AS ahora")
+                ahora = cursor.fetchone()['ahora']
+                cursor.executemany(QUERY_INSERTAR_MOVIMIENTO_CON_FECHA, [fila + (ahora,) for fila in filas])
+                self._sumar_diarios(cursor, filas, ahora.date())
+                # Orden fijo de ids para no provocar interbloqueos entre lotes concurrentes
+                for id_producto in sorted(deltas):
+                    if deltas[id_producto]:
+                        cursor.execute(
+                            "UPDATE productos SET cantidad = cantidad + %s WHERE id = %s",
+                            (deltas[id_producto], id_producto)
+                        )
+                if ESTADISTICAS_MATERIALIZADAS:
+                    self._ajustar_estadisticas(cursor, [
+                        (estado, (estado[0] + deltas[id_producto], estado[1]))
+                        for id_producto, estado in antes.items()
+                    ])
+            self._notificar('movimiento', sorted(deltas))
+            return True, f"{len(filas)} movimientos registrados exitosamente"
+        except Error as err:
+            return False, f"Error al registrar movimientos: {err}"
+    
+    def _acumular_movimiento_diario(self, cursor, id_movimiento):
+        """Sumar al acumulado diario el movimiento recién insertado (INSERT de una fila).
+        
+        Se lee la fecha asignada por MySQL para que el día coincida con el de
+        movimientos aunque la transacción cruce la medianoche.
+        """
+        cursor.execute(
+            migrations.ACUMULAR_MOVIMIENTOS_DIARIOS.format(condicion="id = %s"), (id_movimiento,)
+        )
+    
+    def _sumar_diarios(self, cursor, filas, dia):
+        """Sumar al acumulado diario un lote de movimientos, agregado en memoria por producto.
+        
+        No se deduce qué filas son del lote a partir de lastrowid: con executemany
+        fila a fila o innodb_autoinc_lock_mode=2 los ids no son un bloque contiguo.
+        """
+        grupos = {}
+        for id_producto, tipo_movimiento, cantidad, _ in filas:
+            entradas, salidas, movimientos = grupos.get(id_producto, (0, 0, 0))
+            if tipo_movimiento.lower() == "entrada":
+                entradas += cantidad
+            else:
+                salidas += cantidad
+            grupos[id_producto] = (entradas, salidas, movimientos + 1)
+        cursor.executemany(migrations.SUMAR_MOVIMIENTOS_DIARIOS, [
+            (id_producto, dia, entradas, salidas, entradas - salidas, movimientos)
+            for id_producto, (entradas, salidas, movimientos) in sorted(grupos.items())
+        ])
+    
+    def crear_buffer_movimientos(self, max_movimientos=None, max_espera_ms=None, al_confirmar=None):
+        """Crear un buffer de group commit que registra movimientos por lotes"""
+        return MovementBuffer(self, max_movimientos, max_espera_ms, al_confirmar)
+    
     def obtener_movimientos(self, id_producto=None):
         """Obtener movimientos de inventario"""
         try:
-            if id_producto:
-                query = "SELECT * FROM movimientos WHERE id_producto = %s ORDER BY fecha DESC"
-                self.cursor.execute(query, (id_producto,))
-            else:
-                query = "SELECT * FROM movimientos ORDER BY fecha DESC"
-                self.cursor.execute(query)
-            return self.cursor.fetchall()
+            with self._sesion() as (conexion, cursor):
+                if id_producto:
+                    query = "SELECT * FROM movimientos WHERE id_producto = %s ORDER BY fecha DESC"
+                    cursor.execute(query, (id_producto,))
+                else:
+                    query = "SELECT * FROM movimientos ORDER BY fecha DESC"
+                    cursor.execute(query)
+                return cursor.fetchall()
         except Error as err:
             print(f"Error al obtener movimientos: {err}")
             return []
     
-    def obtener_estadisticas(self):
-        """Obtener estadísticas del inventario"""
+    # Acumulado diario de movimientos (tendencias y reportes por período)
+    def obtener_movimientos_diarios(self, fecha_desde=None, fecha_hasta=None, id_producto=None,
+                                    por_producto=False):
+        """Entradas, salidas y neto por día a partir de movimientos_diarios.
+        
+        Los límites son fechas inclusivas. Sin por_producto se suman todos los
+        productos y hay una fila por día con movimientos; con por_producto=True
+        cada fila incluye además id_producto.
+        """
+        condiciones, params = [], []
+        ids = _lista(id_producto)
+        if ids:
+            condiciones.append(f"id_producto IN ({', '.join(['%s'] * len(ids))})")
+            params += ids
+        if fecha_desde:
+            condiciones.append("dia >= %s")
+            params.append(fecha_desde)
+        if fecha_hasta:
+            condiciones.append("dia <= %s")
+            params.append(fecha_hasta)
+        
+        grupo = "id_producto, dia" if por_producto else "dia"
+        query = f"""
+            SELECT {grupo}, SUM(entradas) AS entradas, SUM(salidas) AS salidas,
+                   SUM(neto) AS neto, SUM(movimientos) AS movimientos
+            FROM movimientos_diarios
+        """
+        if condiciones:
+            query += " WHERE " + " AND ".join(condiciones)
+        query += f" GROUP BY {grupo} ORDER BY dia" + (", id_producto" if por_producto else "")
+        try:
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(query, params)
+                filas = cursor.fetchall()
+            for fila in filas:
+                for columna in ('entradas', 'salidas', 'neto', 'movimientos'):
+                    fila[columna] = int(fila[columna])
+            return filas
+        except Error as err:
+            print(f"Error al obtener movimientos diarios: {err}")
+            return []
+    
+    def reconstruir_movimientos_diarios(self, fecha_desde=None):
+        """Rehacer el acumulado diario desde movimientos (todo, o desde fecha_desde).
+        
+        Sirve para cargar el historial existente o corregir el acumulado después
+        de modificar movimientos a mano. Devuelve (exito, mensaje).
+        """
+        if isinstance(fecha_desde, datetime):
+            fecha_desde = fecha_desde.date()  # Solo días completos
         try:
-            stats = {}
+            with self._transaccion() as (conexion, cursor):
+                if fecha_desde:
+                    cursor.execute("DELETE FROM movimientos_diarios WHERE dia >= %s", (fecha_desde,))
+                    cursor.execute(
+                        migrations.ACUMULAR_MOVIMIENTOS_DIARIOS.format(condicion="fecha >= %s"),
+                        (fecha_desde,)
+                    )
+                else:
+                    cursor.execute("DELETE FROM movimientos_diarios")
+                    cursor.execute(
+                        migrations.ACUMULAR_MOVIMIENTOS_DIARIOS.format(condicion="fecha IS NOT NULL")
+                    )
+                cursor.execute("SELECT COUNT(*) AS total FROM movimientos_diarios")
+                total = cursor.fetchone()['total']
+            return True, f"Acumulado diario reconstruido ({total} filas producto-día)"
+        except Error as err:
+            return False, f"Error al reconstruir movimientos diarios: {err}"
+    
+    # Consultas paginadas (keyset sobre fecha + id)
+    def obtener_productos_pagina(self, tamano_pagina=None, despues_de=None, columnas=None,
+                                 id_producto=None, proveedor=None, fecha_desde=None, fecha_hasta=None):
+        """Obtener una página de productos ordenada por fecha_registro e id descendentes.
+        
+        despues_de es el cursor devuelto por la página anterior (None para la
+        primera). columnas limita la proyección (por defecto sin descripcion).
+        Devuelve (filas, siguiente_cursor); siguiente_cursor es None en la última.
+        """
+        tamano_pagina = tamano_pagina or PAGE_SIZE
+        try:
+            proyeccion = _proyeccion(columnas or COLUMNAS_LISTADO_PRODUCTOS, COLUMNAS_SQL_PRODUCTOS,
+                                     ('fecha_registro', 'id'))
+            condiciones, params = _filtros_productos(id_producto, proveedor, fecha_desde, fecha_hasta)
+            if despues_de is not None:
+                condiciones.append("(fecha_registro < %s OR (fecha_registro = %s AND id < %s))")
+                params += [despues_de[0], despues_de[0], despues_de[1]]
             
-            # Total de productos
-            self.cursor.execute("SELECT COUNT(*) as total FROM productos")
-            stats['total_productos'] = self.cursor.fetchone()['total']
+            query = f"SELECT {proyeccion} FROM productos"
+            if condiciones:
+                query += " WHERE " + " AND ".join(condiciones)
+            query += " ORDER BY fecha_registro DESC, id DESC LIMIT %s"
+            params.append(tamano_pagina + 1)
             
-            # Stock total
-            self.cursor.execute("SELECT SUM(cantidad) as total FROM productos")
-            result = self.cursor.fetchone()
-            stats['stock_total'] = result['total'] if result['total'] else 0
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(query, params)
+                filas = cursor.fetchall()
+            return _cortar_pagina(filas, tamano_pagina, 'fecha_registro')
+        except Error as err:
+            print(f"Error al obtener página de productos: {err}")
+            return [], None
+    
+    def obtener_productos_tras(self, ancla, cantidad, saltar=0, columnas=None, busqueda=None,
+                               orden=None, descendente=True):
+        """Obtener `cantidad` productos a continuación de `ancla` (paginación keyset).
+        
+        ancla es (valor de la columna de orden, id) de una fila ya leída, o None
+        para empezar por el principio. La consulta busca el ancla por índice en
+        lugar de recorrer las filas anteriores con OFFSET; saltar descarta filas
+        después del ancla y solo sirve para llegar a un bloque cercano sin ancla
+        propia. busqueda filtra por nombre, descripción, proveedor o id y orden
+        es una de ORDEN_PRODUCTOS.
+        """
+        orden = orden or 'fecha_registro'
+        clausula_orden = _orden_productos(orden, descendente)
+        try:
+            proyeccion = _proyeccion(columnas or COLUMNAS_LISTADO_PRODUCTOS, COLUMNAS_SQL_PRODUCTOS,
+                                     (orden, 'id'))
+            condiciones, params = _filtro_busqueda(busqueda)
+            if ancla is not None:
+                condicion, valores = _condicion_tras_ancla(orden, ancla, descendente)
+                condiciones.append(condicion)
+                params += valores
+            query = f"SELECT {proyeccion} FROM productos"
+            if condiciones:
+                query += " WHERE " + " AND ".join(condiciones)
+            query += f" ORDER BY {clausula_orden} LIMIT %s"
+            params.append(cantidad)
+            if saltar:
+                query += " OFFSET %s"
+                params.append(saltar)
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        except Error as err:
+            print(f"Error al obtener bloque de productos: {err}")
+            return []
+    
+    def contar_productos(self, busqueda=None):
+        """Cantidad de productos que coinciden con la búsqueda (todos si no hay)"""
+        try:
+            condiciones, params = _filtro_busqueda(busqueda)
+            query = "SELECT COUNT(*) AS total FROM productos"
+            if condiciones:
+                query += " WHERE " + " AND ".join(condiciones)
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(query, params)
+                return cursor.fetchone()['total']
+        except Error as err:
+            print(f"Error al contar productos: {err}")
+            return 0
+    
+    def obtener_movimientos_pagina(self, tamano_pagina=None, despues_de=None, columnas=None,
+                                   id_producto=None, tipo_movimiento=None, fecha_desde=None,
+                                   fecha_hasta=None, proveedor=None):
+        """Obtener una página de movimientos ordenada por fecha e id descendentes.
+        
+        Admite las columnas de movimientos más 'nombre_producto' y 'proveedor'
+        (se resuelven con JOIN a productos solo cuando se piden o se filtra por
+        proveedor). Devuelve (filas, siguiente_cursor) como obtener_productos_pagina.
+        """
+        tamano_pagina = tamano_pagina or PAGE_SIZE
+        try:
+            columnas = columnas or COLUMNAS_LISTADO_MOVIMIENTOS
+            proyeccion = _proyeccion(columnas, COLUMNAS_SQL_MOVIMIENTOS, ('fecha', 'id'))
+            desde, condiciones, params = _filtros_movimientos(
+                id_producto, tipo_movimiento, fecha_desde, fecha_hasta, proveedor,
+                con_producto=bool(set(columnas) & COLUMNAS_JOIN_MOVIMIENTOS)
+            )
+            if despues_de is not None:
+                condiciones.append("(m.fecha < %s OR (m.fecha = %s AND m.id < %s))")
+                params += [despues_de[0], despues_de[0], despues_de[1]]
             
-            # Valor total del inventario
-            self.cursor.execute("SELECT SUM(cantidad * precio_unitario) as valor FROM productos")
-            result = self.cursor.fetchone()
-            stats['valor_total'] = float(result['valor']) if result['valor'] else 0.0
+            query = f"SELECT {proyeccion} FROM {desde}"
+            if condiciones:
+                query += " WHERE " + " AND ".join(condiciones)
+            query += " ORDER BY m.fecha DESC, m.id DESC LIMIT %s"
+            params.append(tamano_pagina + 1)
             
-            # Productos con stock bajo (cantidad < 10)
-            self.cursor.execute("SELECT COUNT(*) as bajo_stock FROM productos WHERE cantidad < 10")
-            stats['bajo_stock'] = self.cursor.fetchone()['bajo_stock']
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(query, params)
+                filas = cursor.fetchall()
+            return _cortar_pagina(filas, tamano_pagina, 'fecha')
+        except Error as err:
+            print(f"Error al obtener página de movimientos: {err}")
+            return [], None
+    
+    # Lectura en streaming para exportaciones y reportes
+    def _iterar_consulta(self, query, params, tamano_lote, por_lotes):
+        """Recorrer una consulta con cursor sin buffer y fetchmany en una conexión propia.
+        
+        La conexión es independiente de la del GUI y del pool, así que un recorrido
+        largo no bloquea el resto de la aplicación. Se cierra al agotar el
+        generador o al cerrarlo antes de tiempo.
+        """
+        conexion = mysql.connector.connect(**DB_CONFIG)
+        cursor = conexion.cursor(dictionary=True, buffered=False)
+        try:
+            cursor.execute(query, params)
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                if por_lotes:
+                    yield filas
+                else:
+                    yield from filas
+        finally:
+            try:
+                cursor.close()
+            except Error:
+                pass  # Quedaban filas sin leer: se descartan al cerrar la conexión
+            conexion.close()
+    
+    def iterar_movimientos(self, tamano_lote=None, por_lotes=False, columnas=None,
+                           id_producto=None, tipo_movimiento=None, fecha_desde=None,
+                           fecha_hasta=None, proveedor=None, solo_stock_bajo=False):
+        """Iterar movimientos (más recientes primero) sin cargarlos todos en memoria.
+        
+        Por defecto cada fila incluye 'nombre_producto' resuelto con JOIN. Con
+        por_lotes=True se entregan listas de hasta tamano_lote filas. Los errores
+        de base de datos se propagan al consumidor.
+        """
+        columnas = columnas or COLUMNAS_STREAM_MOVIMIENTOS
+        desde, condiciones, params = _filtros_movimientos(
+            id_producto, tipo_movimiento, fecha_desde, fecha_hasta, proveedor, solo_stock_bajo,
+            con_producto=bool(set(columnas) & COLUMNAS_JOIN_MOVIMIENTOS)
+        )
+        query = f"SELECT {_proyeccion(columnas, COLUMNAS_SQL_MOVIMIENTOS)} FROM {desde}"
+        if condiciones:
+            query += " WHERE " + " AND ".join(condiciones)
+        query += " ORDER BY m.fecha DESC, m.id DESC"
+        return self._iterar_consulta(query, params, tamano_lote or STREAM_BATCH_SIZE, por_lotes)
+    
+    def iterar_productos(self, tamano_lote=None, por_lotes=False, columnas=None,
+                         id_producto=None, proveedor=None, fecha_desde=None, fecha_hasta=None,
+                         solo_stock_bajo=False):
+        """Iterar productos (más recientes primero) sin cargarlos todos en memoria"""
+        columnas = columnas or tuple(COLUMNAS_SQL_PRODUCTOS)
+        condiciones, params = _filtros_productos(id_producto, proveedor, fecha_desde, fecha_hasta,
+                                                 solo_stock_bajo)
+        query = f"SELECT {_proyeccion(columnas, COLUMNAS_SQL_PRODUCTOS)} FROM productos"
+        if condiciones:
+            query += " WHERE " + " AND ".join(condiciones)
+        query += " ORDER BY fecha_registro DESC, id DESC"
+        return self._iterar_consulta(query, params, tamano_lote or STREAM_BATCH_SIZE, por_lotes)
+    
+    # Totales de reportes filtrados (mismos filtros que los iteradores)
+    def obtener_totales_productos(self, id_producto=None, proveedor=None, fecha_desde=None,
+                                  fecha_hasta=None, solo_stock_bajo=False):
+        """Productos, unidades y valor de los productos que cumplen los filtros.
+        
+        Devuelve None si no se pudo consultar.
+        """
+        condiciones, params = _filtros_productos(id_producto, proveedor, fecha_desde, fecha_hasta,
+                                                 solo_stock_bajo)
+        query = """
+            SELECT COUNT(*) AS productos, COALESCE(SUM(cantidad), 0) AS unidades,
+                   COALESCE(SUM(cantidad * precio_unitario), 0) AS valor
+            FROM productos
+        """
+        if condiciones:
+            query += " WHERE " + " AND ".join(condiciones)
+        try:
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(query, params)
+                fila = cursor.fetchone()
+            return {'productos': int(fila['productos']), 'unidades': int(fila['unidades']),
+                    'valor': float(fila['valor'])}
+        except Error as err:
+            print(f"Error al obtener totales de productos: {err}")
+            return None
+    
+    def obtener_totales_movimientos(self, id_producto=None, tipo_movimiento=None, fecha_desde=None,
+                                    fecha_hasta=None, proveedor=None, solo_stock_bajo=False):
+        """Cantidad de movimientos y unidades de entrada/salida que cumplen los filtros.
+        
+        Se agrupa por tipo en MySQL (a lo sumo dos filas). Devuelve None si no
+        se pudo consultar.
+        """
+        desde, condiciones, params = _filtros_movimientos(
+            id_producto, tipo_movimiento, fecha_desde, fecha_hasta, proveedor, solo_stock_bajo
+        )
+        query = f"""
+            SELECT m.tipo_movimiento, COUNT(*) AS movimientos, COALESCE(SUM(m.cantidad), 0) AS unidades
+            FROM {desde}
+        """
+        if condiciones:
+            query += " WHERE " + " AND ".join(condiciones)
+        query += " GROUP BY m.tipo_movimiento"
+        try:
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(query, params)
+                filas = cursor.fetchall()
+            totales = {'movimientos': 0, 'entradas': 0, 'salidas': 0}
+            for fila in filas:
+                totales['movimientos'] += int(fila['movimientos'])
+                tipo = 'entradas' if (fila['tipo_movimiento'] or '').lower() == 'entrada' else 'salidas'
+                totales[tipo] += int(fila['unidades'])
+            return totales
+        except Error as err:
+            print(f"Error al obtener totales de movimientos: {err}")
+            return None
+    
+    def obtener_estadisticas(self):
+        """Obtener estadísticas del inventario"""
+        try:
+            with self._sesion() as (conexion, cursor):
+                result = None
+                if ESTADISTICAS_MATERIALIZADAS:
+                    # Lectura O(1) de la fila mantenida por las operaciones de escritura
+                    cursor.execute(
+                        "SELECT total_productos, stock_total, valor_total, bajo_stock "
+                        "FROM estadisticas WHERE id = 1"
+                    )
+                    result = cursor.fetchone()
+                if result is None:
+                    cursor.execute(QUERY_ESTADISTICAS)
+                    result = cursor.fetchone()
             
-            return stats
+            return {
+                'total_productos': int(result['total_productos']),
+                'stock_total': int(result['stock_total']),
+                'valor_total': float(result['valor_total']),
+                'bajo_stock': int(result['bajo_stock']),
+            }
         except Error as err:
             print(f"Error al obtener estadísticas: {err}")
             return {}
+    
+    # Agregados para gráficos
+    def obtener_top_productos(self, limite=10):
+        """Productos con más unidades, de mayor a menor (recorre idx_productos_cantidad)"""
+        try:
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(
+                    "SELECT id, nombre, cantidad FROM productos "
+                    "ORDER BY cantidad DESC, id DESC LIMIT %s",
+                    (limite,)
+                )
+                return cursor.fetchall()
+        except Error as err:
+            print(f"Error al obtener top de productos: {err}")
+            return []
+    
+    def obtener_stock_por_proveedor(self):
+        """Stock total por proveedor como lista de (proveedor, stock), de mayor a menor.
+        
+        Proveedor NULL o vacío se agrupa como 'Sin proveedor'. El GROUP BY se
+        resuelve con el índice (proveedor, cantidad) sin leer las filas.
+        """
+        try:
+            with self._sesion() as (conexion, cursor):
+                cursor.execute(
+                    "SELECT proveedor, COALESCE(SUM(cantidad), 0) AS stock FROM productos GROUP BY proveedor"
+                )
+                filas = cursor.fetchall()
+            stock = {}
+            for fila in filas:
+                proveedor = fila['proveedor'] or 'Sin proveedor'
+                stock[proveedor] = stock.get(proveedor, 0) + int(fila['stock'])
+            return sorted(stock.items(), key=lambda item: item[1], reverse=True)
+        except Error as err:
+            print(f"Error al obtener stock por proveedor: {err}")
+            return []
+    
+    def obtener_version_datos(self):
+        """Versión de productos y movimientos juntos, para invalidar gráficos y reportes.
+        
+        Devuelve None si no se pudo consultar.
+        """
+        try:
+            with self._sesion() as (conexion, cursor):
+                cursor.execute("""
+                    SELECT COUNT(*) AS total, MAX(id) AS ultimo_id,
+                           MAX(ultima_actualizacion) AS ultima,
+                           (SELECT MAX(id) FROM movimientos) AS ultimo_movimiento
+                    FROM productos
+                """)
+                fila = cursor.fetchone()
+            return (fila['total'], fila['ultimo_id'], fila['ultima'], fila['ultimo_movimiento'])
+        except Error as err:
+            print(f"Error al obtener versión de datos: {err}")
+            return None
+    
+    def recalcular_estadisticas(self):
+        """Reconstruir la fila de estadisticas a partir de la tabla de productos"""
+        try:
+            with self._transaccion() as (conexion, cursor):
+                cursor.execute(f"""
+                    REPLACE INTO estadisticas (id, total_productos, stock_total, valor_total, bajo_stock)
+                    SELECT 1, total_productos, stock_total, valor_total, bajo_stock
+                    FROM ({QUERY_ESTADISTICAS}) AS actual
+                """)
+            return True
+        except Error as err:
+            print(f"[ERROR] Error al recalcular estadísticas: {err}")
+            return False
+
+class MovementBuffer:
+    """Buffer de group commit para movimientos de inventario.
+    
+    Acumula movimientos y los confirma con registrar_movimientos_lote al juntar
+    max_movimientos o cuando pasan max_espera_ms desde el primero pendiente.
+    al_confirmar(exito, mensaje, movimientos) se llama tras cada lote, desde el
+    hilo que lo confirmó (el temporizador es un hilo aparte).
+    """
+    
+    def __init__(self, db, max_movimientos=None, max_espera_ms=None, al_confirmar=None):
+        self.db = db
+        self.max_movimientos = max_movimientos or GROUP_COMMIT_CONFIG['max_movimientos']
+        self.max_espera_ms = (GROUP_COMMIT_CONFIG['max_espera_ms']
+                              if max_espera_ms is None else max_espera_ms)
+        self.al_confirmar = al_confirmar
+        self._pendientes = []
+        self._temporizador = None
+        self._lock = threading.Lock()
+        # Serializa los lotes para que se confirmen en el orden en que llegaron
+        self._lock_confirmar = threading.Lock()
+    
+    def agregar(self, id_producto, tipo_movimiento, cantidad, descripcion=""):
+        """Encolar un movimiento; confirma el lote si alcanza max_movimientos"""
+        movimiento = _normalizar_movimiento((id_producto, tipo_movimiento, cantidad, descripcion))
+        with self._lock:
+            self._pendientes.append(movimiento)
+            lleno = len(self._pendientes) >= self.max_movimientos
+            if not lleno and self._temporizador is None and self.max_espera_ms > 0:
+                self._temporizador = threading.Timer(self.max_espera_ms / 1000, self.flush)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+        
+        if lleno:
+            return self.flush()
+        return True, "Movimiento en cola"
+    
+    def pendientes(self):
+        """Cantidad de movimientos aún sin confirmar"""
+        with self._lock:
+            return len(self._pendientes)
+    
+    def flush(self):
+        """Confirmar ya todos los movimientos pendientes en un solo lote"""
+        with self._lock_confirmar:
+            with self._lock:
+                lote, self._pendientes = self._pendientes, []
+                if self._temporizador is not None:
+                    self._temporizador.cancel()
+                    self._temporizador = None
+            
+            if not lote:
+                return True, "No hay movimientos pendientes"
+            
+            exito, mensaje = self.db.registrar_movimientos_lote(lote)
+            if not exito:
+                print(f"[ERROR] Lote de {len(lote)} movimientos no registrado: {mensaje}")
+            if self.al_confirmar:
+                self.al_confirmar(exito, mensaje, lote)
+            return exito, mensaje
+    
+    def cerrar(self):
+        """Confirmar lo pendiente antes de dejar de usar el buffer"""
+        return self.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
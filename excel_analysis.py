@@ -1,10 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+import numpy as np
 import pandas as pd
 import matplotlib
 matplotlib.use('TkAgg')
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 
 class ExcelAnalyzer:
     """Ventana para cargar un archivo Excel, previsualizar datos y generar gráficos."""
@@ -13,6 +14,9 @@ class ExcelAnalyzer:
         self.df = None
         self.window = None
         self.canvas = None
+        self.fig = None
+        self.ax = None
+        self._plot_state = None     # (clave, artistas) del ultimo grafico de lineas/barras/dispersion
         self.tree = None
         self.file_label = None
         self.x_combo = None
@@ -93,15 +97,16 @@ class ExcelAnalyzer:
             self._create_window()
 
     def load_file(self):
-        path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx;*.xls")])
+        path = filedialog.askopenfilename(filetypes=[
+            ("Datos", "*.xlsx;*.xls;*.csv;*.csv.gz;*.parquet"),
+            ("Excel files", "*.xlsx;*.xls"),
+            ("CSV", "*.csv;*.csv.gz"),
+            ("Parquet", "*.parquet"),
+        ])
         if not path:
             return
         try:
-            # Try reading with openpyxl engine first (for .xlsx)
-            if path.endswith('.xlsx'):
-                self.df = pd.read_excel(path, engine='openpyxl')
-            else:
-                self.df = pd.read_excel(path)
+            self.df = self.read_file(path)
             
             # Validate
             if self.df is None or self.df.empty:
@@ -131,6 +136,23 @@ class ExcelAnalyzer:
         
         messagebox.showinfo("Exito", f"Archivo cargado exitosamente.\n{len(self.df)} filas, {len(self.df.columns)} columnas.")
 
+    @staticmethod
+    def read_file(path):
+        """Leer un archivo de datos en un DataFrame según su extensión.
+        
+        Los CSV (también .csv.gz) y Parquet de las exportaciones de datos se
+        leen mucho más rápido que un .xlsx con el mismo contenido.
+        """
+        nombre = path.lower()
+        if nombre.endswith('.csv') or nombre.endswith('.csv.gz'):
+            # La compresión gzip se detecta por la extensión
+            return pd.read_csv(path)
+        if nombre.endswith('.parquet'):
+            return pd.read_parquet(path)
+        if nombre.endswith('.xlsx'):
+            return pd.read_excel(path, engine='openpyxl')
+        return pd.read_excel(path)
+
     def populate_preview(self):
         # Validar que tree exista
         if self.tree is None:
@@ -168,16 +190,55 @@ class ExcelAnalyzer:
         
         print(f"[OK] Preview con {min(50, len(self.df))} filas mostradas")
 
+    def _ensure_canvas(self):
+        """Crear la figura y el lienzo una sola vez; los graficos siguientes los reutilizan"""
+        if self.canvas is None and self.fig_frame is not None:
+            self.fig = Figure(figsize=(8, 5), dpi=100)
+            self.ax = self.fig.add_subplot()
+            self.canvas = FigureCanvasTkAgg(self.fig, master=self.fig_frame)
+            self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        return self.canvas is not None
+
     def clear_plot(self):
         if self.canvas is not None:
             try:
-                self.canvas.get_tk_widget().destroy()
-                self.canvas = None
-                plt.close('all')
+                self.ax.clear()
+                self._plot_state = None
+                self.canvas.draw_idle()
                 print("[OK] Grafico limpiado")
             except Exception as e:
                 print(f"[ERROR] Error limpiando grafico: {e}")
 
+    def _update_plot(self, key, x_data, y_series):
+        """Cargar los datos nuevos en los artistas del grafico anterior si es del mismo tipo.
+        
+        Solo con eje X numerico (las categorias de texto se recalculan al redibujar);
+        las barras ademas necesitan la misma cantidad de filas.
+        """
+        if self._plot_state is None or self._plot_state[0] != key:
+            return False
+        if not isinstance(x_data, range) and not pd.api.types.is_numeric_dtype(x_data):
+            return False
+        gtype = key[0]
+        x_values = np.asarray(x_data, dtype=float)
+        artists = self._plot_state[1]
+        if gtype == 'bar' and any(len(artist.patches) != len(x_values) for artist in artists):
+            return False
+        
+        for artist, y_data in zip(artists, y_series):
+            y_values = np.asarray(y_data, dtype=float)
+            if gtype == 'line':
+                artist.set_data(x_values, y_values)
+            elif gtype == 'bar':
+                for patch, x, y in zip(artist.patches, x_values, np.nan_to_num(y_values)):
+                    patch.set_x(x - patch.get_width() / 2)
+                    patch.set_height(y)
+            elif gtype == 'scatter':
+                artist.set_offsets(np.column_stack((x_values, y_values)))
+        self.ax.relim()
+        self.ax.autoscale_view()
+        return True
+
     def generate_plot(self):
         if self.df is None or self.df.empty:
             messagebox.showwarning("Advertencia", "Primero cargue un archivo Excel valido.")
@@ -198,19 +259,11 @@ class ExcelAnalyzer:
         gtype = self.type_combo.get().lower()
 
         try:
-            # Limpiar figuras previas
-            plt.close('all')
-            
-            # Destruir canvas anterior si existe
-            if self.canvas is not None:
-                try:
-                    self.canvas.get_tk_widget().destroy()
-                except:
-                    pass
-                self.canvas = None
-            
-            # Crear nueva figura
-            fig, ax = plt.subplots(figsize=(8, 5), dpi=100)
+            if not self._ensure_canvas():
+                print("[ERROR] fig_frame no inicializado o es None")
+                messagebox.showerror("Error", "No se pudo embeber el grafico")
+                return
+            ax = self.ax
 
             if gtype == 'pie':
                 if len(y_cols) != 1:
@@ -231,8 +284,11 @@ class ExcelAnalyzer:
                     messagebox.showwarning("Advertencia", "No hay valores numericos validos para graficar.")
                     return
                 
+                ax.clear()
                 ax.pie(grouped, labels=grouped.index, autopct='%1.1f%%')
                 ax.set_title(f'Distribucion de {ycol}')
+                self._plot_state = None
+                self.fig.tight_layout()
             else:
                 if x_col and x_col in self.df.columns:
                     x_data = self.df[x_col]
@@ -245,37 +301,34 @@ class ExcelAnalyzer:
                     if col not in self.df.columns:
                         messagebox.showwarning("Advertencia", f"Columna '{col}' no encontrada.")
                         return
-                    
-                    y_data = pd.to_numeric(self.df[col], errors='coerce')
-                    
-                    if gtype == 'line':
-                        ax.plot(x_data, y_data, label=col, marker='o', linewidth=2)
-                    elif gtype == 'bar':
-                        ax.bar(x_data, y_data, label=col, alpha=0.7)
-                    elif gtype == 'scatter':
-                        ax.scatter(x_data, y_data, label=col, alpha=0.6, s=50)
                 
-                ax.set_xlabel(x_label)
-                ax.set_ylabel(','.join(y_cols))
-                ax.legend()
-                ax.set_title(f'Grafico de {",".join(y_cols)}')
-                ax.grid(True, alpha=0.3)
-
-            fig.tight_layout()
-
-            # Embeber canvas en fig_frame
-            if self.fig_frame is not None:
-                # Crear y embeber canvas
-                self.canvas = FigureCanvasTkAgg(fig, master=self.fig_frame)
-                self.canvas.draw()
-                widget = self.canvas.get_tk_widget()
-                widget.pack(fill=tk.BOTH, expand=True)
+                y_series = [pd.to_numeric(self.df[col], errors='coerce') for col in y_cols]
+                # Mismo tipo y mismas columnas: se reutilizan los artistas con los datos nuevos
+                key = (gtype, x_label, tuple(y_cols))
                 
-                print(f"[OK] Grafico generado exitosamente: {gtype.title()}")
-                messagebox.showinfo("Exito", "Grafico generado correctamente")
-            else:
-                print("[ERROR] fig_frame no inicializado o es None")
-                messagebox.showerror("Error", "No se pudo embeber el grafico")
+                if not self._update_plot(key, x_data, y_series):
+                    ax.clear()
+                    artists = []
+                    for col, y_data in zip(y_cols, y_series):
+                        if gtype == 'line':
+                            artists.append(ax.plot(x_data, y_data, label=col, marker='o', linewidth=2)[0])
+                        elif gtype == 'bar':
+                            artists.append(ax.bar(x_data, y_data, label=col, alpha=0.7))
+                        elif gtype == 'scatter':
+                            artists.append(ax.scatter(x_data, y_data, label=col, alpha=0.6, s=50))
+                    
+                    ax.set_xlabel(x_label)
+                    ax.set_ylabel(','.join(y_cols))
+                    ax.legend()
+                    ax.set_title(f'Grafico de {",".join(y_cols)}')
+                    ax.grid(True, alpha=0.3)
+                    self._plot_state = (key, artists)
+                    self.fig.tight_layout()
+
+            self.canvas.draw_idle()
+            
+            print(f"[OK] Grafico generado exitosamente: {gtype.title()}")
+            messagebox.showinfo("Exito", "Grafico generado correctamente")
                 
         except Exception as e:
             print(f"[ERROR] Excepcion detallada: {type(e).__name__}: {str(e)}")
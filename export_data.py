@@ -0,0 +1,236 @@
+import csv
+import gzip
+import importlib.util
+import io
+import os
+import threading
+import zipfile
+from itertools import islice
+from config import REPORTS_PATH, EXPORT_DATOS_CONFIG
+from report_cache import ruta_unica
+
+# Columnas de las exportaciones: (encabezado, tipo del dato, ancho y estilo en
+# Excel). Las comparten ExcelExporter y DataExporter, así un CSV o Parquet
+# tiene las mismas columnas que la hoja equivalente del libro Excel.
+COLUMNAS_INVENTARIO = (
+    ("ID", 'entero', 8, 'celda_centro'),
+    ("Nombre", 'texto', 25, 'celda'),
+    ("Descripción", 'texto', 30, 'celda'),
+    ("Cantidad", 'entero', 12, 'celda_centro'),
+    ("Precio Unitario", 'decimal', 15, 'celda_moneda'),
+    ("Valor Total", 'decimal', 15, 'celda_moneda'),
+    ("Proveedor", 'texto', 20, 'celda'),
+    ("Fecha Registro", 'fecha', 18, 'celda_fecha'),
+    ("Última Actualización", 'fecha', 18, 'celda_fecha'),
+)
+COLUMNAS_MOVIMIENTOS = (
+    ("ID Movimiento", 'entero', 15, 'celda_centro'),
+    ("Producto", 'texto', 25, 'celda'),
+    ("Tipo", 'texto', 15, 'celda'),
+    ("Cantidad", 'entero', 12, 'celda_centro'),
+    ("Fecha", 'fecha', 18, 'celda_fecha'),
+    ("Descripción", 'texto', 30, 'celda'),
+)
+
+# Tipo de pandas de cada tipo de columna (esquema fijo para todos los row groups de Parquet)
+TIPOS_PANDAS = {'entero': 'Int64', 'decimal': 'float64', 'texto': 'string'}
+
+FORMATOS = ('csv', 'csv.gz', 'parquet')
+
+def fila_producto(producto):
+    cantidad = producto.get('cantidad', 0)
+    precio = float(producto.get('precio_unitario', 0))
+    return [
+        producto.get('id'),
+        producto.get('nombre', 'N/A'),
+        producto.get('descripcion', ''),
+        cantidad,
+        precio,
+        float(cantidad) * precio,
+        producto.get('proveedor', 'N/A'),
+        producto.get('fecha_registro', ''),
+        producto.get('ultima_actualizacion', ''),
+    ]
+
+def fila_movimiento(mov):
+    return [
+        mov.get('id'),
+        mov.get('nombre_producto') or 'N/A',
+        mov.get('tipo_movimiento', 'N/A'),
+        mov.get('cantidad', 0),
+        mov.get('fecha', ''),
+        mov.get('descripcion', ''),
+    ]
+
+def motor_parquet():
+    """'pyarrow' o 'fastparquet' según lo instalado; None si falta pandas o no hay motor"""
+    if importlib.util.find_spec('pandas') is None:
+        return None
+    for motor in ('pyarrow', 'fastparquet'):
+        if importlib.util.find_spec(motor) is not None:
+            return motor
+    return None
+
+def _escribir_csv(archivo, columnas, filas):
+    """Encabezado y filas en un archivo de texto ya abierto (csv.writer recorre el iterador en C)"""
+    escritor = csv.writer(archivo)
+    escritor.writerow([encabezado for encabezado, *_ in columnas])
+    escritor.writerows(filas)
+
+def _marco(pd, columnas, filas):
+    """DataFrame de un grupo de filas con el tipo de cada columna fijado"""
+    marco = pd.DataFrame(filas, columns=[encabezado for encabezado, *_ in columnas])
+    for encabezado, tipo, *_ in columnas:
+        if tipo == 'fecha':
+            marco[encabezado] = pd.to_datetime(marco[encabezado], errors='coerce')
+        else:
+            marco[encabezado] = marco[encabezado].astype(TIPOS_PANDAS[tipo])
+    return marco
+
+def _escribir_parquet(ruta, columnas, filas, motor):
+    """Escribir las filas en grupos de filas_por_grupo (un row group cada uno).
+    
+    Solo un grupo está en memoria a la vez: con pyarrow se agregan a un
+    ParquetWriter abierto y con fastparquet se usa append sobre el archivo.
+    """
+    import pandas as pd
+    filas = iter(filas)
+    tamano = EXPORT_DATOS_CONFIG['filas_por_grupo']
+    compresion = EXPORT_DATOS_CONFIG['compresion_parquet']
+    escritor = None
+    total = 0
+    try:
+        while True:
+            lote = list(islice(filas, tamano))
+            if not lote and total:
+                break
+            marco = _marco(pd, columnas, lote)
+            if motor == 'pyarrow':
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                tabla = pa.Table.from_pandas(marco, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(ruta, tabla.schema, compression=compresion)
+                escritor.write_table(tabla)
+            else:
+                marco.to_parquet(ruta, engine='fastparquet', compression=compresion,
+                                 index=False, append=total > 0)
+            total += len(lote)
+            if len(lote) < tamano:
+                break
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+class DataExporter:
+    """Exportaciones de datos crudos para BI: CSV, CSV con gzip y Parquet.
+    
+    Escriben las mismas columnas que ExcelExporter pero sin estilos. El CSV se
+    escribe fila a fila desde el iterador (cursor en streaming) y el Parquet
+    por grupos de filas, así la memoria no depende del tamaño. La exportación
+    completa es un .zip con un archivo por tabla. Parquet necesita pandas con
+    pyarrow o fastparquet.
+    """
+    
+    def __init__(self, directorio=None, formato=None):
+        self.directorio = directorio or REPORTS_PATH
+        self.formato = formato or EXPORT_DATOS_CONFIG['formato']
+        if not os.path.exists(self.directorio):
+            os.makedirs(self.directorio)
+        self._hilo = threading.local()
+    
+    def _ruta(self, prefijo, extension):
+        """Ruta del archivo nuevo dentro del directorio de salida (queda en ultimo_archivo)"""
+        self._hilo.ultimo_archivo = ruta_unica(self.directorio, prefijo, extension)
+        return self._hilo.ultimo_archivo
+    
+    @property
+    def ultimo_archivo(self):
+        """Último archivo generado desde el hilo actual (los hilos comparten la instancia)"""
+        return getattr(self._hilo, 'ultimo_archivo', None)
+    
+    def _validar(self, formato):
+        """Mensaje de error si el formato no se puede escribir, o None"""
+        if formato not in FORMATOS:
+            return f"Formato desconocido '{formato}' (opciones: {', '.join(FORMATOS)})"
+        if formato == 'parquet' and motor_parquet() is None:
+            return "Para exportar a Parquet se necesita pandas con pyarrow o fastparquet (pip install pyarrow)"
+        return None
+    
+    def _exportar_tabla(self, prefijo, columnas, filas, formato):
+        formato = formato or self.formato
+        error = self._validar(formato)
+        if error:
+            return False, error
+        ruta = self._ruta(prefijo, formato)
+        try:
+            if formato == 'parquet':
+                _escribir_parquet(ruta, columnas, filas, motor_parquet())
+            elif formato == 'csv.gz':
+                with gzip.open(ruta, 'wt', encoding='utf-8', newline='',
+                               compresslevel=EXPORT_DATOS_CONFIG['nivel_gzip']) as archivo:
+                    _escribir_csv(archivo, columnas, filas)
+            else:
+                with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+                    _escribir_csv(archivo, columnas, filas)
+            return True, ruta
+        except Exception:
+            # No dejar un archivo a medio escribir (p. ej. si se cortó el cursor)
+            if os.path.exists(ruta):
+                os.remove(ruta)
+            raise
+    
+    def exportar_inventario(self, productos, formato=None):
+        try:
+            return self._exportar_tabla("Inventario", COLUMNAS_INVENTARIO,
+                                        map(fila_producto, productos), formato)
+        except Exception as err:
+            return False, f"Error al exportar inventario: {str(err)}"
+    
+    def exportar_movimientos(self, movimientos, formato=None):
+        try:
+            return self._exportar_tabla("Movimientos", COLUMNAS_MOVIMIENTOS,
+                                        map(fila_movimiento, movimientos), formato)
+        except Exception as err:
+            return False, f"Error al exportar movimientos: {str(err)}"
+    
+    def exportar_completo(self, productos, movimientos, formato=None):
+        """Un .zip con Inventario y Movimientos en el formato pedido.
+        
+        Con csv.gz los CSV van comprimidos dentro del zip (deflate) y con csv
+        sin comprimir. Los Parquet ya vienen comprimidos: se escriben a un
+        temporal y se guardan en el zip tal cual.
+        """
+        formato = formato or self.formato
+        error = self._validar(formato)
+        if error:
+            return False, error
+        ruta = self._ruta("Inventario_Completo", 'zip')
+        compresion = zipfile.ZIP_DEFLATED if formato == 'csv.gz' else zipfile.ZIP_STORED
+        extension = 'parquet' if formato == 'parquet' else 'csv'
+        try:
+            with zipfile.ZipFile(ruta, 'w', compression=compresion,
+                                 compresslevel=EXPORT_DATOS_CONFIG['nivel_gzip']) as archivo_zip:
+                # Los productos se recorren completos antes de abrir el recorrido de movimientos
+                for nombre, columnas, filas in (
+                    ("Inventario", COLUMNAS_INVENTARIO, map(fila_producto, productos)),
+                    ("Movimientos", COLUMNAS_MOVIMIENTOS, map(fila_movimiento, movimientos)),
+                ):
+                    miembro = f"{nombre}.{extension}"
+                    if formato == 'parquet':
+                        temporal = f"{ruta}.{nombre}.tmp"
+                        try:
+                            _escribir_parquet(temporal, columnas, filas, motor_parquet())
+                            archivo_zip.write(temporal, miembro)
+                        finally:
+                            if os.path.exists(temporal):
+                                os.remove(temporal)
+                    else:
+                        with io.TextIOWrapper(archivo_zip.open(miembro, 'w', force_zip64=True),
+                                              encoding='utf-8', newline='') as archivo:
+                            _escribir_csv(archivo, columnas, filas)
+            return True, ruta
+        except Exception as err:
+            if os.path.exists(ruta):
+                os.remove(ruta)
+            return False, f"Error al exportar datos completos: {str(err)}"
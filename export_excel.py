@@ -1,81 +1,124 @@
 import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 from datetime import datetime
 import os
+import threading
 from config import REPORTS_PATH
+from report_cache import ruta_unica
+from export_data import COLUMNAS_INVENTARIO, COLUMNAS_MOVIMIENTOS, fila_producto, fila_movimiento
+
+BORDE = Border(
+    left=Side(style="thin"),
+    right=Side(style="thin"),
+    top=Side(style="thin"),
+    bottom=Side(style="thin")
+)
+
+def _relleno(color):
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+# Estilos con nombre de los libros exportados. Se registran en cada libro
+# (_registrar_estilos) y las celdas solo guardan el nombre: openpyxl escribe
+# un único estilo por nombre en lugar de uno por celda.
+ESTILOS = {
+    'encabezado_inventario': dict(
+        font=Font(bold=True, color="FFFFFF", size=12), fill=_relleno("1f4788"), border=BORDE,
+        alignment=Alignment(horizontal="center", vertical="center", wrap_text=True)
+    ),
+    'encabezado_movimientos': dict(
+        font=Font(bold=True, color="FFFFFF", size=12), fill=_relleno("2a9d8f"), border=BORDE,
+        alignment=Alignment(horizontal="center", vertical="center", wrap_text=True)
+    ),
+    'celda': dict(border=BORDE),
+    'celda_centro': dict(border=BORDE, alignment=Alignment(horizontal="center")),
+    'celda_moneda': dict(border=BORDE, alignment=Alignment(horizontal="right"), number_format='$#,##0.00'),
+    'celda_fecha': dict(border=BORDE, number_format='yyyy-mm-dd hh:mm:ss'),
+    'resumen_titulo': dict(
+        font=Font(bold=True, size=14, color="FFFFFF"), fill=_relleno("1f4788"),
+        alignment=Alignment(horizontal="center", vertical="center")
+    ),
+    'resumen_seccion': dict(font=Font(bold=True, size=11)),
+    'resumen_moneda': dict(number_format='$#,##0.00'),
+}
+
+def _registrar_estilos(libro):
+    """Agregar al libro los estilos con nombre (objetos propios: los hilos no comparten libros)"""
+    for nombre, atributos in ESTILOS.items():
+        libro.add_named_style(NamedStyle(name=nombre, **atributos))
+
+def _celda(hoja, valor, estilo=None):
+    celda = WriteOnlyCell(hoja, value=valor)
+    if estilo:
+        celda.style = estilo
+    return celda
+
+def _crear_hoja(libro, titulo, columnas, estilo_encabezado):
+    """Hoja write-only con anchos, paneles fijos y encabezado ya escritos.
+    
+    Los anchos y freeze_panes deben definirse antes de la primera fila: en
+    modo write-only se escriben al empezar la hoja.
+    """
+    hoja = libro.create_sheet(titulo)
+    for indice, (_, _, ancho, _) in enumerate(columnas, 1):
+        hoja.column_dimensions[get_column_letter(indice)].width = ancho
+    hoja.freeze_panes = "A2"
+    hoja.append([_celda(hoja, encabezado, estilo_encabezado) for encabezado, *_ in columnas])
+    return hoja
+
+def _escribir_filas(hoja, columnas, filas):
+    """Agregar filas (listas de valores) a medida que llegan; devuelve cuántas se escribieron.
+    
+    Hay una celda con estilo por columna y se reutiliza en todas las filas:
+    append() escribe la fila antes de volver, así por fila solo cambian los
+    valores y el estilo se resuelve una vez por columna.
+    """
+    celdas = [_celda(hoja, None, estilo) for *_, estilo in columnas]
+    total = 0
+    for valores in filas:
+        for celda, valor in zip(celdas, valores):
+            celda.value = valor
+        hoja.append(celdas)
+        total += 1
+    return total
 
 class ExcelExporter:
+    """Exportaciones a Excel en modo write-only de openpyxl.
+    
+    Las filas se escriben a medida que llega el iterador (productos o
+    movimientos en streaming) y no quedan en memoria: el costo es por fila y
+    la memoria no crece con el tamaño de la exportación.
+    """
+    
+    def __init__(self, directorio=None):
+        self.directorio = directorio or REPORTS_PATH
+        if not os.path.exists(self.directorio):
+            os.makedirs(self.directorio)
+        self._hilo = threading.local()
+    
+    def _ruta(self, prefijo):
+        """Ruta del libro nuevo dentro del directorio de salida (queda en ultimo_archivo)"""
+        self._hilo.ultimo_archivo = ruta_unica(self.directorio, prefijo, 'xlsx')
+        return self._hilo.ultimo_archivo
     
-    def __init__(self):
-        if not os.path.exists(REPORTS_PATH):
-            os.makedirs(REPORTS_PATH)
+    @property
+    def ultimo_archivo(self):
+        """Último archivo generado desde el hilo actual (los hilos comparten la instancia)"""
+        return getattr(self._hilo, 'ultimo_archivo', None)
+    
+    def _libro(self):
+        libro = openpyxl.Workbook(write_only=True)
+        _registrar_estilos(libro)
+        return libro
     
     def exportar_inventario(self, productos):
         try:
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Inventario"
-            
-            header_fill = PatternFill(start_color="1f4788", end_color="1f4788", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            
-            border = Border(
-                left=Side(style="thin"),
-                right=Side(style="thin"),
-                top=Side(style="thin"),
-                bottom=Side(style="thin")
-            )
-            
-            headers = ["ID", "Nombre", "Descripción", "Cantidad", "Precio Unitario", 
-                      "Valor Total", "Proveedor", "Fecha Registro", "Última Actualización"]
-            
-            for col_num, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_num)
-                cell.value = header
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
-                cell.border = border
-            
-            for row_num, producto in enumerate(productos, 2):
-                datos_fila = [
-                    producto.get('id'),
-                    producto.get('nombre', 'N/A'),
-                    producto.get('descripcion', ''),
-                    producto.get('cantidad', 0),
-                    float(producto.get('precio_unitario', 0)),
-                    float(producto.get('cantidad', 0)) * float(producto.get('precio_unitario', 0)),
-                    producto.get('proveedor', 'N/A'),
-                    producto.get('fecha_registro', ''),
-                    producto.get('ultima_actualizacion', ''),
-                ]
-                
-                for col_num, valor in enumerate(datos_fila, 1):
-                    cell = ws.cell(row=row_num, column=col_num)
-                    cell.value = valor
-                    cell.border = border
-                    
-                    if col_num in [1, 4]:
-                        cell.alignment = Alignment(horizontal="center")
-                    elif col_num in [5, 6]:
-                        cell.number_format = '$#,##0.00'
-                        cell.alignment = Alignment(horizontal="right")
+            wb = self._libro()
+            ws = _crear_hoja(wb, "Inventario", COLUMNAS_INVENTARIO, 'encabezado_inventario')
+            _escribir_filas(ws, COLUMNAS_INVENTARIO, (fila_producto(p) for p in productos))
             
-            ws.column_dimensions['A'].width = 8
-            ws.column_dimensions['B'].width = 25
-            ws.column_dimensions['C'].width = 30
-            ws.column_dimensions['D'].width = 12
-            ws.column_dimensions['E'].width = 15
-            ws.column_dimensions['F'].width = 15
-            ws.column_dimensions['G'].width = 20
-            ws.column_dimensions['H'].width = 18
-            ws.column_dimensions['I'].width = 18
-            
-            ws.freeze_panes = "A2"
-            
-            filename = f"{REPORTS_PATH}Inventario_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            filename = self._ruta("Inventario")
             wb.save(filename)
             
             return True, filename
@@ -83,65 +126,13 @@ class ExcelExporter:
         except Exception as err:
             return False, f"Error al exportar inventario: {str(err)}"
     
-    def exportar_movimientos(self, movimientos, productos_dict):
+    def exportar_movimientos(self, movimientos):
         try:
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Movimientos"
-            
-            header_fill = PatternFill(start_color="2a9d8f", end_color="2a9d8f", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            
-            border = Border(
-                left=Side(style="thin"),
-                right=Side(style="thin"),
-                top=Side(style="thin"),
-                bottom=Side(style="thin")
-            )
-            
-            headers = ["ID Movimiento", "Producto", "Tipo", "Cantidad", "Fecha", "Descripción"]
-            
-            for col_num, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_num)
-                cell.value = header
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
-                cell.border = border
+            wb = self._libro()
+            ws = _crear_hoja(wb, "Movimientos", COLUMNAS_MOVIMIENTOS, 'encabezado_movimientos')
+            _escribir_filas(ws, COLUMNAS_MOVIMIENTOS, (fila_movimiento(m) for m in movimientos))
             
-            for row_num, mov in enumerate(movimientos, 2):
-                id_producto = mov.get('id_producto')
-                producto_nombre = (productos_dict.get(id_producto, {}).get('nombre', 'N/A') 
-                                 if productos_dict else 'N/A')
-                
-                datos_fila = [
-                    mov.get('id'),
-                    producto_nombre,
-                    mov.get('tipo_movimiento', 'N/A'),
-                    mov.get('cantidad', 0),
-                    mov.get('fecha', ''),
-                    mov.get('descripcion', ''),
-                ]
-                
-                for col_num, valor in enumerate(datos_fila, 1):
-                    cell = ws.cell(row=row_num, column=col_num)
-                    cell.value = valor
-                    cell.border = border
-                    
-                    if col_num in [1, 4]:
-                        cell.alignment = Alignment(horizontal="center")
-            
-            ws.column_dimensions['A'].width = 15
-            ws.column_dimensions['B'].width = 25
-            ws.column_dimensions['C'].width = 15
-            ws.column_dimensions['D'].width = 12
-            ws.column_dimensions['E'].width = 18
-            ws.column_dimensions['F'].width = 30
-            
-            ws.freeze_panes = "A2"
-            
-            filename = f"{REPORTS_PATH}Movimientos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            filename = self._ruta("Movimientos")
             wb.save(filename)
             
             return True, filename
@@ -149,150 +140,49 @@ class ExcelExporter:
         except Exception as err:
             return False, f"Error al exportar movimientos: {str(err)}"
     
-    def exportar_completo(self, productos, movimientos, productos_dict):
+    def exportar_completo(self, productos, movimientos):
         try:
-            wb = openpyxl.Workbook()
-            
-            if 'Sheet' in wb.sheetnames:
-                wb.remove(wb['Sheet'])
-            
-            header_fill = PatternFill(start_color="1f4788", end_color="1f4788", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            
-            border = Border(
-                left=Side(style="thin"),
-                right=Side(style="thin"),
-                top=Side(style="thin"),
-                bottom=Side(style="thin")
-            )
-            
-            ws_inv = wb.create_sheet("Inventario", 0)
-            headers_inv = ["ID", "Nombre", "Descripción", "Cantidad", "Precio Unitario", 
-                          "Valor Total", "Proveedor", "Fecha Registro", "Última Actualización"]
-            
-            for col_num, header in enumerate(headers_inv, 1):
-                cell = ws_inv.cell(row=1, column=col_num)
-                cell.value = header
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
-                cell.border = border
-            
-            for row_num, producto in enumerate(productos, 2):
-                datos_fila = [
-                    producto.get('id'),
-                    producto.get('nombre', 'N/A'),
-                    producto.get('descripcion', ''),
-                    producto.get('cantidad', 0),
-                    float(producto.get('precio_unitario', 0)),
-                    float(producto.get('cantidad', 0)) * float(producto.get('precio_unitario', 0)),
-                    producto.get('proveedor', 'N/A'),
-                    producto.get('fecha_registro', ''),
-                    producto.get('ultima_actualizacion', ''),
-                ]
-                
-                for col_num, valor in enumerate(datos_fila, 1):
-                    cell = ws_inv.cell(row=row_num, column=col_num)
-                    cell.value = valor
-                    cell.border = border
-                    
-                    if col_num in [1, 4]:
-                        cell.alignment = Alignment(horizontal="center")
-                    elif col_num in [5, 6]:
-                        cell.number_format = '$#,##0.00'
-                        cell.alignment = Alignment(horizontal="right")
-            
-            ws_inv.column_dimensions['A'].width = 8
-            ws_inv.column_dimensions['B'].width = 25
-            ws_inv.column_dimensions['C'].width = 30
-            ws_inv.column_dimensions['D'].width = 12
-            ws_inv.column_dimensions['E'].width = 15
-            ws_inv.column_dimensions['F'].width = 15
-            ws_inv.column_dimensions['G'].width = 20
-            ws_inv.column_dimensions['H'].width = 18
-            ws_inv.column_dimensions['I'].width = 18
-            ws_inv.freeze_panes = "A2"
-            
-            ws_mov = wb.create_sheet("Movimientos", 1)
-            headers_mov = ["ID Movimiento", "Producto", "Tipo", "Cantidad", "Fecha", "Descripción"]
-            
-            for col_num, header in enumerate(headers_mov, 1):
-                cell = ws_mov.cell(row=1, column=col_num)
-                cell.value = header
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
-                cell.border = border
-            
-            for row_num, mov in enumerate(movimientos, 2):
-                id_producto = mov.get('id_producto')
-                producto_nombre = (productos_dict.get(id_producto, {}).get('nombre', 'N/A') 
-                                 if productos_dict else 'N/A')
-                
-                datos_fila = [
-                    mov.get('id'),
-                    producto_nombre,
-                    mov.get('tipo_movimiento', 'N/A'),
-                    mov.get('cantidad', 0),
-                    mov.get('fecha', ''),
-                    mov.get('descripcion', ''),
-                ]
-                
-                for col_num, valor in enumerate(datos_fila, 1):
-                    cell = ws_mov.cell(row=row_num, column=col_num)
-                    cell.value = valor
-                    cell.border = border
-                    
-                    if col_num in [1, 4]:
-                        cell.alignment = Alignment(horizontal="center")
-            
-            ws_mov.column_dimensions['A'].width = 15
-            ws_mov.column_dimensions['B'].width = 25
-            ws_mov.column_dimensions['C'].width = 15
-            ws_mov.column_dimensions['D'].width = 12
-            ws_mov.column_dimensions['E'].width = 18
-            ws_mov.column_dimensions['F'].width = 30
-            ws_mov.freeze_panes = "A2"
-            
-            ws_resumen = wb.create_sheet("Resumen", 2)
-            ws_resumen['A1'] = "RESUMEN DE INVENTARIO"
-            ws_resumen['A1'].font = Font(bold=True, size=14, color="FFFFFF")
-            ws_resumen['A1'].fill = PatternFill(start_color="1f4788", end_color="1f4788", fill_type="solid")
-            ws_resumen.merge_cells('A1:B1')
-            ws_resumen['A1'].alignment = Alignment(horizontal="center", vertical="center")
-            
-            ws_resumen['A2'] = "Fecha de Generación:"
-            ws_resumen['B2'] = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-            
-            ws_resumen['A4'] = "Estadísticas Generales:"
-            ws_resumen['A4'].font = Font(bold=True, size=11)
-            
-            ws_resumen['A5'] = "Total de Productos:"
-            ws_resumen['B5'] = len(productos)
-            
-            total_stock = sum(p.get('cantidad', 0) for p in productos)
-            ws_resumen['A6'] = "Stock Total:"
-            ws_resumen['B6'] = total_stock
-            
-            valor_total = sum(float(p.get('cantidad', 0)) * float(p.get('precio_unitario', 0)) 
-                            for p in productos)
-            ws_resumen['A7'] = "Valor Total del Inventario:"
-            ws_resumen['B7'] = valor_total
-            ws_resumen['B7'].number_format = '$#,##0.00'
-            
-            bajo_stock = sum(1 for p in productos if p.get('cantidad', 0) < 10)
-            ws_resumen['A8'] = "Productos con Stock Bajo (<10):"
-            ws_resumen['B8'] = bajo_stock
-            
-            total_movimientos = len(movimientos)
-            ws_resumen['A9'] = "Total de Movimientos:"
-            ws_resumen['B9'] = total_movimientos
-            
+            wb = self._libro()
+            
+            # Totales del resumen, acumulados mientras se recorren los datos
+            totales = {'productos': 0, 'stock': 0, 'valor': 0.0, 'bajo_stock': 0}
+            
+            def filas_productos():
+                for producto in productos:
+                    fila = fila_producto(producto)
+                    totales['productos'] += 1
+                    totales['stock'] += fila[3]
+                    totales['valor'] += fila[5]
+                    totales['bajo_stock'] += 1 if fila[3] < 10 else 0
+                    yield fila
+            
+            ws_inv = _crear_hoja(wb, "Inventario", COLUMNAS_INVENTARIO, 'encabezado_inventario')
+            _escribir_filas(ws_inv, COLUMNAS_INVENTARIO, filas_productos())
+            
+            # Los productos se recorren completos antes de abrir el recorrido de movimientos
+            ws_mov = _crear_hoja(wb, "Movimientos", COLUMNAS_MOVIMIENTOS, 'encabezado_inventario')
+            total_movimientos = _escribir_filas(ws_mov, COLUMNAS_MOVIMIENTOS,
+                                                (fila_movimiento(m) for m in movimientos))
+            
+            # El resumen va al final porque necesita los totales (en write-only no hay celdas combinadas)
+            ws_resumen = wb.create_sheet("Resumen")
             ws_resumen.column_dimensions['A'].width = 30
             ws_resumen.column_dimensions['B'].width = 20
-            
-            filename = f"{REPORTS_PATH}Inventario_Completo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            for fila in (
+                [_celda(ws_resumen, "RESUMEN DE INVENTARIO", 'resumen_titulo'),
+                 _celda(ws_resumen, None, 'resumen_titulo')],
+                ["Fecha de Generación:", datetime.now().strftime("%d/%m/%Y %H:%M:%S")],
+                [],
+                [_celda(ws_resumen, "Estadísticas Generales:", 'resumen_seccion')],
+                ["Total de Productos:", totales['productos']],
+                ["Stock Total:", totales['stock']],
+                ["Valor Total del Inventario:", _celda(ws_resumen, totales['valor'], 'resumen_moneda')],
+                ["Productos con Stock Bajo (<10):", totales['bajo_stock']],
+                ["Total de Movimientos:", total_movimientos],
+            ):
+                ws_resumen.append(fila)
+            
+            filename = self._ruta("Inventario_Completo")
             wb.save(filename)
             
             return True, filename
@@ -1,14 +1,17 @@
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from database import DatabaseManager
-from reports import ReportGenerator
-from export_excel import ExcelExporter
-from datetime import datetime, timedelta
+from cache import ProductCache
+from workers import BackgroundWorker, contar_progreso
+from product_table import ProductTable
+from refresh import RefreshScheduler
+from config import BUSQUEDA_CONFIG, REPORT_CACHE_CONFIG, EXPORT_DATOS_CONFIG
+from report_cache import ReportCache
+from startup import tiempos
 
-import matplotlib
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
-from excel_analysis import ExcelAnalyzer
+# reports (ReportLab), export_excel (openpyxl), charts (matplotlib) y excel_analysis
+# (pandas) se importan con tiempos.importar() la primera vez que se usan
 
 class InventoryManagementApp:
     """Aplicación de gestión de inventario con interfaz Tkinter"""
@@ -37,24 +40,93 @@ class InventoryManagementApp:
         
         # Inicializar base de datos
         self.db = DatabaseManager()
-        self.report_gen = ReportGenerator()
-        self.excel_exporter = ExcelExporter()
-        self.gen_reportes = ReportGenerator()
+        self.cache = ProductCache(self.db)
+        self._reportes = None
+        self._excel_exporter = None
+        self._data_exporter = None
+        self.cache_reportes = ReportCache() if REPORT_CACHE_CONFIG['habilitada'] else None
+        self._lock_diferidos = threading.Lock()
+        
+        # Trabajos de base de datos, reportes y exportaciones fuera del hilo de Tk
+        self.botones_accion = []
+        self.worker = BackgroundWorker(self.root, al_cambiar_estado=self._mostrar_estado_trabajo)
+        self.refresco = RefreshScheduler(self.root)
+        self._busqueda_pendiente = None
         
-        if not self.db.connect():
-            messagebox.showerror("Error", "No se pudo conectar a la base de datos")
-            return
+        # Variables de sesión
+        self.producto_seleccionado = None
+        self.conectado = False
         
+        # Crear interfaz; la ventana se muestra mientras se conecta en segundo plano
+        self.crear_interfaz()
+        tiempos.marcar('ventana e interfaz')
+        self.root.after_idle(tiempos.marcar, 'ventana visible')
+        self.worker.ejecutar(self._conectar, al_terminar=self._al_conectar,
+                             al_error=self._al_fallar_conexion,
+                             texto="Conectando a la base de datos...")
+    
+    def _conectar(self):
+        """Conectar y aplicar migraciones pendientes (corre en el worker)"""
+        if not self.db.connect():
+            return False, "No se pudo conectar a la base de datos"
         if not self.db.create_tables():
-            messagebox.showerror("Error", "No se pudieron crear las tablas")
+            return False, "No se pudieron crear las tablas"
+        return True, "Conexión establecida"
+    
+    def _al_conectar(self, resultado):
+        """Cargar datos y habilitar la interfaz una vez conectada la base de datos"""
+        tiempos.marcar('conexión y esquema')
+        exito, mensaje = resultado
+        if not exito:
+            tiempos.terminar()
+            messagebox.showerror("Error", mensaje)
             return
         
-        # Variables de sesión
-        self.producto_seleccionado = None
+        self.conectado = True
+        self._mostrar_estado_trabajo(self.worker.ocupado, None, None, "")
+        if self.texto_busqueda.get().strip():
+            self._buscar()  # Lo escrito mientras se conectaba
+        else:
+            self.cargar_productos()
+        self.actualizar_estadisticas()
         
-        # Crear interfaz
-        self.crear_interfaz()
-        self.cargar_productos()
+        # Vistas que se refrescan agrupadas; los cambios de otros clientes llegan por sondeo
+        self.refresco.registrar('productos', self.cargar_productos, incluye=('filas',))
+        self.refresco.registrar('filas', self.tabla.actualizar_filas, con_claves=True)
+        self.refresco.registrar('estadisticas', self.actualizar_estadisticas)
+        # El sondeo también invalida la caché de productos si la versión cambió por otro cliente
+        self.refresco.iniciar_sondeo(self.db.obtener_version_productos,
+                                     ('productos', 'estadisticas'), self.worker,
+                                     al_consultar=self.cache.aplicar_version)
+        tiempos.terminar()
+    
+    def _al_fallar_conexion(self, err):
+        tiempos.terminar()
+        messagebox.showerror("Error", f"No se pudo conectar a la base de datos: {err}")
+    
+    @property
+    def reportes(self):
+        """Generador de reportes PDF único; ReportLab se importa al primer reporte"""
+        with self._lock_diferidos:
+            if self._reportes is None:
+                self._reportes = tiempos.importar('reports').ReportGenerator()
+            return self._reportes
+    
+    @property
+    def excel_exporter(self):
+        """Exportador Excel único; openpyxl se importa a la primera exportación"""
+        with self._lock_diferidos:
+            if self._excel_exporter is None:
+                self._excel_exporter = tiempos.importar('export_excel').ExcelExporter()
+            return self._excel_exporter
+    
+    @property
+    def data_exporter(self):
+        """Exportador de datos crudos (CSV, CSV gzip, Parquet) único"""
+        with self._lock_diferidos:
+            if self._data_exporter is None:
+                self._data_exporter = tiempos.importar('export_data').DataExporter()
+            return self._data_exporter
     
     
     def _configurar_estilos(self):
@@ -143,16 +215,31 @@ class InventoryManagementApp:
                                activebackground=self.color_primary, activeforeground=self.color_surface,
                                tearoff=0, font=('Segoe UI', 9))
         menubar.add_cascade(label="📊 Reportes", menu=reportes_menu)
+        self.reportes_menu = reportes_menu
         reportes_menu.add_command(label="Inventario", command=self.generar_reporte_inventario)
         reportes_menu.add_command(label="Movimientos", command=self.generar_reporte_movimientos)
         reportes_menu.add_command(label="Estadísticas", command=self.generar_reporte_estadisticas)
+        reportes_menu.add_command(label="🔎 Reporte filtrado...", command=self.abrir_reporte_filtrado)
         reportes_menu.add_separator()
         reportes_menu.add_command(label="📥 Exportar Inventario (Excel)", command=self.exportar_inventario_excel)
         reportes_menu.add_command(label="📥 Exportar Movimientos (Excel)", command=self.exportar_movimientos_excel)
         reportes_menu.add_command(label="📥 Exportar Todo (Excel)", command=self.exportar_completo_excel)
+        
+        # Datos crudos para BI: el formato elegido vale para las tres exportaciones
+        datos_menu = tk.Menu(reportes_menu, bg=self.color_surface, fg=self.color_text,
+                            activebackground=self.color_primary, activeforeground=self.color_surface,
+                            tearoff=0, font=('Segoe UI', 9))
+        reportes_menu.add_cascade(label="📦 Exportar Datos (CSV/Parquet)", menu=datos_menu)
+        self.formato_datos = tk.StringVar(value=EXPORT_DATOS_CONFIG['formato'])
+        for formato, texto in (('csv', "CSV"), ('csv.gz', "CSV comprimido (gzip)"), ('parquet', "Parquet")):
+            datos_menu.add_radiobutton(label=texto, value=formato, variable=self.formato_datos)
+        datos_menu.add_separator()
+        datos_menu.add_command(label="Inventario", command=lambda: self.exportar_datos('inventario'))
+        datos_menu.add_command(label="Movimientos", command=lambda: self.exportar_datos('movimientos'))
+        datos_menu.add_command(label="Todo (.zip)", command=lambda: self.exportar_datos('completo'))
         reportes_menu.add_separator()
         reportes_menu.add_command(label="Ver Gráficos", command=self.abrir_ventana_graficos)
-        reportes_menu.add_command(label="Analizar Excel", command=self.abrir_analizador_excel)
+        reportes_menu.add_command(label="Analizar Excel / CSV / Parquet", command=self.abrir_analizador_excel)
         
         ayuda_menu = tk.Menu(menubar, bg=self.color_surface, fg=self.color_text,
                             activebackground=self.color_primary, activeforeground=self.color_surface,
@@ -172,6 +259,16 @@ class InventoryManagementApp:
                                  style='Header.TLabel')
         etiqueta_encabezado.pack(side=tk.LEFT)
         
+        # Barra de estado: trabajo en curso y progreso
+        marco_estado = ttk.Frame(marco_principal)
+        marco_estado.pack(side=tk.BOTTOM, fill=tk.X, pady=(12, 0))
+        
+        self.barra_progreso = ttk.Progressbar(marco_estado, length=220, mode='determinate')
+        self.barra_progreso.pack(side=tk.RIGHT)
+        
+        self.etiqueta_trabajo = ttk.Label(marco_estado, text="", style='TLabel')
+        self.etiqueta_trabajo.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
         # Contenedor principal (3 columnas)
         contenedor = ttk.Frame(marco_principal)
         contenedor.pack(fill=tk.BOTH, expand=True)
@@ -224,6 +321,8 @@ class InventoryManagementApp:
         btn_limpiar = ttk.Button(marco_botones, text="🔄 Limpiar", command=self.limpiar_campos)
         btn_limpiar.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
         
+        self.botones_accion += [btn_crear, btn_actualizar, btn_eliminar]
+        
         
         contenedor_derecho = ttk.Frame(contenedor)
         contenedor_derecho.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
@@ -233,34 +332,22 @@ class InventoryManagementApp:
         marco_tabla.pack(fill=tk.BOTH, expand=True, padx=(0, 0), pady=(0, 16))
         marco_tabla.config(relief=tk.FLAT)
         
-        desplazador = ttk.Scrollbar(marco_tabla)
-        desplazador.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.tree = ttk.Treeview(
-            marco_tabla,
-            columns=('ID', 'Nombre', 'Cantidad', 'Precio', 'Proveedor'),
-            height=15,
-            yscrollcommand=desplazador.set,
-            show='headings'
-        )
-        desplazador.config(command=self.tree.yview)
-        
-        # Configurar columnas con mejor ancho
-        self.tree.column('ID', anchor=tk.CENTER, width=50)
-        self.tree.column('Nombre', anchor=tk.W, width=250)
-        self.tree.column('Cantidad', anchor=tk.CENTER, width=100)
-        self.tree.column('Precio', anchor=tk.CENTER, width=120)
-        self.tree.column('Proveedor', anchor=tk.W, width=200)
-        
-        # Encabezados mejorados
-        self.tree.heading('ID', text='ID', anchor=tk.CENTER)
-        self.tree.heading('Nombre', text='Nombre', anchor=tk.W)
-        self.tree.heading('Cantidad', text='Cantidad', anchor=tk.CENTER)
-        self.tree.heading('Precio', text='Precio Unitario', anchor=tk.CENTER)
-        self.tree.heading('Proveedor', text='Proveedor', anchor=tk.W)
-        
-        self.tree.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
-        self.tree.bind('<Double-1>', self.cargar_producto_seleccionado)
+        # Barra de búsqueda (nombre, descripción, proveedor o ID); consulta al dejar de escribir
+        marco_busqueda = ttk.Frame(marco_tabla)
+        marco_busqueda.pack(side=tk.TOP, fill=tk.X, pady=(0, 8))
+        ttk.Label(marco_busqueda, text="🔍 Buscar:", style='TLabel').pack(side=tk.LEFT, padx=(0, 6))
+        self.texto_busqueda = tk.StringVar()
+        self.texto_busqueda.trace_add('write', self._al_escribir_busqueda)
+        entrada_busqueda = ttk.Entry(marco_busqueda, textvariable=self.texto_busqueda)
+        entrada_busqueda.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        entrada_busqueda.bind('<Return>', lambda e: self._buscar())
+        entrada_busqueda.bind('<Escape>', lambda e: self.texto_busqueda.set(""))
+        ttk.Button(marco_busqueda, text="✖", width=3,
+                   command=lambda: self.texto_busqueda.set("")).pack(side=tk.LEFT, padx=(6, 0))
+        
+        # Tabla virtual: solo se dibujan las filas visibles y se leen por bloques
+        self.tabla = ProductTable(marco_tabla, self.db, self.worker)
+        self.tabla.tree.bind('<Double-1>', self.cargar_producto_seleccionado)
         
         # Frame de movimientos mejorado
         marco_movimientos = ttk.LabelFrame(contenedor_derecho, text="➡️ Movimiento de Inventario", padding=14)
@@ -278,7 +365,9 @@ class InventoryManagementApp:
         self.cantidad_movimiento = ttk.Entry(marco_mov_interno, width=12)
         self.cantidad_movimiento.pack(side=tk.LEFT, padx=6)
         
-        ttk.Button(marco_mov_interno, text="✔️ Registrar", command=self.registrar_movimiento).pack(side=tk.LEFT, padx=6)
+        btn_registrar = ttk.Button(marco_mov_interno, text="✔️ Registrar", command=self.registrar_movimiento)
+        btn_registrar.pack(side=tk.LEFT, padx=6)
+        self.botones_accion.append(btn_registrar)
         
         # Frame de estadísticas mejorado
         marco_estadisticas = ttk.LabelFrame(contenedor_derecho, text="📈 Estadísticas en Tiempo Real", padding=14)
@@ -287,40 +376,50 @@ class InventoryManagementApp:
         
         self.etiqueta_estadisticas = ttk.Label(marco_estadisticas, text="", style='Stats.TLabel')
         self.etiqueta_estadisticas.pack(fill=tk.X)
-        
-        self.actualizar_estadisticas()
     
     def cargar_productos(self):
-        """Cargar productos en la tabla"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        productos = self.db.obtener_productos()
-        for producto in productos:
-            self.tree.insert(
-                '',
-                tk.END,
-                values=(
-                    producto['id'],
-                    producto['nombre'],
-                    producto['cantidad'],
-                    f"${float(producto['precio_unitario']):.2f}",
-                    producto['proveedor'] if producto['proveedor'] else 'N/A'
-                )
-            )
+        """Refrescar la tabla de productos conservando posición y selección"""
+        self.tabla.refrescar()
+    
+    def _al_escribir_busqueda(self, *args):
+        """Reprogramar la búsqueda en cada tecla para consultar una sola vez al final"""
+        if self._busqueda_pendiente is not None:
+            self.root.after_cancel(self._busqueda_pendiente)
+        self._busqueda_pendiente = self.root.after(BUSQUEDA_CONFIG['espera_ms'], self._buscar)
+    
+    def _buscar(self):
+        if self._busqueda_pendiente is not None:
+            self.root.after_cancel(self._busqueda_pendiente)
+            self._busqueda_pendiente = None
+        if not self.conectado:
+            return
+        self.tabla.filtrar(busqueda=self.texto_busqueda.get())
     
     def cargar_producto_seleccionado(self, evento):
-        """Cargar datos del producto seleccionado en el formulario"""
-        seleccion = self.tree.selection()
-        if not seleccion:
+        """Cargar datos del producto seleccionado en el formulario.
+        
+        Un acierto del LRU de la caché se muestra al instante si coincide con la
+        versión de la fila dibujada; si no, la lectura (que puede ir a MySQL)
+        corre en el worker y el formulario se llena al volver.
+        """
+        id_producto = self.tabla.id_seleccionado
+        if id_producto is None:
             return
         
-        elemento = self.tree.item(seleccion[0])
-        id_producto = elemento['values'][0]
-        
-        producto = self.db.obtener_producto(id_producto)
-        if producto:
-            self.producto_seleccionado = id_producto
+        producto = self.cache.en_memoria(id_producto)
+        if producto is not None:
+            dibujada = self.tabla.version_dibujada(id_producto)
+            if dibujada is None or dibujada == producto.get('ultima_actualizacion'):
+                self._mostrar_producto(producto)
+                return
+            self.cache.invalidar([id_producto])  # La tabla ya vio otra versión de la fila
+        self.worker.ejecutar(self.cache.obtener, id_producto, ocupar=False,
+                             al_terminar=self._mostrar_producto, al_error=self._al_fallar_trabajo)
+    
+    def _mostrar_producto(self, producto):
+        """Llenar el formulario con el producto (si sigue siendo el seleccionado)"""
+        if producto and producto['id'] == self.tabla.id_seleccionado:
+            self.producto_seleccionado = producto['id']
             self.nombre_entrada.delete(0, tk.END)
             self.nombre_entrada.insert(0, producto['nombre'])
             
@@ -353,14 +452,14 @@ class InventoryManagementApp:
                 messagebox.showwarning("⚠️ Validación", "Cantidad y Precio no pueden ser negativos")
                 return
             
-            exito, mensaje = self.db.crear_producto(nombre, descripcion, cantidad, precio, proveedor)
-            if exito:
-                messagebox.showinfo("✅ Éxito", f"Producto creado exitosamente:\n{nombre}")
-                self.limpiar_campos()
-                self.cargar_productos()
-                self.actualizar_estadisticas()
-            else:
-                messagebox.showerror("❌ Error", mensaje)
+            self.worker.ejecutar(
+                self.db.crear_producto, nombre, descripcion, cantidad, precio, proveedor,
+                texto="Creando producto...",
+                al_terminar=lambda resultado: self._al_guardar_producto(
+                    resultado, f"Producto creado exitosamente:\n{nombre}"
+                ),
+                al_error=self._al_fallar_trabajo
+            )
         except ValueError:
             messagebox.showerror("❌ Error de Validación", "Verifique que:\n• Cantidad sea un número entero\n• Precio sea un número decimal")
     
@@ -377,16 +476,14 @@ class InventoryManagementApp:
             precio = float(self.precio_entrada.get())
             proveedor = self.proveedor_entrada.get()
             
-            exito, mensaje = self.db.actualizar_producto(
-                self.producto_seleccionado, nombre, descripcion, cantidad, precio, proveedor
+            id_producto = self.producto_seleccionado
+            self.worker.ejecutar(
+                self.db.actualizar_producto,
+                id_producto, nombre, descripcion, cantidad, precio, proveedor,
+                texto="Actualizando producto...",
+                al_terminar=lambda resultado: self._al_guardar_producto(resultado, id_producto=id_producto),
+                al_error=self._al_fallar_trabajo
             )
-            if exito:
-                messagebox.showinfo("✅ Éxito", mensaje)
-                self.limpiar_campos()
-                self.cargar_productos()
-                self.actualizar_estadisticas()
-            else:
-                messagebox.showerror("❌ Error", mensaje)
         except ValueError:
             messagebox.showerror("❌ Error de Validación", "Cantidad debe ser número entero y Precio debe ser decimal")
     
@@ -397,14 +494,29 @@ class InventoryManagementApp:
             return
         
         if messagebox.askyesno("⚠️ Confirmación", "¿Está seguro que desea eliminar este producto?"):
-            exito, mensaje = self.db.eliminar_producto(self.producto_seleccionado)
-            if exito:
-                messagebox.showinfo("✅ Éxito", mensaje)
-                self.limpiar_campos()
-                self.cargar_productos()
-                self.actualizar_estadisticas()
+            self.worker.ejecutar(
+                self.db.eliminar_producto, self.producto_seleccionado,
+                texto="Eliminando producto...",
+                al_terminar=self._al_guardar_producto,
+                al_error=self._al_fallar_trabajo
+            )
+    
+    def _al_guardar_producto(self, resultado, mensaje_exito=None, id_producto=None):
+        """Mostrar el resultado de crear/actualizar/eliminar y refrescar la vista.
+        
+        Con id_producto solo se parchea esa fila; altas y bajas refrescan la tabla.
+        """
+        exito, mensaje = resultado
+        if exito:
+            messagebox.showinfo("✅ Éxito", mensaje_exito or mensaje)
+            self.limpiar_campos()
+            if id_producto is not None:
+                self.refresco.marcar('filas', id_producto)
             else:
-                messagebox.showerror("❌ Error", mensaje)
+                self.refresco.marcar('productos')
+            self.refresco.marcar('estadisticas')
+        else:
+            messagebox.showerror("❌ Error", mensaje)
     
     def limpiar_campos(self):
         """Limpiar los campos del formulario"""
@@ -414,20 +526,16 @@ class InventoryManagementApp:
         self.precio_entrada.delete(0, tk.END)
         self.proveedor_entrada.delete(0, tk.END)
         self.producto_seleccionado = None
-        if self.tree.selection():
-            self.tree.selection_remove(self.tree.selection())
+        self.tabla.deseleccionar()
     
     def registrar_movimiento(self):
         """Registrar movimiento de inventario"""
         try:
-            seleccion = self.tree.selection()
-            if not seleccion:
+            id_producto = self.tabla.id_seleccionado
+            if id_producto is None:
                 messagebox.showwarning("⚠️ Validación", "Seleccione un producto de la tabla")
                 return
             
-            elemento = self.tree.item(seleccion[0])
-            id_producto = elemento['values'][0]
-            
             valor_tipo = self.tipo_movimiento.get()
             if not valor_tipo:
                 messagebox.showwarning("⚠️ Validación", "Seleccione tipo de movimiento")
@@ -437,18 +545,27 @@ class InventoryManagementApp:
             tipo = valor_tipo.split(' ')[-1]
             cantidad = int(self.cantidad_movimiento.get())
             
-            exito, mensaje = self.db.registrar_movimiento(id_producto, tipo, cantidad)
-            if exito:
-                messagebox.showinfo("✅ Éxito", mensaje)
-                self.cantidad_movimiento.delete(0, tk.END)
-                self.tipo_movimiento.set('')
-                self.cargar_productos()
-                self.actualizar_estadisticas()
-            else:
-                messagebox.showerror("❌ Error", mensaje)
+            self.worker.ejecutar(
+                self.db.registrar_movimiento, id_producto, tipo, cantidad,
+                texto="Registrando movimiento...",
+                al_terminar=lambda resultado: self._al_registrar_movimiento(resultado, id_producto),
+                al_error=self._al_fallar_trabajo
+            )
         except ValueError:
             messagebox.showerror("❌ Error de Validación", "La cantidad debe ser un número entero")
     
+    def _al_registrar_movimiento(self, resultado, id_producto):
+        """Mostrar el resultado del movimiento y parchear la fila del producto"""
+        exito, mensaje = resultado
+        if exito:
+            messagebox.showinfo("✅ Éxito", mensaje)
+            self.cantidad_movimiento.delete(0, tk.END)
+            self.tipo_movimiento.set('')
+            self.refresco.marcar('filas', id_producto)
+            self.refresco.marcar('estadisticas')
+        else:
+            messagebox.showerror("❌ Error", mensaje)
+    
     def mostrar_acerca_de(self):
         """Mostrar información acerca de la aplicación"""
         messagebox.showinfo(
@@ -465,8 +582,12 @@ class InventoryManagementApp:
         )
     
     def actualizar_estadisticas(self):
-        """Actualizar estadísticas mostradas con formato profesional"""
-        estadisticas = self.db.obtener_estadisticas()
+        """Actualizar estadísticas mostradas (la consulta corre en segundo plano)"""
+        self.worker.ejecutar(self.db.obtener_estadisticas, al_terminar=self._mostrar_estadisticas,
+                             ocupar=False)
+    
+    def _mostrar_estadisticas(self, estadisticas):
+        """Mostrar estadísticas con formato profesional"""
         total_productos = estadisticas.get('total_productos', 0)
         stock_total = estadisticas.get('stock_total', 0)
         valor_total = estadisticas.get('valor_total', 0)
@@ -481,220 +602,262 @@ class InventoryManagementApp:
         )
         self.etiqueta_estadisticas.config(text=texto)
     
-    def generar_reporte_inventario(self):
-        """Generar reporte de inventario"""
-        productos = self.db.obtener_productos()
-        if not productos:
-            messagebox.showwarning("⚠️ Advertencia", "No hay productos registrados para generar reporte")
-            return
-        
-        exito, mensaje = self.gen_reportes.generar_reporte_inventario(productos)
-        if exito:
-            messagebox.showinfo("✅ Éxito", f"Reporte de inventario generado:\n{mensaje}")
-        else:
-            messagebox.showerror("❌ Error", mensaje)
+    def generar_reporte_inventario(self, filtros=None):
+        """Generar reporte de inventario (filtros: los de db.iterar_productos)"""
+        filtros = filtros or {}
+        
+        def tarea(progreso):
+            # Totales con SUM en MySQL; las filas llegan en streaming con los mismos filtros
+            totales = self.db.obtener_totales_productos(**filtros)
+            if totales is not None and not totales['productos']:
+                return None
+            return self._con_cache_reportes('inventario', self.reportes, lambda: self.reportes.generar_reporte_inventario(
+                contar_progreso(self.db.iterar_productos(**filtros), progreso,
+                                totales and totales['productos'], texto="productos procesados"),
+                totales, filtros
+            ), filtros)
+        
+        self.worker.ejecutar(
+            tarea, con_progreso=True, texto="Generando reporte de inventario...",
+            al_terminar=lambda resultado: self._al_generar_archivo(
+                resultado,
+                "No hay productos que cumplan los filtros" if filtros else "No hay productos registrados para generar reporte",
+                "Reporte de inventario generado"
+            ),
+            al_error=self._al_fallar_trabajo
+        )
     
-    def generar_reporte_movimientos(self):
-        """Generar reporte de movimientos"""
-        movimientos = self.db.obtener_movimientos()
-        if not movimientos:
-            messagebox.showwarning("⚠️ Advertencia", "No hay movimientos registrados para generar reporte")
-            return
+    def generar_reporte_movimientos(self, filtros=None):
+        """Generar reporte de movimientos (filtros: los de db.iterar_movimientos)"""
+        filtros = filtros or {}
+        
+        def tarea(progreso):
+            totales = self.db.obtener_totales_movimientos(**filtros)
+            if totales is not None and not totales['movimientos']:
+                return None
+            # Los movimientos llegan en streaming con el nombre del producto ya resuelto
+            return self._con_cache_reportes('movimientos', self.reportes, lambda: self.reportes.generar_reporte_movimientos(
+                contar_progreso(self.db.iterar_movimientos(**filtros), progreso,
+                                totales and totales['movimientos'], texto="movimientos procesados"),
+                totales, filtros
+            ), filtros)
+        
+        self.worker.ejecutar(
+            tarea, con_progreso=True, texto="Generando reporte de movimientos...",
+            al_terminar=lambda resultado: self._al_generar_archivo(
+                resultado,
+                "No hay movimientos que cumplan los filtros" if filtros else "No hay movimientos registrados para generar reporte",
+                "Reporte de movimientos generado"
+            ),
+            al_error=self._al_fallar_trabajo
+        )
+    
+    def abrir_reporte_filtrado(self):
+        """Pedir filtros (fechas, productos, proveedor, tipo, stock bajo) y generar el PDF"""
+        from report_filters import ReportFilterDialog
         
-        productos = self.db.obtener_productos()
-        dict_productos = {p['id']: p for p in productos}
+        def al_generar(reporte, filtros):
+            if self.worker.ocupado or not self.conectado:
+                messagebox.showwarning("⚠️ Advertencia", "Espere a que termine el trabajo en curso")
+                return
+            if reporte == 'inventario':
+                self.generar_reporte_inventario(filtros)
+            else:
+                self.generar_reporte_movimientos(filtros)
         
-        exito, mensaje = self.gen_reportes.generar_reporte_movimientos(movimientos, dict_productos)
-        if exito:
-            messagebox.showinfo("✅ Éxito", f"Reporte de movimientos generado:\n{mensaje}")
-        else:
-            messagebox.showerror("❌ Error", mensaje)
+        ReportFilterDialog(self.root, {'bg': self.color_bg}, al_generar)
     
     def generar_reporte_estadisticas(self):
         """Generar reporte de estadísticas"""
-        estadisticas = self.db.obtener_estadisticas()
-        exito, mensaje = self.gen_reportes.generar_reporte_estadisticas(estadisticas)
-        if exito:
-            messagebox.showinfo("✅ Éxito", f"Reporte de estadísticas generado:\n{mensaje}")
-        else:
-            messagebox.showerror("❌ Error", mensaje)
-
+        def tarea():
+            return self._con_cache_reportes('estadisticas', self.reportes, lambda: (
+                self.reportes.generar_reporte_estadisticas(self.db.obtener_estadisticas())
+            ))
+        
+        self.worker.ejecutar(
+            tarea, texto="Generando reporte de estadísticas...",
+            al_terminar=lambda resultado: self._al_generar_archivo(
+                resultado, None, "Reporte de estadísticas generado"
+            ),
+            al_error=self._al_fallar_trabajo
+        )
+    
+    def _con_cache_reportes(self, tipo, generador, generar, filtros=None):
+        """Reutilizar el archivo ya generado si los datos no cambiaron (corre en el worker)"""
+        if self.cache_reportes is None:
+            return generar()
+        return self.cache_reportes.obtener_o_generar(tipo, filtros, self.db.obtener_version_datos(),
+                                                     generar, generador)
+    
     def exportar_inventario_excel(self):
-        try:
-            productos = self.db.obtener_productos()
-            if not productos:
-                messagebox.showwarning("⚠️ Advertencia", "No hay productos para exportar")
-                return
-            
-            success, resultado = self.excel_exporter.exportar_inventario(productos)
-            if success:
-                messagebox.showinfo("✅ Éxito", f"Inventario exportado correctamente:\n{resultado}")
-            else:
-                messagebox.showerror("❌ Error", resultado)
-        except Exception as err:
-            messagebox.showerror("❌ Error", f"Error al exportar inventario: {str(err)}")
+        def tarea(progreso):
+            # Las filas van de MySQL a la hoja en streaming (el libro es write-only)
+            totales = self.db.obtener_totales_productos()
+            if totales is not None and not totales['productos']:
+                return None
+            return self._con_cache_reportes('excel-inventario', self.excel_exporter, lambda: self.excel_exporter.exportar_inventario(
+                contar_progreso(self.db.iterar_productos(), progreso,
+                                totales and totales['productos'], texto="productos exportados")
+            ))
+        
+        self.worker.ejecutar(
+            tarea, con_progreso=True, texto="Exportando inventario...",
+            al_terminar=lambda resultado: self._al_generar_archivo(
+                resultado, "No hay productos para exportar", "Inventario exportado correctamente"
+            ),
+            al_error=lambda err: messagebox.showerror("❌ Error", f"Error al exportar inventario: {str(err)}")
+        )
     
     def exportar_movimientos_excel(self):
-        try:
-            movimientos = self.db.obtener_movimientos()
-            if not movimientos:
-                messagebox.showwarning("⚠️ Advertencia", "No hay movimientos para exportar")
-                return
-            
-            productos = self.db.obtener_productos()
-            productos_dict = {p['id']: p for p in productos}
-            
-            success, resultado = self.excel_exporter.exportar_movimientos(movimientos, productos_dict)
-            if success:
-                messagebox.showinfo("✅ Éxito", f"Movimientos exportados correctamente:\n{resultado}")
-            else:
-                messagebox.showerror("❌ Error", resultado)
-        except Exception as err:
-            messagebox.showerror("❌ Error", f"Error al exportar movimientos: {str(err)}")
+        def tarea(progreso):
+            totales = self.db.obtener_totales_movimientos()
+            if totales is not None and not totales['movimientos']:
+                return None
+            return self._con_cache_reportes('excel-movimientos', self.excel_exporter, lambda: self.excel_exporter.exportar_movimientos(
+                contar_progreso(self.db.iterar_movimientos(), progreso,
+                                totales and totales['movimientos'], texto="movimientos exportados")
+            ))
+        
+        self.worker.ejecutar(
+            tarea, con_progreso=True, texto="Exportando movimientos...",
+            al_terminar=lambda resultado: self._al_generar_archivo(
+                resultado, "No hay movimientos para exportar", "Movimientos exportados correctamente"
+            ),
+            al_error=lambda err: messagebox.showerror("❌ Error", f"Error al exportar movimientos: {str(err)}")
+        )
     
     def exportar_completo_excel(self):
-        try:
-            productos = self.db.obtener_productos()
-            movimientos = self.db.obtener_movimientos()
+        def tarea(progreso):
+            totales_productos = self.db.obtener_totales_productos()
+            totales_movimientos = self.db.obtener_totales_movimientos()
+            if (totales_productos is not None and not totales_productos['productos']
+                    and totales_movimientos is not None and not totales_movimientos['movimientos']):
+                return None
+            # Ambas hojas se escriben en streaming; el resumen se arma con lo acumulado al recorrerlas
+            return self._con_cache_reportes('excel-completo', self.excel_exporter, lambda: self.excel_exporter.exportar_completo(
+                contar_progreso(self.db.iterar_productos(), progreso,
+                                totales_productos and totales_productos['productos'], texto="productos exportados"),
+                contar_progreso(self.db.iterar_movimientos(), progreso,
+                                totales_movimientos and totales_movimientos['movimientos'], texto="movimientos exportados")
+            ))
+        
+        self.worker.ejecutar(
+            tarea, con_progreso=True, texto="Exportando datos completos...",
+            al_terminar=lambda resultado: self._al_generar_archivo(
+                resultado, "No hay datos para exportar", "Datos completos exportados correctamente"
+            ),
+            al_error=lambda err: messagebox.showerror("❌ Error", f"Error al exportar datos: {str(err)}")
+        )
+    
+    def exportar_datos(self, tabla):
+        """Exportar inventario, movimientos o ambos ('completo') en el formato elegido en el menú"""
+        formato = self.formato_datos.get()
+        
+        def tarea(progreso):
+            totales_productos = totales_movimientos = None
+            vacio = True
+            if tabla != 'movimientos':
+                totales_productos = self.db.obtener_totales_productos()
+                vacio = totales_productos is not None and not totales_productos['productos']
+            if tabla != 'inventario':
+                totales_movimientos = self.db.obtener_totales_movimientos()
+                vacio = vacio and totales_movimientos is not None and not totales_movimientos['movimientos']
+            if vacio:
+                return None
             
-            if not productos and not movimientos:
-                messagebox.showwarning("⚠️ Advertencia", "No hay datos para exportar")
-                return
+            # Las filas pasan del cursor de MySQL al archivo sin quedar en memoria
+            def productos():
+                return contar_progreso(self.db.iterar_productos(), progreso,
+                                       totales_productos and totales_productos['productos'],
+                                       texto="productos exportados")
             
-            productos_dict = {p['id']: p for p in productos}
+            def movimientos():
+                return contar_progreso(self.db.iterar_movimientos(), progreso,
+                                       totales_movimientos and totales_movimientos['movimientos'],
+                                       texto="movimientos exportados")
             
-            success, resultado = self.excel_exporter.exportar_completo(productos, movimientos, productos_dict)
-            if success:
-                messagebox.showinfo("✅ Éxito", f"Datos completos exportados correctamente:\n{resultado}")
+            if tabla == 'inventario':
+                generar = lambda: self.data_exporter.exportar_inventario(productos(), formato)
+            elif tabla == 'movimientos':
+                generar = lambda: self.data_exporter.exportar_movimientos(movimientos(), formato)
             else:
-                messagebox.showerror("❌ Error", resultado)
-        except Exception as err:
-            messagebox.showerror("❌ Error", f"Error al exportar datos: {str(err)}")
-
-    def abrir_ventana_graficos(self):
-        win = tk.Toplevel(self.root)
-        win.title("📈 Visualización de Estadísticas")
-        win.geometry("1000x700")
-        """Abrir ventana con gráficos interactivos embebidos para análisis de datos"""
-        # Crear ventana hija
-        ventana = tk.Toplevel(self.root)
-        ventana.title("📈 Visualización de Estadísticas")
-        ventana.geometry("1000x700")
-        ventana.configure(bg=self.color_bg)
-
-        # Header de la ventana
-        encabezado = ttk.Label(ventana, text="📈 Análisis y Visualización de Datos", 
-                          style='Header.TLabel')
-        encabezado.pack(pady=12, padx=12, fill=tk.X)
-
-        # Notebook para pestañas
-        cuaderno = ttk.Notebook(ventana)
-        cuaderno.pack(fill=tk.BOTH, expand=True, padx=12, pady=(0, 12))
-
-        # Pestaña 1: Stock por producto (top 10)
-        pestana1 = ttk.Frame(cuaderno)
-        cuaderno.add(pestana1, text="📦 Stock por Producto")
-
-        productos = self.db.obtener_productos()
-        # Ordenar por cantidad y tomar top 10
-        productos_ordenados = sorted(productos, key=lambda p: p.get('cantidad', 0), reverse=True)
-        superior = productos_ordenados[:10]
-        etiquetas = [p['nombre'] for p in superior]
-        valores = [p['cantidad'] for p in superior]
-
-        fig1, ax1 = plt.subplots(figsize=(8, 4), facecolor=self.color_bg)
-        ax1.set_facecolor(self.color_surface)
-        ax1.barh(etiquetas[::-1], valores[::-1], color=self.color_secondary, edgecolor=self.color_border)
-        ax1.set_title('Top 10 productos por cantidad', fontsize=12, fontweight='bold', color=self.color_text, pad=15)
-        ax1.set_xlabel('Cantidad', fontsize=10, color=self.color_text)
-        ax1.tick_params(colors=self.color_text)
-        for spine in ax1.spines.values():
-            spine.set_edgecolor(self.color_border)
-        fig1.tight_layout()
-
-        lienzo1 = FigureCanvasTkAgg(fig1, master=pestana1)
-        lienzo1.draw()
-        lienzo1.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
-
-        # Pestaña 2: Distribución por proveedor (por stock total)
-        pestana2 = ttk.Frame(cuaderno)
-        cuaderno.add(pestana2, text="🏭 Distribución por Proveedor")
-
-        stock_proveedor = {}
-        for p in productos:
-            prov = p.get('proveedor') or 'Sin proveedor'
-            stock_proveedor[prov] = stock_proveedor.get(prov, 0) + (p.get('cantidad') or 0)
-
-        proveedores = list(stock_proveedor.keys())
-        stocks = list(stock_proveedor.values())
-
-        fig2, ax2 = plt.subplots(figsize=(6, 6), facecolor=self.color_bg)
-        ax2.set_facecolor(self.color_surface)
-        colores = [self.color_primary, self.color_secondary, self.color_warning, '#8B5CF6', '#EC4899']
-        colores = (colores * ((len(proveedores) // len(colores)) + 1))[:len(proveedores)]
-        if any(stocks):
-            ax2.pie(stocks, labels=proveedores, autopct='%1.1f%%', startangle=140, 
-                   colors=colores, textprops={'color': self.color_text})
-            ax2.set_title('Distribución del stock por proveedor', fontsize=12, fontweight='bold', 
-                         color=self.color_text, pad=15)
+                generar = lambda: self.data_exporter.exportar_completo(productos(), movimientos(), formato)
+            return self._con_cache_reportes(f'datos-{tabla}', self.data_exporter, generar,
+                                            {'formato_datos': formato})
+        
+        self.worker.ejecutar(
+            tarea, con_progreso=True, texto="Exportando datos...",
+            al_terminar=lambda resultado: self._al_generar_archivo(
+                resultado, "No hay datos para exportar", "Datos exportados correctamente"
+            ),
+            al_error=lambda err: messagebox.showerror("❌ Error", f"Error al exportar datos: {str(err)}")
+        )
+    
+    def _al_generar_archivo(self, resultado, aviso_sin_datos, titulo_exito):
+        """Mostrar el resultado de un reporte o exportación (None: no había datos)"""
+        if resultado is None:
+            messagebox.showwarning("⚠️ Advertencia", aviso_sin_datos)
+            return
+        
+        exito, mensaje = resultado
+        if exito:
+            messagebox.showinfo("✅ Éxito", f"{titulo_exito}:\n{mensaje}")
         else:
-            ax2.text(0.5, 0.5, 'No hay datos', ha='center', va='center', color=self.color_text_muted)
-        fig2.tight_layout()
-
-        lienzo2 = FigureCanvasTkAgg(fig2, master=pestana2)
-        lienzo2.draw()
-        lienzo2.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
-
-        # Pestaña 3: Movimientos últimos 30 días (netos por día)
-        pestana3 = ttk.Frame(cuaderno)
-        cuaderno.add(pestana3, text="📈 Movimientos (30 días)")
-
-        movimientos = self.db.obtener_movimientos()
-        hoy = datetime.now().date()
-        fecha_inicio = hoy - timedelta(days=29)
-
-        # Agregar neto por día
-        neto_por_fecha = {}
-        for movimiento in movimientos:
-            fecha = movimiento.get('fecha')
-            if not fecha:
-                continue
-            fecha_convertida = fecha.date()
-            if fecha_convertida < fecha_inicio or fecha_convertida > hoy:
-                continue
-            tipo = (movimiento.get('tipo_movimiento') or '').lower()
-            cantidad = int(movimiento.get('cantidad') or 0)
-            neto_por_fecha[fecha_convertida] = neto_por_fecha.get(fecha_convertida, 0) + (cantidad if 'entrada' in tipo else -cantidad)
-
-        # Crear listas ordenadas por fecha
-        fechas = [fecha_inicio + timedelta(days=i) for i in range(30)]
-        netos = [neto_por_fecha.get(d, 0) for d in fechas]
-
-        fig3, ax3 = plt.subplots(figsize=(9, 3.5), facecolor=self.color_bg)
-        ax3.set_facecolor(self.color_surface)
-        ax3.bar(fechas, netos, color=self.color_primary, edgecolor=self.color_border)
-        ax3.set_title('Movimiento neto por día (últimos 30 días)', fontsize=12, fontweight='bold', 
-                     color=self.color_text, pad=15)
-        ax3.set_xlabel('Fecha', fontsize=10, color=self.color_text)
-        ax3.set_ylabel('Cantidad neta', fontsize=10, color=self.color_text)
-        ax3.tick_params(colors=self.color_text)
-        for spine in ax3.spines.values():
-            spine.set_edgecolor(self.color_border)
-        ax3.grid(axis='y', alpha=0.2, color=self.color_border)
-        fig3.autofmt_xdate(rotation=45)
-        fig3.tight_layout()
-
-        lienzo3 = FigureCanvasTkAgg(fig3, master=pestana3)
-        lienzo3.draw()
-        lienzo3.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
-
+            messagebox.showerror("❌ Error", mensaje)
+    
+    def _al_fallar_trabajo(self, err):
+        """Error no controlado dentro de un trabajo en segundo plano"""
+        messagebox.showerror("❌ Error", f"Error inesperado: {err}")
+    
+    def _mostrar_estado_trabajo(self, ocupado, actual, total, texto):
+        """Indicador de ocupado: barra de progreso, texto y botones deshabilitados"""
+        estado = tk.DISABLED if ocupado or not self.conectado else tk.NORMAL
+        for boton in self.botones_accion:
+            boton.config(state=estado)
+        for indice in range(self.reportes_menu.index(tk.END) + 1):
+            if self.reportes_menu.type(indice) in ('command', 'cascade'):
+                self.reportes_menu.entryconfig(indice, state=estado)
+        
+        if not ocupado:
+            self.barra_progreso.stop()
+            self.barra_progreso.config(mode='determinate', value=0)
+            self.etiqueta_trabajo.config(text="")
+            return
+        
+        if total:
+            self.barra_progreso.stop()
+            self.barra_progreso.config(mode='determinate', maximum=total, value=actual)
+        elif str(self.barra_progreso.cget('mode')) != 'indeterminate':
+            # Sin total conocido (recorridos en streaming): barra indeterminada
+            self.barra_progreso.config(mode='indeterminate')
+            self.barra_progreso.start(15)
+        if texto:
+            self.etiqueta_trabajo.config(text=f"⏳ {texto}")
+    
+    def abrir_ventana_graficos(self):
+        """Abrir ventana con gráficos embebidos; cada pestaña se dibuja al seleccionarla"""
+        charts = tiempos.importar('charts')
+        charts.ChartWindow(self.root, self.db, self.worker, colores={
+            'bg': self.color_bg,
+            'surface': self.color_surface,
+            'texto': self.color_text,
+            'texto_suave': self.color_text_muted,
+            'borde': self.color_border,
+            'primario': self.color_primary,
+            'secundario': self.color_secondary,
+            'advertencia': self.color_warning,
+        })
+    
     def abrir_analizador_excel(self):
         """Abrir analizador de hojas Excel (módulo separado)."""
-        analyzer = ExcelAnalyzer(self.root)
+        analyzer = tiempos.importar('excel_analysis').ExcelAnalyzer(self.root)
         analyzer.open_window()
     
     def cerrar(self):
         """Cerrar la aplicación"""
+        print(f"[INFO] Caché de productos: {self.cache.estadisticas()}")
+        self.refresco.detener()
+        self.worker.cerrar()
         self.db.disconnect()
         self.root.quit()
 
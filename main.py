@@ -8,8 +8,10 @@ Descripción: Aplicación para gestionar inventario de productos con
              registro, edición, visualización, eliminación y generación de reportes.
 """
 
+from startup import tiempos
 import tkinter as tk
 from gui import InventoryManagementApp
+tiempos.marcar('imports')
 
 def main():
     root = tk.Tk()
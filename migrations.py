@@ -0,0 +1,224 @@
+from mysql.connector import Error, errorcode
+
+# Bloqueo con nombre para que dos estaciones no migren el esquema a la vez
+NOMBRE_BLOQUEO = 'inventario_migraciones'
+ESPERA_BLOQUEO = 30
+
+SCHEMA_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INT PRIMARY KEY,
+        descripcion VARCHAR(255) NOT NULL,
+        aplicada DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+def _ejecutar_ddl(cursor, sentencia):
+    """Ejecutar DDL ignorando la nota 'already exists' (raise_on_warnings la eleva)"""
+    try:
+        cursor.execute(sentencia)
+    except Error as err:
+        if "already exists" not in str(err):
+            raise
+
+def crear_tabla(ddl):
+    """Paso de migración: CREATE TABLE IF NOT EXISTS"""
+    def paso(cursor):
+        _ejecutar_ddl(cursor, ddl)
+    return paso
+
+def crear_indice(tabla, nombre, columnas, tipo=""):
+    """Paso de migración: crear un índice solo si todavía no existe"""
+    def paso(cursor):
+        cursor.execute("""
+            SELECT COUNT(*) AS total FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, (tabla, nombre))
+        if cursor.fetchone()['total']:
+            return
+        cursor.execute(f"CREATE {tipo} INDEX {nombre} ON {tabla} ({', '.join(columnas)})")
+    return paso
+
+def _ultima_actualizacion_microsegundos(cursor):
+    """Pasar productos.ultima_actualizacion a DATETIME(6) si todavía no lo es"""
+    cursor.execute("""
+        SELECT datetime_precision AS precision_actual FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'productos'
+          AND column_name = 'ultima_actualizacion'
+    """)
+    if cursor.fetchone()['precision_actual'] == 6:
+        return
+    cursor.execute("""
+        ALTER TABLE productos MODIFY ultima_actualizacion DATETIME(6)
+            DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+    """)
+
+# Acumula en movimientos_diarios los movimientos que cumplen {condicion}. El SELECT va
+# en una tabla derivada para poder referirse a sus columnas en ON DUPLICATE KEY UPDATE
+# sin VALUES(), que MySQL 8 marca como obsoleto (y raise_on_warnings lo eleva).
+ACUMULAR_MOVIMIENTOS_DIARIOS = """
+    INSERT INTO movimientos_diarios (id_producto, dia, entradas, salidas, neto, movimientos)
+    SELECT * FROM (
+        SELECT id_producto, DATE(fecha) AS dia,
+               SUM(CASE WHEN tipo_movimiento = 'entrada' THEN cantidad ELSE 0 END) AS entradas,
+               SUM(CASE WHEN tipo_movimiento = 'entrada' THEN 0 ELSE cantidad END) AS salidas,
+               SUM(CASE WHEN tipo_movimiento = 'entrada' THEN cantidad ELSE -cantidad END) AS neto,
+               COUNT(*) AS movimientos
+        FROM movimientos
+        WHERE {condicion}
+        GROUP BY id_producto, DATE(fecha)
+    ) AS nuevo
+    ON DUPLICATE KEY UPDATE
+        entradas = movimientos_diarios.entradas + nuevo.entradas,
+        salidas = movimientos_diarios.salidas + nuevo.salidas,
+        neto = movimientos_diarios.neto + nuevo.neto,
+        movimientos = movimientos_diarios.movimientos + nuevo.movimientos
+"""
+
+# Suma al acumulado diario un (producto, día) ya agregado fuera de MySQL, con la misma
+# tabla derivada. Parámetros: id_producto, dia, entradas, salidas, neto, movimientos.
+SUMAR_MOVIMIENTOS_DIARIOS = """
+    INSERT INTO movimientos_diarios (id_producto, dia, entradas, salidas, neto, movimientos)
+    SELECT * FROM (
+        SELECT %s AS id_producto, %s AS dia, %s AS entradas, %s AS salidas,
+               %s AS neto, %s AS movimientos
+    ) AS nuevo
+    ON DUPLICATE KEY UPDATE
+        entradas = movimientos_diarios.entradas + nuevo.entradas,
+        salidas = movimientos_diarios.salidas + nuevo.salidas,
+        neto = movimientos_diarios.neto + nuevo.neto,
+        movimientos = movimientos_diarios.movimientos + nuevo.movimientos
+"""
+
+def _indice_busqueda(cursor):
+    """Índice FULLTEXT de la búsqueda (la primera vez InnoDB avisa que agrega FTS_DOC_ID)"""
+    try:
+        crear_indice('productos', 'ft_productos_busqueda', ['nombre', 'descripcion'], 'FULLTEXT')(cursor)
+    except Error as err:
+        if 'FTS_DOC_ID' not in str(err):
+            raise
+
+def _rellenar_movimientos_diarios(cursor):
+    """Cargar el acumulado diario con todo el historial (rehace la tabla completa)"""
+    cursor.execute("DELETE FROM movimientos_diarios")
+    cursor.execute(ACUMULAR_MOVIMIENTOS_DIARIOS.format(condicion="fecha IS NOT NULL"))
+
+# Migraciones en orden: (versión, descripción, pasos). Cada paso debe ser idempotente
+# porque el DDL de MySQL confirma implícitamente y una migración puede quedar a medias.
+MIGRACIONES = [
+    (1, "Tablas base de productos y movimientos", [
+        crear_tabla("""
+            CREATE TABLE IF NOT EXISTS productos (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                nombre VARCHAR(255) NOT NULL,
+                descripcion TEXT,
+                cantidad INT NOT NULL DEFAULT 0,
+                precio_unitario DECIMAL(10, 2) NOT NULL,
+                proveedor VARCHAR(255),
+                fecha_registro DATETIME DEFAULT CURRENT_TIMESTAMP,
+                ultima_actualizacion DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        """),
+        crear_tabla("""
+            CREATE TABLE IF NOT EXISTS movimientos (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                id_producto INT NOT NULL,
+                tipo_movimiento VARCHAR(50),
+                cantidad INT NOT NULL,
+                fecha DATETIME DEFAULT CURRENT_TIMESTAMP,
+                descripcion TEXT,
+                FOREIGN KEY (id_producto) REFERENCES productos(id) ON DELETE CASCADE
+            )
+        """),
+    ]),
+    (2, "Fila resumen de estadísticas", [
+        crear_tabla("""
+            CREATE TABLE IF NOT EXISTS estadisticas (
+                id TINYINT PRIMARY KEY,
+                total_productos INT NOT NULL DEFAULT 0,
+                stock_total BIGINT NOT NULL DEFAULT 0,
+                valor_total DECIMAL(18, 2) NOT NULL DEFAULT 0,
+                bajo_stock INT NOT NULL DEFAULT 0,
+                ultima_actualizacion DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        """),
+    ]),
+    (3, "Índices para listados, filtros y estadísticas", [
+        crear_indice('movimientos', 'idx_movimientos_fecha', ['fecha']),
+        crear_indice('movimientos', 'idx_movimientos_producto_fecha', ['id_producto', 'fecha']),
+        crear_indice('productos', 'idx_productos_fecha_registro', ['fecha_registro']),
+        crear_indice('productos', 'idx_productos_cantidad', ['cantidad']),
+        crear_indice('productos', 'idx_productos_proveedor', ['proveedor', 'cantidad']),
+    ]),
+    (4, "Versión de datos de productos: marca en microsegundos e índice", [
+        _ultima_actualizacion_microsegundos,
+        crear_indice('productos', 'idx_productos_ultima_actualizacion', ['ultima_actualizacion']),
+    ]),
+    (5, "Acumulado diario de movimientos por producto", [
+        crear_tabla("""
+            CREATE TABLE IF NOT EXISTS movimientos_diarios (
+                id_producto INT NOT NULL,
+                dia DATE NOT NULL,
+                entradas BIGINT NOT NULL DEFAULT 0,
+                salidas BIGINT NOT NULL DEFAULT 0,
+                neto BIGINT NOT NULL DEFAULT 0,
+                movimientos INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (id_producto, dia),
+                INDEX idx_movimientos_diarios_dia (dia),
+                FOREIGN KEY (id_producto) REFERENCES productos(id) ON DELETE CASCADE
+            )
+        """),
+        _rellenar_movimientos_diarios,
+    ]),
+    (6, "Búsqueda de productos y orden por columna", [
+        _indice_busqueda,
+        crear_indice('productos', 'idx_productos_nombre', ['nombre']),
+        crear_indice('productos', 'idx_productos_precio', ['precio_unitario']),
+        crear_indice('productos', 'idx_productos_proveedor_id', ['proveedor', 'id']),
+    ]),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
+
+def version_actual(cursor):
+    """Versión aplicada del esquema (0 si la base no tiene schema_version)"""
+    try:
+        cursor.execute("SELECT COALESCE(MAX(version), 0) AS version FROM schema_version")
+        return cursor.fetchone()['version']
+    except Error as err:
+        if err.errno == errorcode.ER_NO_SUCH_TABLE:
+            return 0
+        raise
+
+def aplicar_migraciones(conexion, cursor):
+    """Aplicar en orden las migraciones pendientes y devolver las versiones aplicadas.
+    
+    Con el esquema al día solo cuesta una consulta a schema_version.
+    """
+    if version_actual(cursor) >= VERSION_ESQUEMA:
+        return []
+    
+    cursor.execute("SELECT GET_LOCK(%s, %s) AS bloqueo", (NOMBRE_BLOQUEO, ESPERA_BLOQUEO))
+    if cursor.fetchone()['bloqueo'] != 1:
+        raise RuntimeError("Otra estación está migrando el esquema; reintente en unos segundos")
+    
+    aplicadas = []
+    try:
+        _ejecutar_ddl(cursor, SCHEMA_VERSION_DDL)
+        # Releer tras obtener el bloqueo: otra estación pudo haber migrado mientras tanto
+        actual = version_actual(cursor)
+        for version, descripcion, pasos in MIGRACIONES:
+            if version <= actual:
+                continue
+            for paso in pasos:
+                paso(cursor)
+            cursor.execute(
+                "INSERT INTO schema_version (version, descripcion) VALUES (%s, %s)",
+                (version, descripcion)
+            )
+            conexion.commit()
+            aplicadas.append(version)
+            print(f"[OK] Migración {version} aplicada: {descripcion}")
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s) AS liberado", (NOMBRE_BLOQUEO,))
+        cursor.fetchone()
+    return aplicadas
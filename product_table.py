@@ -0,0 +1,482 @@
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+
+from config import TABLA_VIRTUAL, BUSQUEDA_CONFIG
+
+# (columna, encabezado, ancho, alineación)
+COLUMNAS_TABLA = (
+    ('ID', 'ID', 50, tk.CENTER),
+    ('Nombre', 'Nombre', 250, tk.W),
+    ('Cantidad', 'Cantidad', 100, tk.CENTER),
+    ('Precio', 'Precio Unitario', 120, tk.CENTER),
+    ('Proveedor', 'Proveedor', 200, tk.W),
+)
+
+# Columna de la tabla -> orden del lado del servidor (ORDEN_PRODUCTOS en database)
+ORDEN_COLUMNAS = {
+    'ID': 'id',
+    'Nombre': 'nombre',
+    'Cantidad': 'cantidad',
+    'Precio': 'precio_unitario',
+    'Proveedor': 'proveedor',
+}
+
+def _valores_fila(producto):
+    """Valores de la fila del Treeview para un producto"""
+    return (
+        producto['id'],
+        producto['nombre'],
+        producto['cantidad'],
+        f"${float(producto['precio_unitario']):.2f}",
+        producto['proveedor'] if producto['proveedor'] else 'N/A'
+    )
+
+class ProductTable:
+    """Tabla de productos virtual sobre un ttk.Treeview.
+    
+    El Treeview solo contiene las filas visibles; la barra de desplazamiento
+    recorre la posición lógica dentro del catálogo completo. Los productos se
+    piden a la base de datos en bloques de tamano_bloque filas (más un overscan
+    arriba y abajo) y se guardan unos pocos bloques en memoria, así que el costo
+    en Tk es constante sea cual sea el tamaño del catálogo. La selección se
+    conserva por id de producto.
+    
+    Los bloques se leen por keyset (obtener_productos_tras) y no con OFFSET:
+    de cada bloque leído se guardan la clave de su primera y su última fila
+    (_anclas) y el siguiente bloque se busca desde el ancla más cercana, o
+    desde el principio o el final de la lista si está más cerca.
+    
+    La búsqueda y el orden (clic en los encabezados) se resuelven en el
+    servidor con filtrar(); las consultas recientes guardan su primera pantalla
+    en un LRU para mostrarse al instante al repetirlas.
+    """
+    
+    def __init__(self, parent, db, worker=None, tamano_bloque=None, overscan=None,
+                 bloques_en_memoria=None):
+        self.db = db
+        self.worker = worker
+        self.tamano_bloque = tamano_bloque or TABLA_VIRTUAL['tamano_bloque']
+        self.overscan = TABLA_VIRTUAL['overscan'] if overscan is None else overscan
+        self.bloques_en_memoria = bloques_en_memoria or TABLA_VIRTUAL['bloques_en_memoria']
+        
+        self.total = 0
+        self.desde = 0                  # Posición de la primera fila visible
+        self.filas_visibles = 15
+        self.id_seleccionado = None
+        
+        self._bloques = OrderedDict()   # número de bloque -> lista de productos (LRU)
+        self._pedidos = set()
+        self._anclas = {}               # número de bloque -> (clave primera fila, clave última fila)
+        self._generacion = 0            # Se incrementa en cada refresco; descarta respuestas viejas
+        self._version = None            # obtener_version_productos() de la última sincronización
+        self._versiones = {}            # iid visible -> ultima_actualizacion dibujada
+        
+        self.busqueda = ''
+        self.orden = 'fecha_registro'
+        self.descendente = True
+        self._consultas = OrderedDict() # (busqueda, orden, descendente) -> (versión, total, bloques)
+        
+        self.desplazador = ttk.Scrollbar(parent, command=self._al_desplazar)
+        self.desplazador.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.tree = ttk.Treeview(
+            parent,
+            columns=tuple(c[0] for c in COLUMNAS_TABLA),
+            height=self.filas_visibles,
+            show='headings',
+            selectmode='browse'
+        )
+        for columna, encabezado, ancho, alineacion in COLUMNAS_TABLA:
+            self.tree.column(columna, anchor=alineacion, width=ancho)
+            self.tree.heading(columna, text=encabezado, anchor=alineacion,
+                              command=lambda c=columna: self._al_ordenar(c))
+        self.tree.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
+        
+        self.tree.bind('<Configure>', self._al_redimensionar)
+        self.tree.bind('<<TreeviewSelect>>', self._al_seleccionar)
+        self.tree.bind('<MouseWheel>', self._al_rueda)
+        self.tree.bind('<Button-4>', lambda e: self._mover_a(self.desde - TABLA_VIRTUAL['filas_rueda']) or 'break')
+        self.tree.bind('<Button-5>', lambda e: self._mover_a(self.desde + TABLA_VIRTUAL['filas_rueda']) or 'break')
+        self.tree.bind('<Up>', lambda e: self._al_flecha(-1))
+        self.tree.bind('<Down>', lambda e: self._al_flecha(1))
+        self.tree.bind('<Prior>', lambda e: self._mover_a(self.desde - self.filas_visibles) or 'break')
+        self.tree.bind('<Next>', lambda e: self._mover_a(self.desde + self.filas_visibles) or 'break')
+    
+    def refrescar(self):
+        """Sincronizar la tabla con la base de datos conservando posición y selección.
+        
+        Con la misma versión no se hace nada. Si solo hubo modificaciones (mismo
+        total y mismo id máximo) y la vista no depende de valores editables
+        (sin búsqueda y por fecha de registro), se leen y parchean únicamente las
+        filas con ultima_actualizacion posterior a la última sincronización; en
+        otro caso se releen el total y los bloques de la vista. En ambos casos el
+        Treeview se actualiza por diferencias.
+        """
+        self._generacion += 1
+        self._pedidos.clear()
+        generacion = self._generacion
+        version_vista = self._version
+        bloques = self._bloques_necesarios()
+        tamano = self.tamano_bloque
+        busqueda = self.busqueda
+        parchear = self._orden_estable()
+        # Si los datos cambiaron las posiciones de las anclas ya no valen
+        leer_bloque = self._lector_bloques(con_anclas=False)
+        
+        def leer():
+            version = self.db.obtener_version_productos()
+            if version is None:
+                return None
+            if version == version_vista:
+                return version, None, [], None
+            if parchear and version_vista is not None and version[:2] == version_vista[:2]:
+                cambiados = self.db.obtener_productos_modificados(version_vista[2], limite=tamano + 1)
+                if len(cambiados) <= tamano:
+                    return version, None, cambiados, None
+            total = self.db.contar_productos(busqueda) if busqueda else version[0]
+            return version, total, None, leer_bloque(bloques, total)
+        
+        def aplicar(resultado):
+            if resultado is not None:
+                self._al_refrescar(generacion, *resultado)
+        
+        self._ejecutar(leer, aplicar)
+    
+    def filtrar(self, busqueda=None, orden=None, descendente=None):
+        """Cambiar la búsqueda y/o el orden y volver al principio de la lista.
+        
+        Si la misma consulta se hizo hace poco se muestra al instante su primera
+        pantalla guardada y refrescar() solo la relee si los datos cambiaron.
+        """
+        filtro = (
+            self.busqueda if busqueda is None else busqueda.strip(),
+            orden or self.orden,
+            self.descendente if descendente is None else descendente,
+        )
+        if filtro == self._filtro():
+            return
+        self._guardar_consulta()
+        self.busqueda, self.orden, self.descendente = filtro
+        self.desde = 0
+        self._bloques.clear()
+        self._anclas.clear()
+        self._version = None
+        guardada = self._consultas.pop(filtro, None)
+        if guardada is not None:
+            self._version, self.total, bloques = guardada
+            self._bloques.update(bloques)
+            self._recordar_anclas(bloques)
+        self._actualizar_encabezados()
+        self._dibujar()
+        self.refrescar()
+    
+    def actualizar_filas(self, ids):
+        """Releer solo esos productos y parchear sus filas (o refrescar si alguno ya no existe)"""
+        if not self._orden_estable():
+            self.refrescar()  # El cambio puede mover la fila o sacarla de la búsqueda
+            return
+        ids = set(ids)
+        generacion = self._generacion
+        
+        def aplicar(productos):
+            if generacion != self._generacion:
+                return  # Un refresco posterior ya cubre este cambio
+            self._parchear(productos)
+            if len(productos) < len(ids):
+                self.refrescar()
+        
+        self._ejecutar(lambda: self.db.obtener_productos_por_ids(ids), aplicar)
+    
+    def deseleccionar(self):
+        self.id_seleccionado = None
+        if self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+    
+    def version_dibujada(self, id_producto):
+        """ultima_actualizacion con la que se dibujó la fila del producto, o None si no está visible"""
+        return self._versiones.get(str(id_producto))
+    
+    # Búsqueda y orden
+    def _filtro(self):
+        return self.busqueda, self.orden, self.descendente
+    
+    def _orden_estable(self):
+        """True si editar un producto no cambia qué filas se ven ni su posición"""
+        return not self.busqueda and self.orden == 'fecha_registro'
+    
+    def _guardar_consulta(self):
+        """Guardar la primera pantalla de la consulta actual en el LRU de consultas"""
+        if self._version is None:
+            return
+        primeros = range((self.filas_visibles + self.overscan - 1) // self.tamano_bloque + 1)
+        bloques = {n: self._bloques[n] for n in primeros if n in self._bloques}
+        if not bloques:
+            return
+        self._consultas[self._filtro()] = (self._version, self.total, bloques)
+        self._consultas.move_to_end(self._filtro())
+        while len(self._consultas) > BUSQUEDA_CONFIG['consultas_en_cache']:
+            self._consultas.popitem(last=False)
+    
+    def _al_ordenar(self, columna):
+        """Clic en un encabezado: ordenar por esa columna o invertir el sentido"""
+        orden = ORDEN_COLUMNAS[columna]
+        descendente = not self.descendente if orden == self.orden else False
+        self.filtrar(orden=orden, descendente=descendente)
+    
+    def _actualizar_encabezados(self):
+        for columna, encabezado, _, _ in COLUMNAS_TABLA:
+            if ORDEN_COLUMNAS[columna] == self.orden:
+                encabezado += ' ▼' if self.descendente else ' ▲'
+            self.tree.heading(columna, text=encabezado)
+    
+    # Lectura de bloques
+    def _clave(self, producto):
+        """Clave keyset de una fila: (valor de la columna de orden, id)"""
+        return producto[self.orden], producto['id']
+    
+    def _recordar_anclas(self, bloques):
+        for numero, productos in bloques.items():
+            if productos:
+                self._anclas[numero] = (self._clave(productos[0]), self._clave(productos[-1]))
+    
+    def _lector_bloques(self, con_anclas=True):
+        """Función que lee bloques con la búsqueda y el orden actuales (para el worker).
+        
+        Cada bloque parte del punto conocido más cercano: la última fila de un
+        bloque anterior, la primera de uno posterior (leyendo hacia atrás) o los
+        extremos de la lista. Solo las filas entre ese punto y el bloque se
+        saltean con OFFSET, así el costo no crece con la posición absoluta.
+        """
+        busqueda, orden, descendente = self._filtro()
+        tamano = self.tamano_bloque
+        anclas = dict(self._anclas) if con_anclas else {}
+        total_vista = self.total
+        
+        def clave(producto):
+            return producto[orden], producto['id']
+        
+        def leer(bloques, total=None):
+            total = total_vista if total is None else total
+            leidos = {}
+            for numero in sorted(bloques):
+                inicio = numero * tamano
+                fin = min(inicio + tamano, total) if total else inicio + tamano
+                # (filas a saltear, ancla, hacia atrás) desde cada punto de partida
+                opciones = [(inicio, None, False)]
+                if total:
+                    opciones.append((total - fin, None, True))
+                for otro, (primera, ultima) in anclas.items():
+                    if otro < numero:
+                        opciones.append((inicio - (otro + 1) * tamano, ultima, False))
+                    elif otro > numero:
+                        opciones.append((otro * tamano - fin, primera, True))
+                saltar, ancla, atras = min(opciones, key=lambda opcion: opcion[0])
+                productos = self.db.obtener_productos_tras(
+                    ancla, max(fin - inicio, 0), saltar, busqueda=busqueda,
+                    orden=orden, descendente=descendente != atras
+                )
+                if atras:
+                    productos.reverse()
+                leidos[numero] = productos
+                if productos:
+                    anclas[numero] = (clave(productos[0]), clave(productos[-1]))
+            return leidos
+        return leer
+    
+    def _ejecutar(self, leer, aplicar):
+        """Leer en segundo plano si hay worker y aplicar el resultado en el hilo de Tk"""
+        if self.worker:
+            self.worker.ejecutar(leer, al_terminar=aplicar, ocupar=False)
+        else:
+            aplicar(leer())
+    
+    def _bloques_necesarios(self):
+        """Bloques que cubren la vista actual más el overscan"""
+        inicio = max(0, self.desde - self.overscan)
+        fin = self.desde + self.filas_visibles + self.overscan
+        if self.total:
+            fin = min(fin, self.total)
+        if fin <= inicio:
+            return [0]
+        return list(range(inicio // self.tamano_bloque, (fin - 1) // self.tamano_bloque + 1))
+    
+    def _pedir(self, bloques):
+        """Leer los bloques que falten para la vista actual"""
+        if self._version is None:
+            return  # Todavía sin sincronizar: refrescar() trae el total y los bloques
+        bloques = [b for b in bloques if b not in self._bloques and b not in self._pedidos]
+        if not bloques:
+            return
+        self._pedidos.update(bloques)
+        generacion = self._generacion
+        leer_bloque = self._lector_bloques()
+        self._ejecutar(lambda: leer_bloque(bloques), lambda leidos: self._recibir(generacion, leidos))
+    
+    def _al_refrescar(self, generacion, version, total, cambiados, bloques):
+        if generacion != self._generacion:
+            return  # Respuesta de antes del último refresco
+        self._version = version
+        if bloques is None:
+            self._parchear(cambiados)
+            self._pedir(self._bloques_necesarios())
+            return
+        
+        self.total = total
+        self._bloques.clear()
+        self._anclas.clear()
+        self.desde = max(0, min(self.desde, self.total - self.filas_visibles))
+        self._recibir(generacion, bloques)
+    
+    def _recibir(self, generacion, bloques):
+        if generacion != self._generacion:
+            return
+        self._pedidos.difference_update(bloques)
+        self._recordar_anclas(bloques)
+        for numero, productos in bloques.items():
+            self._bloques[numero] = productos
+            self._bloques.move_to_end(numero)
+        necesarios = set(self._bloques_necesarios())
+        while len(self._bloques) > self.bloques_en_memoria:
+            numero = next(iter(self._bloques))
+            if numero in necesarios:
+                break
+            self._bloques.popitem(last=False)
+        
+        self._dibujar()
+        self._pedir(self._bloques_necesarios())  # La vista pudo moverse mientras tanto
+    
+    def _parchear(self, productos):
+        """Reemplazar productos ya cargados y tocar en Tk solo las filas que cambiaron"""
+        posiciones = {
+            producto['id']: (numero, indice)
+            for numero, bloque in self._bloques.items()
+            for indice, producto in enumerate(bloque)
+        }
+        for producto in productos:
+            lugar = posiciones.get(producto['id'])
+            if lugar is None:
+                continue  # Fuera de los bloques en memoria: se leerá al llegar a él
+            numero, indice = lugar
+            self._bloques[numero][indice] = producto
+            iid = str(producto['id'])
+            version = producto.get('ultima_actualizacion')
+            if self.tree.exists(iid) and self._versiones.get(iid) != version:
+                self.tree.item(iid, values=_valores_fila(producto))
+                self._versiones[iid] = version
+    
+    def _fila(self, posicion):
+        numero, indice = divmod(posicion, self.tamano_bloque)
+        bloque = self._bloques.get(numero)
+        if bloque is None or indice >= len(bloque):
+            return None
+        return bloque[indice]
+    
+    # Dibujo y desplazamiento
+    def _dibujar(self):
+        """Llevar el Treeview a la ventana visible tocando solo las filas que difieren.
+        
+        Las filas se identifican por id de producto (iid) y se comparan por
+        ultima_actualizacion: se borran las que salieron de la vista, se insertan
+        las nuevas y solo se reescriben las modificadas.
+        """
+        fin = min(self.desde + self.filas_visibles, self.total)
+        deseadas, vistos = [], set()
+        for posicion in range(self.desde, fin):
+            producto = self._fila(posicion)
+            iid = str(producto['id']) if producto is not None else None
+            if iid is None or iid in vistos:
+                # Bloque en camino (o fila desplazada por un alta entre dos bloques)
+                deseadas.append((f"pendiente-{posicion}", ('', 'Cargando...', '', '', ''), None))
+            else:
+                deseadas.append((iid, _valores_fila(producto), producto.get('ultima_actualizacion')))
+                vistos.add(iid)
+        
+        ids_deseados = {d[0] for d in deseadas}
+        actuales = self.tree.get_children()
+        sobrantes = [iid for iid in actuales if iid not in ids_deseados]
+        if sobrantes:
+            self.tree.delete(*sobrantes)
+        orden = [iid for iid in actuales if iid in ids_deseados]
+        
+        versiones = {}
+        for indice, (iid, valores, version) in enumerate(deseadas):
+            if iid in orden:
+                if iid not in self._versiones or self._versiones[iid] != version:
+                    self.tree.item(iid, values=valores)
+                if orden[indice] != iid:
+                    self.tree.move(iid, '', indice)
+                    orden.remove(iid)
+                    orden.insert(indice, iid)
+            else:
+                self.tree.insert('', indice, iid=iid, values=valores)
+                orden.insert(indice, iid)
+            versiones[iid] = version
+        self._versiones = versiones
+        
+        if self.id_seleccionado is not None and self.tree.exists(str(self.id_seleccionado)):
+            if self.tree.selection() != (str(self.id_seleccionado),):
+                self.tree.selection_set(str(self.id_seleccionado))
+        
+        if self.total:
+            self.desplazador.set(self.desde / self.total, fin / self.total)
+        else:
+            self.desplazador.set(0, 1)
+    
+    def _mover_a(self, desde):
+        desde = max(0, min(int(desde), self.total - self.filas_visibles))
+        if desde == self.desde:
+            return
+        self.desde = desde
+        self._dibujar()
+        self._pedir(self._bloques_necesarios())
+    
+    def _al_desplazar(self, accion, cantidad, unidad=None):
+        """Comando de la barra de desplazamiento (moveto / scroll units|pages)"""
+        if accion == 'moveto':
+            self._mover_a(round(float(cantidad) * self.total))
+        elif accion == 'scroll':
+            paso = self.filas_visibles if unidad == 'pages' else 1
+            self._mover_a(self.desde + int(cantidad) * paso)
+    
+    def _al_rueda(self, evento):
+        direccion = -1 if evento.delta > 0 else 1
+        self._mover_a(self.desde + direccion * TABLA_VIRTUAL['filas_rueda'])
+        return 'break'
+    
+    def _al_flecha(self, paso):
+        """Flechas: al llegar al borde de la vista se desplaza una fila"""
+        filas = self.tree.get_children()
+        seleccion = self.tree.selection()
+        if not filas or not seleccion:
+            return None
+        borde = filas[-1] if paso > 0 else filas[0]
+        if seleccion[0] != borde:
+            return None  # Movimiento normal dentro de la vista
+        
+        self._mover_a(self.desde + paso)
+        filas = self.tree.get_children()
+        if filas:
+            nueva = filas[-1] if paso > 0 else filas[0]
+            self.tree.selection_set(nueva)
+            self.tree.focus(nueva)
+        return 'break'
+    
+    def _al_redimensionar(self, evento):
+        """Recalcular cuántas filas caben en el alto disponible"""
+        caja = self.tree.bbox(self.tree.get_children()[0]) if self.tree.get_children() else None
+        if caja:
+            encabezado, alto_fila = caja[1], caja[3]
+        else:
+            encabezado, alto_fila = 24, int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        filas = max(1, (evento.height - encabezado) // max(1, alto_fila))
+        if filas != self.filas_visibles:
+            self.filas_visibles = filas
+            self.desde = max(0, min(self.desde, self.total - filas))
+            self._dibujar()
+            self._pedir(self._bloques_necesarios())
+    
+    def _al_seleccionar(self, evento):
+        seleccion = self.tree.selection()
+        if seleccion and not seleccion[0].startswith('pendiente-'):
+            self.id_seleccionado = int(seleccion[0])
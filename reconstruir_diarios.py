@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Reconstrucción del acumulado diario de movimientos (movimientos_diarios).
+
+Uso:
+    python reconstruir_diarios.py                 # todo el historial
+    python reconstruir_diarios.py 2026-01-01      # solo desde esa fecha
+"""
+
+import sys
+from datetime import datetime
+from database import DatabaseManager
+
+def main():
+    fecha_desde = None
+    if len(sys.argv) > 1:
+        try:
+            fecha_desde = datetime.strptime(sys.argv[1], '%Y-%m-%d').date()
+        except ValueError:
+            print(f"[ERROR] Fecha inválida '{sys.argv[1]}' (formato AAAA-MM-DD)")
+            return 1
+    
+    db = DatabaseManager()
+    if not db.connect() or not db.create_tables():
+        return 1
+    try:
+        exito, mensaje = db.reconstruir_movimientos_diarios(fecha_desde)
+    finally:
+        db.disconnect()
+    print(f"[OK] {mensaje}" if exito else f"[ERROR] {mensaje}")
+    return 0 if exito else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
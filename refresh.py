@@ -0,0 +1,112 @@
+from config import REFRESCO_CONFIG
+
+class RefreshScheduler:
+    """Agrupa invalidaciones de vistas del GUI en un solo refresco por intervalo.
+    
+    Las vistas se registran con la función que las refresca. marcar() solo las
+    anota como sucias y programa con root.after un único refresco para todo lo
+    acumulado; las vistas con claves (p. ej. filas por id) reciben el conjunto
+    de claves juntadas. Un sondeo opcional en segundo plano detecta cambios de
+    otros clientes y marca las vistas afectadas.
+    """
+    
+    def __init__(self, root, intervalo_ms=None):
+        self.root = root
+        self.intervalo_ms = REFRESCO_CONFIG['intervalo_ms'] if intervalo_ms is None else intervalo_ms
+        self._vistas = {}           # vista -> (funcion, con_claves, vistas que incluye)
+        self._sucias = {}           # vista -> conjunto de claves
+        self._programado = None
+        
+        self._sondeo = None
+        self._sondeo_programado = None
+        self._sondeo_en_curso = False
+        self._ultima_version = None
+    
+    def registrar(self, vista, funcion, con_claves=False, incluye=()):
+        """Registrar una vista. incluye: vistas que quedan cubiertas al refrescar esta"""
+        self._vistas[vista] = (funcion, con_claves, tuple(incluye))
+    
+    def marcar(self, vista, *claves):
+        """Anotar una vista como sucia (con claves opcionales) y programar el refresco"""
+        self._sucias.setdefault(vista, set()).update(claves)
+        if self._programado is None:
+            self._programado = self.root.after(self.intervalo_ms, self._refrescar)
+    
+    def iniciar_sondeo(self, consulta, vistas, worker, intervalo_ms=None, al_consultar=None):
+        """Cada intervalo_ms ejecutar consulta() en el worker y marcar vistas si su resultado cambió.
+        
+        al_consultar(resultado), si se indica, recibe cada resultado en el hilo de Tk
+        antes de marcar las vistas (p. ej. para invalidar una caché).
+        """
+        intervalo_ms = REFRESCO_CONFIG['sondeo_ms'] if intervalo_ms is None else intervalo_ms
+        if not intervalo_ms:
+            return
+        self._sondeo = (consulta, tuple(vistas), worker, intervalo_ms, al_consultar)
+        self._programar_sondeo()
+    
+    def detener(self):
+        """Cancelar refrescos y sondeos pendientes"""
+        for pendiente in (self._programado, self._sondeo_programado):
+            if pendiente is not None:
+                try:
+                    self.root.after_cancel(pendiente)
+                except Exception:
+                    pass
+        self._programado = self._sondeo_programado = None
+        self._sondeo = None
+    
+    def _refrescar(self):
+        self._programado = None
+        sucias, self._sucias = self._sucias, {}
+        cubiertas = set()
+        for vista in sucias:
+            if vista in self._vistas:
+                cubiertas.update(self._vistas[vista][2])
+        
+        for vista, claves in sucias.items():
+            if vista in cubiertas or vista not in self._vistas:
+                continue
+            funcion, con_claves, _ = self._vistas[vista]
+            try:
+                if con_claves:
+                    funcion(claves)
+                else:
+                    funcion()
+            except Exception as err:
+                print(f"[ERROR] Refresco de '{vista}' falló: {err}")
+    
+    def _programar_sondeo(self):
+        if self._sondeo is not None:
+            self._sondeo_programado = self.root.after(self._sondeo[3], self._sondear)
+    
+    def _sondear(self):
+        self._sondeo_programado = None
+        if self._sondeo is None:
+            return
+        consulta, vistas, worker, _, al_consultar = self._sondeo
+        if self._sondeo_en_curso:
+            self._programar_sondeo()
+            return
+        
+        def al_terminar(version):
+            self._sondeo_en_curso = False
+            if version is not None:
+                if al_consultar:
+                    try:
+                        al_consultar(version)
+                    except Exception as err:
+                        print(f"[ERROR] Aviso del sondeo de cambios falló: {err}")
+                if self._ultima_version is not None and version != self._ultima_version:
+                    for vista in vistas:
+                        self.marcar(vista)
+                self._ultima_version = version
+            self._programar_sondeo()
+        
+        def al_error(err):
+            self._sondeo_en_curso = False
+            print(f"[ERROR] Sondeo de cambios falló: {err}")
+            self._programar_sondeo()
+        
+        self._sondeo_en_curso = True
+        if worker.ejecutar(consulta, al_terminar=al_terminar, al_error=al_error, ocupar=False) is None:
+            self._sondeo_en_curso = False  # Worker cerrado
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from config import REPORTS_PATH, REPORT_CACHE_CONFIG
+
+def ruta_unica(directorio, prefijo, extension):
+    """Ruta para un archivo nuevo: prefijo, fecha y hora y un sufijo aleatorio.
+    
+    La hora sola (al segundo) repite nombre si se generan dos archivos del
+    mismo tipo en el mismo segundo, y la caché asociaría dos claves a un
+    mismo archivo.
+    """
+    return os.path.join(
+        directorio, f"{prefijo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}.{extension}"
+    )
+
+class ReportCache:
+    """Caché de reportes y exportaciones ya generados, direccionada por contenido.
+    
+    La clave es un sha256 del tipo de reporte, sus parámetros y la versión de
+    los datos (obtener_version_datos()). Si ya existe un archivo para esa clave
+    se devuelve sin regenerarlo. El índice vive en un JSON dentro del
+    directorio de reportes y la retención es LRU: se conservan como mucho
+    max_archivos, ninguno con más de max_dias sin usarse. Solo se borran
+    archivos registrados en el índice.
+    """
+    
+    NOMBRE_INDICE = '.cache_reportes.json'
+    
+    def __init__(self, directorio=None, max_archivos=None, max_dias=None):
+        self.directorio = directorio or REPORTS_PATH
+        self.max_archivos = max_archivos or REPORT_CACHE_CONFIG['max_archivos']
+        self.max_dias = REPORT_CACHE_CONFIG['max_dias'] if max_dias is None else max_dias
+        self.ruta_indice = os.path.join(self.directorio, self.NOMBRE_INDICE)
+        self._lock = threading.Lock()
+        os.makedirs(self.directorio, exist_ok=True)
+    
+    @staticmethod
+    def clave(tipo, parametros, version):
+        """Clave del artefacto: sha256 de (tipo, parámetros, versión de datos).
+        
+        Los filtros sin valor (None, False, vacíos) no cuentan, así un reporte
+        sin filtros tiene la misma clave desde la interfaz y desde batch.py.
+        """
+        parametros = {k: v for k, v in (parametros or {}).items()
+                      if v is not None and v is not False and v != [] and v != ''}
+        contenido = json.dumps([tipo, parametros, version], sort_keys=True, default=str)
+        return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+    
+    def obtener(self, clave):
+        """Ruta del archivo guardado para la clave, o None si no hay (o ya no existe)"""
+        with self._lock:
+            indice = self._leer_indice()
+            entrada = indice.get(clave)
+            if entrada is None:
+                return None
+            ruta = os.path.join(self.directorio, entrada['archivo'])
+            if not os.path.exists(ruta):
+                del indice[clave]
+                self._escribir_indice(indice)
+                return None
+            entrada['usado'] = time.time()
+            self._escribir_indice(indice)
+            return ruta
+    
+    def guardar(self, clave, ruta):
+        """Registrar el archivo generado para la clave y aplicar la retención"""
+        with self._lock:
+            indice = self._leer_indice()
+            ahora = time.time()
+            indice[clave] = {'archivo': os.path.basename(ruta), 'creado': ahora, 'usado': ahora}
+            self._podar(indice, ahora)
+            self._escribir_indice(indice)
+    
+    def obtener_o_generar(self, tipo, parametros, version, generar, generador):
+        """Devolver (exito, mensaje) del archivo en caché o llamar a generar() y registrar el resultado.
+        
+        generador es el ReportGenerator/ExcelExporter usado por generar(); su
+        ultimo_archivo indica qué archivo quedó. Si generar() devuelve None (no
+        había datos) se devuelve tal cual. Sin versión (no se pudo consultar)
+        siempre se genera.
+        """
+        if version is None:
+            return generar()
+        clave = self.clave(tipo, parametros, version)
+        ruta = self.obtener(clave)
+        if ruta is not None:
+            print(f"[OK] {tipo}: sin cambios en los datos, se reutiliza {ruta}")
+            return True, f"Sin cambios desde la última generación: {ruta}"
+        resultado = generar()
+        if resultado is not None and resultado[0] and generador.ultimo_archivo:
+            self.guardar(clave, generador.ultimo_archivo)
+        return resultado
+    
+    def _podar(self, indice, ahora):
+        """Quitar del índice lo más viejo y lo que exceda max_archivos.
+        
+        Un archivo solo se borra del disco si ninguna entrada que queda en el
+        índice lo sigue usando.
+        """
+        limite = ahora - self.max_dias * 86400
+        orden = sorted(indice, key=lambda c: indice[c]['usado'], reverse=True)
+        quitados = set()
+        for posicion, clave in enumerate(orden):
+            entrada = indice[clave]
+            if posicion >= self.max_archivos or (self.max_dias and entrada['usado'] < limite):
+                quitados.add(entrada['archivo'])
+                del indice[clave]
+        en_uso = {entrada['archivo'] for entrada in indice.values()}
+        for archivo in quitados - en_uso:
+            try:
+                os.remove(os.path.join(self.directorio, archivo))
+            except OSError:
+                pass
+    
+    def _leer_indice(self):
+        try:
+            with open(self.ruta_indice, encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except (OSError, ValueError):
+            return {}
+    
+    def _escribir_indice(self, indice):
+        # Escritura atómica: otro proceso (batch.py) puede leer el índice a la vez
+        temporal = f"{self.ruta_indice}.{os.getpid()}.tmp"
+        try:
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                json.dump(indice, archivo)
+            os.replace(temporal, self.ruta_indice)
+        except OSError as err:
+            print(f"[ERROR] No se pudo guardar el índice de la caché de reportes: {err}")
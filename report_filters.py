@@ -0,0 +1,95 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import datetime
+
+TIPOS = {'Todos': None, '📥 Entrada': 'entrada', '📤 Salida': 'salida'}
+
+class ReportFilterDialog:
+    """Ventana para pedir un reporte PDF filtrado.
+    
+    Arma el dict de filtros de db.iterar_productos/iterar_movimientos (solo con
+    los que se completaron) y se lo pasa a al_generar(reporte, filtros), con
+    reporte 'inventario' o 'movimientos'. El tipo de movimiento no aplica al
+    inventario.
+    """
+    
+    def __init__(self, parent, colores, al_generar):
+        self.al_generar = al_generar
+        
+        self.ventana = tk.Toplevel(parent)
+        self.ventana.title("🔎 Reporte filtrado")
+        self.ventana.configure(bg=colores['bg'])
+        self.ventana.resizable(False, False)
+        self.ventana.transient(parent)
+        
+        marco = ttk.LabelFrame(self.ventana, text="Filtros", padding=14)
+        marco.pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
+        
+        self.campos = {}
+        for fila, (clave, texto) in enumerate((
+            ('fecha_desde', "Desde (AAAA-MM-DD):"),
+            ('fecha_hasta', "Hasta (AAAA-MM-DD):"),
+            ('id_producto', "IDs de producto (1, 2, ...):"),
+            ('proveedor', "Proveedor:"),
+        )):
+            ttk.Label(marco, text=texto, style='TLabel').grid(row=fila, column=0, sticky=tk.W, pady=4)
+            entrada = ttk.Entry(marco, width=28)
+            entrada.grid(row=fila, column=1, sticky=tk.EW, pady=4, padx=(8, 0))
+            self.campos[clave] = entrada
+        
+        ttk.Label(marco, text="Tipo de movimiento:", style='TLabel').grid(row=4, column=0, sticky=tk.W, pady=4)
+        self.tipo = ttk.Combobox(marco, values=list(TIPOS), width=12, state='readonly')
+        self.tipo.set('Todos')
+        self.tipo.grid(row=4, column=1, sticky=tk.W, pady=4, padx=(8, 0))
+        
+        self.stock_bajo = tk.BooleanVar(value=False)
+        ttk.Checkbutton(marco, text="Solo productos con stock bajo",
+                        variable=self.stock_bajo).grid(row=5, column=0, columnspan=2, sticky=tk.W, pady=4)
+        
+        marco_botones = ttk.Frame(self.ventana)
+        marco_botones.pack(fill=tk.X, padx=12, pady=(0, 12))
+        ttk.Button(marco_botones, text="📄 Inventario",
+                   command=lambda: self._generar('inventario')).pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        ttk.Button(marco_botones, text="📄 Movimientos",
+                   command=lambda: self._generar('movimientos')).pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        ttk.Button(marco_botones, text="Cerrar",
+                   command=self.ventana.destroy).pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+    
+    def _leer_filtros(self):
+        """Filtros completados; ValueError con un mensaje para el usuario si alguno es inválido"""
+        filtros = {}
+        for clave in ('fecha_desde', 'fecha_hasta'):
+            texto = self.campos[clave].get().strip()
+            if texto:
+                try:
+                    filtros[clave] = datetime.strptime(texto, '%Y-%m-%d').date()
+                except ValueError:
+                    raise ValueError(f"Fecha inválida '{texto}' (formato AAAA-MM-DD)")
+        if 'fecha_desde' in filtros and 'fecha_hasta' in filtros and filtros['fecha_desde'] > filtros['fecha_hasta']:
+            raise ValueError("La fecha 'desde' es posterior a la fecha 'hasta'")
+        
+        texto = self.campos['id_producto'].get().strip()
+        if texto:
+            try:
+                filtros['id_producto'] = [int(parte) for parte in texto.replace(';', ',').split(',') if parte.strip()]
+            except ValueError:
+                raise ValueError("Los IDs de producto deben ser números separados por comas")
+        
+        proveedor = self.campos['proveedor'].get().strip()
+        if proveedor:
+            filtros['proveedor'] = proveedor
+        if TIPOS.get(self.tipo.get()):
+            filtros['tipo_movimiento'] = TIPOS[self.tipo.get()]
+        if self.stock_bajo.get():
+            filtros['solo_stock_bajo'] = True
+        return filtros
+    
+    def _generar(self, reporte):
+        try:
+            filtros = self._leer_filtros()
+        except ValueError as err:
+            messagebox.showerror("❌ Error", str(err), parent=self.ventana)
+            return
+        if reporte == 'inventario':
+            filtros.pop('tipo_movimiento', None)
+        self.al_generar(reporte, filtros)
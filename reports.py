@@ -4,120 +4,293 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib import colors
 from datetime import datetime
+from itertools import islice
 import os
+import threading
 from config import REPORTS_PATH
+from report_cache import ruta_unica
+
+# Relleno interno del Frame de SimpleDocTemplate (6 pt por lado)
+RELLENO_MARCO = 12
+
+def _texto(valor, largo=None):
+    """Texto de una celda en una sola línea (los saltos de línea cambiarían el alto de fila)"""
+    texto = " ".join(str(valor).split()) if valor else ''
+    return texto[:largo] if largo else texto
+
+def _es_entrada(movimiento):
+    return (movimiento['tipo_movimiento'] or '').lower() == 'entrada'
+
+# Descripción de cada filtro en el encabezado de un reporte filtrado
+ETIQUETAS_FILTROS = {
+    'fecha_desde': "desde",
+    'fecha_hasta': "hasta",
+    'id_producto': "productos",
+    'proveedor': "proveedor",
+    'tipo_movimiento': "tipo",
+    'solo_stock_bajo': "solo stock bajo",
+}
+
+def _describir_filtros(filtros):
+    """Texto 'Filtros: ...' con los filtros aplicados, o None si no hay ninguno"""
+    partes = []
+    for clave, etiqueta in ETIQUETAS_FILTROS.items():
+        valor = (filtros or {}).get(clave)
+        if valor is None or valor is False or valor == [] or valor == '':
+            continue
+        if valor is True:
+            partes.append(etiqueta)
+        elif isinstance(valor, (list, tuple)):
+            partes.append(f"{etiqueta} {', '.join(str(v) for v in valor)}")
+        elif hasattr(valor, 'strftime'):
+            partes.append(f"{etiqueta} {valor.strftime('%d/%m/%Y')}")
+        else:
+            partes.append(f"{etiqueta} {valor}")
+    return f"Filtros: {'; '.join(partes)}" if partes else None
+
+class _FlowablesEnStreaming(list):
+    """Lista de flowables que se rellena desde un iterador a medida que se consume.
+    
+    doc.build() recorre la historia con len(), [i] y del [0], así que solo
+    quedan en memoria unas pocas tablas a la vez aunque el reporte tenga miles
+    de páginas.
+    """
+    
+    def __init__(self, flowables, reserva=3):
+        super().__init__()
+        self._fuente = iter(flowables)
+        self._reserva = reserva
+    
+    def _rellenar(self):
+        while list.__len__(self) < self._reserva:
+            flowable = next(self._fuente, None)
+            if flowable is None:
+                break
+            self.append(flowable)
+    
+    def __len__(self):
+        self._rellenar()
+        return list.__len__(self)
+    
+    def __getitem__(self, indice):
+        self._rellenar()
+        return list.__getitem__(self, indice)
 
 class ReportGenerator:
-    """Generador de reportes en PDF"""
+    """Generador de reportes en PDF.
     
-    def __init__(self):
-        if not os.path.exists(REPORTS_PATH):
-            os.makedirs(REPORTS_PATH)
+    Los estilos se arman una sola vez por instancia y se reutilizan en cada
+    reporte; directorio permite escribir en otra carpeta que REPORTS_PATH.
+    """
+    
+    def __init__(self, directorio=None):
+        self.directorio = directorio or REPORTS_PATH
+        if not os.path.exists(self.directorio):
+            os.makedirs(self.directorio)
+        self._hilo = threading.local()
         self.styles = getSampleStyleSheet()
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=self.styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#1f4788'),
+            spaceAfter=30,
+            alignment=1
+        )
+        self.table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f4788')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
+        ])
+        # Tablas por página: la última fila es el subtotal de la página
+        self.paged_table_style = TableStyle([
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#dde3ee')),
+        ], parent=self.table_style)
+    
+    def _ruta(self, prefijo):
+        """Ruta del PDF nuevo dentro del directorio de salida (queda en ultimo_archivo)"""
+        self._hilo.ultimo_archivo = ruta_unica(self.directorio, prefijo, 'pdf')
+        return self._hilo.ultimo_archivo
+    
+    @property
+    def ultimo_archivo(self):
+        """Último archivo generado desde el hilo actual (los hilos comparten la instancia)"""
+        return getattr(self._hilo, 'ultimo_archivo', None)
     
-    def generar_reporte_inventario(self, productos):
-        """Generar reporte de inventario"""
+    def _numerar_pagina(self, canvas, doc):
+        """Número de página al pie (onFirstPage/onLaterPages)"""
+        canvas.saveState()
+        canvas.setFont('Helvetica', 8)
+        canvas.drawCentredString(doc.pagesize[0] / 2, doc.bottomMargin / 2, f"Página {doc.page}")
+        canvas.restoreState()
+    
+    def _encabezado(self, titulo, ancho, filtros=None):
+        """Título, fecha de generación y filtros, con el alto que ocupan en la primera página"""
+        elementos = [
+            Paragraph(titulo, self.title_style),
+            Paragraph(f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", self.styles['Normal']),
+        ]
+        descripcion = _describir_filtros(filtros)
+        if descripcion:
+            elementos.append(Paragraph(descripcion, self.styles['Normal']))
+        elementos.append(Spacer(1, 0.3*inch))
+        alto = sum(e.wrap(ancho, 10**6)[1] + e.getSpaceBefore() + e.getSpaceAfter() for e in elementos)
+        return elementos, alto
+    
+    def _tablas_por_pagina(self, doc, encabezado, anchos, registros, celdas, subtotal, alto_ocupado=0):
+        """Una Table por página con las filas que caben y su subtotal, separadas por PageBreak.
+        
+        El alto de fila se mide una vez con el estilo real, así cada página
+        recibe exactamente las filas que entran y el subtotal corresponde a
+        ella. Los registros se consumen de a una página (memoria acotada).
+        """
+        ancho, alto = doc.width - RELLENO_MARCO, doc.height - RELLENO_MARCO
+        alto_encabezado = Table([encabezado], colWidths=anchos, style=self.paged_table_style).wrap(ancho, alto)[1]
+        alto_tres = Table([encabezado] * 3, colWidths=anchos, style=self.paged_table_style).wrap(ancho, alto)[1]
+        alto_fila = (alto_tres - alto_encabezado) / 2
+        
+        def capacidad(disponible):
+            # Menos la fila de subtotal y una de margen por redondeos
+            return max(1, int((disponible - alto_encabezado) // alto_fila) - 2)
+        
+        registros = iter(registros)
+        filas_pagina = capacidad(alto - alto_ocupado)
+        primera = True
+        while True:
+            bloque = list(islice(registros, filas_pagina))
+            if not bloque:
+                break
+            if not primera:
+                yield PageBreak()
+            yield Table([encabezado] + [celdas(r) for r in bloque] + [subtotal(bloque)],
+                        colWidths=anchos, repeatRows=1, style=self.paged_table_style)
+            primera = False
+            filas_pagina = capacidad(alto)
+        if primera:
+            yield Table([encabezado], colWidths=anchos, style=self.table_style)
+    
+    def _tabla_totales(self, filas):
+        """Tabla de totales generales al final del reporte"""
+        tabla = Table([['Total general', '']] + filas, colWidths=[3*inch, 2*inch])
+        tabla.setStyle(self.table_style)
+        return tabla
+    
+    def generar_reporte_inventario(self, productos, totales=None, filtros=None):
+        """Generar reporte de inventario (una tabla por página con subtotales).
+        
+        totales son los de db.obtener_totales_productos() con los mismos filtros
+        que produjeron productos; sin ellos se suman mientras se recorren las
+        filas. filtros solo se usa para describirlos en el encabezado.
+        """
         try:
-            filename = f"{REPORTS_PATH}Inventario_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            filename = self._ruta("Inventario")
             doc = SimpleDocTemplate(filename, pagesize=letter)
-            elements = []
+            elementos, alto_titulo = self._encabezado("REPORTE DE INVENTARIO", doc.width - RELLENO_MARCO, filtros)
+            sumar = totales is None
+            if sumar:
+                totales = {'productos': 0, 'unidades': 0, 'valor': 0.0}
             
-            # Título
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=self.styles['Heading1'],
-                fontSize=24,
-                textColor=colors.HexColor('#1f4788'),
-                spaceAfter=30,
-                alignment=1
-            )
-            elements.append(Paragraph("REPORTE DE INVENTARIO", title_style))
-            elements.append(Paragraph(f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", self.styles['Normal']))
-            elements.append(Spacer(1, 0.3*inch))
-            
-            # Tabla de datos
-            table_data = [['ID', 'Producto', 'Descripción', 'Cantidad', 'Precio Unitario', 'Proveedor']]
+            def valor(producto):
+                return producto['cantidad'] * float(producto['precio_unitario'])
             
-            for producto in productos:
-                table_data.append([
+            def celdas(producto):
+                if sumar:
+                    totales['productos'] += 1
+                    totales['unidades'] += producto['cantidad']
+                    totales['valor'] += valor(producto)
+                return [
                     str(producto['id']),
-                    producto['nombre'],
-                    producto['descripcion'][:30] if producto['descripcion'] else '',
+                    _texto(producto['nombre']),
+                    _texto(producto['descripcion'], 30),
                     str(producto['cantidad']),
                     f"${float(producto['precio_unitario']):.2f}",
-                    producto['proveedor'] if producto['proveedor'] else 'N/A'
-                ])
+                    _texto(producto['proveedor']) or 'N/A'
+                ]
             
-            table = Table(table_data, colWidths=[0.5*inch, 1.5*inch, 1.5*inch, 0.8*inch, 1.2*inch, 1.2*inch])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f4788')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-            ]))
+            def subtotal(bloque):
+                return ['', f"Subtotal ({len(bloque)})", 'Unidades / valor',
+                        str(sum(p['cantidad'] for p in bloque)),
+                        f"${sum(valor(p) for p in bloque):,.2f}", '']
             
-            elements.append(table)
+            def historia():
+                yield from elementos
+                yield from self._tablas_por_pagina(
+                    doc, ['ID', 'Producto', 'Descripción', 'Cantidad', 'Precio Unitario', 'Proveedor'],
+                    [0.5*inch, 1.5*inch, 1.5*inch, 0.8*inch, 1.2*inch, 1.2*inch],
+                    productos, celdas, subtotal, alto_titulo
+                )
+                yield Spacer(1, 0.3*inch)
+                yield self._tabla_totales([
+                    ['Productos', str(totales['productos'])],
+                    ['Unidades en stock', str(totales['unidades'])],
+                    ['Valor del inventario', f"${totales['valor']:,.2f}"],
+                ])
             
             # Crear PDF
-            doc.build(elements)
+            doc.build(_FlowablesEnStreaming(historia()), onFirstPage=self._numerar_pagina,
+                      onLaterPages=self._numerar_pagina)
             return True, f"Reporte guardado en: {filename}"
         except Exception as e:
             return False, f"Error al generar reporte: {e}"
     
-    def generar_reporte_movimientos(self, movimientos, productos_dict):
-        """Generar reporte de movimientos de inventario"""
+    def generar_reporte_movimientos(self, movimientos, totales=None, filtros=None):
+        """Generar reporte de movimientos de inventario (una tabla por página con subtotales).
+        
+        Cada movimiento trae 'nombre_producto' resuelto con JOIN
+        (db.iterar_movimientos). totales y filtros como en el de inventario,
+        con db.obtener_totales_movimientos().
+        """
         try:
-            filename = f"{REPORTS_PATH}Movimientos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            filename = self._ruta("Movimientos")
             doc = SimpleDocTemplate(filename, pagesize=letter)
-            elements = []
-            
-            # Título
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=self.styles['Heading1'],
-                fontSize=24,
-                textColor=colors.HexColor('#1f4788'),
-                spaceAfter=30,
-                alignment=1
-            )
-            elements.append(Paragraph("REPORTE DE MOVIMIENTOS", title_style))
-            elements.append(Paragraph(f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", self.styles['Normal']))
-            elements.append(Spacer(1, 0.3*inch))
-            
-            # Tabla de datos
-            table_data = [['ID Mov', 'Producto', 'Tipo', 'Cantidad', 'Fecha', 'Descripción']]
+            elementos, alto_titulo = self._encabezado("REPORTE DE MOVIMIENTOS", doc.width - RELLENO_MARCO, filtros)
+            sumar = totales is None
+            if sumar:
+                totales = {'movimientos': 0, 'entradas': 0, 'salidas': 0}
             
-            for movimiento in movimientos:
-                producto_nombre = productos_dict.get(movimiento['id_producto'], {}).get('nombre', 'N/A')
-                table_data.append([
+            def celdas(movimiento):
+                if sumar:
+                    totales['movimientos'] += 1
+                    totales['entradas' if _es_entrada(movimiento) else 'salidas'] += movimiento['cantidad']
+                return [
                     str(movimiento['id']),
-                    producto_nombre,
+                    _texto(movimiento.get('nombre_producto')) or 'N/A',
                     movimiento['tipo_movimiento'],
                     str(movimiento['cantidad']),
                     movimiento['fecha'].strftime('%d/%m/%Y %H:%M') if movimiento['fecha'] else '',
-                    movimiento['descripcion'][:20] if movimiento['descripcion'] else ''
-                ])
+                    _texto(movimiento['descripcion'], 20)
+                ]
             
-            table = Table(table_data, colWidths=[0.6*inch, 1.8*inch, 1*inch, 1*inch, 1.2*inch, 1.2*inch])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f4788')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-            ]))
+            def subtotal(bloque):
+                entradas = sum(m['cantidad'] for m in bloque if _es_entrada(m))
+                salidas = sum(m['cantidad'] for m in bloque) - entradas
+                return ['', f"Subtotal ({len(bloque)})", 'Neto', str(entradas - salidas),
+                        f"Entradas {entradas}", f"Salidas {salidas}"]
             
-            elements.append(table)
-            doc.build(elements)
+            def historia():
+                yield from elementos
+                yield from self._tablas_por_pagina(
+                    doc, ['ID Mov', 'Producto', 'Tipo', 'Cantidad', 'Fecha', 'Descripción'],
+                    [0.6*inch, 1.8*inch, 1*inch, 1*inch, 1.2*inch, 1.2*inch],
+                    movimientos, celdas, subtotal, alto_titulo
+                )
+                yield Spacer(1, 0.3*inch)
+                yield self._tabla_totales([
+                    ['Movimientos', str(totales['movimientos'])],
+                    ['Entradas (unidades)', str(totales['entradas'])],
+                    ['Salidas (unidades)', str(totales['salidas'])],
+                    ['Neto', str(totales['entradas'] - totales['salidas'])],
+                ])
+            
+            doc.build(_FlowablesEnStreaming(historia()), onFirstPage=self._numerar_pagina,
+                      onLaterPages=self._numerar_pagina)
             return True, f"Reporte guardado en: {filename}"
         except Exception as e:
             return False, f"Error al generar reporte: {e}"
@@ -125,20 +298,12 @@ class ReportGenerator:
     def generar_reporte_estadisticas(self, estadisticas):
         """Generar reporte de estadísticas"""
         try:
-            filename = f"{REPORTS_PATH}Estadisticas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            filename = self._ruta("Estadisticas")
             doc = SimpleDocTemplate(filename, pagesize=letter)
             elements = []
             
             # Título
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=self.styles['Heading1'],
-                fontSize=24,
-                textColor=colors.HexColor('#1f4788'),
-                spaceAfter=30,
-                alignment=1
-            )
-            elements.append(Paragraph("REPORTE DE ESTADÍSTICAS", title_style))
+            elements.append(Paragraph("REPORTE DE ESTADÍSTICAS", self.title_style))
             elements.append(Paragraph(f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", self.styles['Normal']))
             elements.append(Spacer(1, 0.3*inch))
             
@@ -165,7 +330,7 @@ class ReportGenerator:
             ]))
             
             elements.append(table)
-            doc.build(elements)
+            doc.build(elements, onFirstPage=self._numerar_pagina)
             return True, f"Reporte guardado en: {filename}"
         except Exception as e:
             return False, f"Error al generar reporte: {e}"
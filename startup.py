@@ -0,0 +1,78 @@
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from config import ARRANQUE_CONFIG
+
+class StartupTimer:
+    """Desglose de tiempos del arranque: fases e imports medidos desde que arranca main.py.
+    
+    Las fases se registran con fase() o marcar() y terminar() imprime el
+    desglose y avisa si el total supera presupuesto_ms. Los imports diferidos
+    hechos con importar() también se registran (al primer uso de la función
+    que los necesita), así se ve cuánto cuesta cada biblioteca pesada.
+    """
+    
+    def __init__(self, presupuesto_ms=None, mostrar=None):
+        self.inicio = time.perf_counter()
+        self.presupuesto_ms = presupuesto_ms or ARRANQUE_CONFIG['presupuesto_ms']
+        if mostrar is None:
+            mostrar = ARRANQUE_CONFIG['mostrar_tiempos'] or bool(os.environ.get(ARRANQUE_CONFIG['variable_entorno']))
+        self.mostrar = mostrar
+        self.fases = []             # (nombre, milisegundos)
+        self.terminado = False
+        self._ultima_marca = self.inicio
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def fase(self, nombre):
+        """Medir el bloque como una fase con nombre"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._registrar(nombre, (time.perf_counter() - inicio) * 1000)
+    
+    def marcar(self, nombre):
+        """Registrar como fase el tiempo transcurrido desde la marca anterior"""
+        ahora = time.perf_counter()
+        with self._lock:
+            transcurrido = (ahora - self._ultima_marca) * 1000
+            self._ultima_marca = ahora
+        self._registrar(nombre, transcurrido)
+    
+    def importar(self, modulo):
+        """Importar un módulo la primera vez que se usa, midiendo cuánto tarda"""
+        if modulo in sys.modules:
+            return sys.modules[modulo]
+        with self.fase(f"import {modulo}"):
+            return importlib.import_module(modulo)
+    
+    def total_ms(self):
+        return (time.perf_counter() - self.inicio) * 1000
+    
+    def terminar(self):
+        """Cerrar el arranque: imprimir el desglose y comparar con el presupuesto"""
+        if self.terminado:
+            return
+        self.terminado = True
+        total = self.total_ms()
+        if self.mostrar:
+            print("[INFO] Desglose del arranque:")
+            for nombre, ms in self.fases:
+                print(f"         {nombre:<32} {ms:8.1f} ms")
+            print(f"         {'total':<32} {total:8.1f} ms")
+        if total > self.presupuesto_ms:
+            print(f"[WARN] Arranque en {total:.0f} ms, por encima del presupuesto de {self.presupuesto_ms} ms")
+    
+    def _registrar(self, nombre, ms):
+        with self._lock:
+            self.fases.append((nombre, ms))
+        if self.terminado and self.mostrar:
+            print(f"[INFO] {nombre}: {ms:.1f} ms")
+
+# Reloj del arranque de este proceso; main.py lo importa antes que nada
+tiempos = StartupTimer()
@@ -0,0 +1,156 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from config import WORKER_CONFIG
+
+def contar_progreso(filas, progreso, total=None, cada=None, texto="filas procesadas"):
+    """Recorrer un iterable avisando a progreso(actual, total, texto) cada N filas.
+    
+    total es None cuando no se conoce de antemano (recorridos en streaming).
+    """
+    cada = cada or WORKER_CONFIG['progreso_cada']
+    actual = 0
+    for fila in filas:
+        yield fila
+        actual += 1
+        if actual % cada == 0:
+            progreso(actual, total, f"{actual} {texto}")
+    progreso(actual, total, f"{actual} {texto}")
+
+class BackgroundWorker:
+    """Ejecuta trabajos fuera del hilo de Tk y entrega sus resultados en él.
+    
+    Los trabajos corren en un ThreadPoolExecutor; resultados, errores y avisos
+    de progreso vuelven por una cola que el hilo de Tk vacía con root.after, así
+    que los callbacks (al_terminar, al_error, al_cambiar_estado) siempre pueden
+    tocar widgets. Solo los trabajos con ocupar=True cuentan como "ocupado".
+    """
+    
+    def __init__(self, root, al_cambiar_estado=None, max_hilos=None, intervalo_ms=None):
+        self.root = root
+        self.al_cambiar_estado = al_cambiar_estado
+        self.intervalo_ms = intervalo_ms or WORKER_CONFIG['intervalo_ms']
+        self._executor = ThreadPoolExecutor(max_workers=max_hilos or WORKER_CONFIG['max_hilos'],
+                                            thread_name_prefix='inventario-worker')
+        self._cola = queue.Queue()
+        self._lock = threading.Lock()
+        self._pendientes = 0
+        self._ocupados = {}         # id de trabajo -> texto del indicador
+        self._siguiente_id = 0
+        self._drenado = None        # id del after programado
+        self._cerrado = False
+        self._futuros = set()       # Trabajos enviados que aún no terminaron
+    
+    @property
+    def ocupado(self):
+        return bool(self._ocupados)
+    
+    def ejecutar(self, tarea, *args, al_terminar=None, al_error=None, texto="",
+                 ocupar=True, con_progreso=False, **kwargs):
+        """Encolar tarea(*args, **kwargs) y devolver el id del trabajo.
+        
+        texto es lo que muestra el indicador de ocupado mientras corre.
+        Con con_progreso=True la tarea recibe además progreso=callable(actual,
+        total, texto), que puede llamarse desde el hilo del trabajo.
+        """
+        if self._cerrado:
+            return None
+        
+        with self._lock:
+            self._siguiente_id += 1
+            id_trabajo = self._siguiente_id
+            self._pendientes += 1
+        
+        if ocupar:
+            self._ocupados[id_trabajo] = texto
+            self._avisar_estado(None, None, texto)
+        
+        if con_progreso:
+            kwargs['progreso'] = lambda actual, total=None, texto="": self._cola.put(
+                ('progreso', id_trabajo, (actual, total, texto), None, None)
+            )
+        
+        def trabajo():
+            try:
+                resultado = tarea(*args, **kwargs)
+            except Exception as err:
+                self._cola.put(('error', id_trabajo, err, al_terminar, al_error))
+            else:
+                self._cola.put(('resultado', id_trabajo, resultado, al_terminar, al_error))
+        
+        futuro = self._executor.submit(trabajo)
+        with self._lock:
+            self._futuros.add(futuro)
+        futuro.add_done_callback(self._al_terminar_futuro)
+        self._programar_drenado()
+        return id_trabajo
+    
+    def cerrar(self, espera=None):
+        """Dejar de aceptar trabajos, descartar los que aún no empezaron y esperar los que corren.
+        
+        Espera como mucho espera segundos (WORKER_CONFIG['espera_cierre']) a que
+        terminen los trabajos en curso, para no cerrar la base de datos debajo de
+        ellos. Devuelve True si no quedó ninguno corriendo.
+        """
+        espera = WORKER_CONFIG['espera_cierre'] if espera is None else espera
+        self._cerrado = True
+        if self._drenado is not None:
+            try:
+                self.root.after_cancel(self._drenado)
+            except Exception:
+                pass
+            self._drenado = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            futuros = set(self._futuros)
+        _, en_curso = wait(futuros, timeout=espera)
+        if en_curso:
+            print(f"[WARN] {len(en_curso)} trabajo(s) en segundo plano siguen corriendo al cerrar")
+        return not en_curso
+    
+    def _al_terminar_futuro(self, futuro):
+        with self._lock:
+            self._futuros.discard(futuro)
+    
+    def _programar_drenado(self):
+        if self._drenado is None and not self._cerrado:
+            self._drenado = self.root.after(self.intervalo_ms, self._drenar)
+    
+    def _drenar(self):
+        """Procesar en el hilo de Tk todo lo que haya en la cola"""
+        self._drenado = None
+        while True:
+            try:
+                tipo, id_trabajo, valor, al_terminar, al_error = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            
+            if tipo == 'progreso':
+                if id_trabajo in self._ocupados:
+                    self._avisar_estado(*valor)
+                continue
+            
+            with self._lock:
+                self._pendientes -= 1
+            if self._ocupados.pop(id_trabajo, None) is not None:
+                # El indicador pasa al trabajo ocupado más reciente que siga en curso
+                self._avisar_estado(None, None, next(reversed(self._ocupados.values()), ""))
+            
+            try:
+                if tipo == 'error':
+                    if al_error:
+                        al_error(valor)
+                    else:
+                        print(f"[ERROR] Trabajo en segundo plano falló: {valor}")
+                elif al_terminar:
+                    al_terminar(valor)
+            except Exception as err:
+                print(f"[ERROR] Callback de trabajo en segundo plano falló: {err}")
+        
+        if self._pendientes > 0:
+            self._programar_drenado()
+    
+    def _avisar_estado(self, actual, total, texto):
+        if self.al_cambiar_estado:
+            self.al_cambiar_estado(self.ocupado, actual, total, texto)